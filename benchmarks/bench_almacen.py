@@ -0,0 +1,64 @@
+"""
+Compara recargar una tabla del almacén de escenarios (mapeo en memoria) con
+recalcularla, y mide las búsquedas por cliente y por rango de parámetros
+
+Uso: python benchmarks/bench_almacen.py
+"""
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'calculadora_credito'))
+
+from almacen_escenarios import AlmacenEscenarios  # noqa: E402
+from nucleo.sistemas_amortizacion import SISTEMAS  # noqa: E402
+
+PLAZOS_ANOS = (1, 5, 15, 30)
+ESCENARIOS = 2000
+CLIENTES = 50
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directorio:
+        almacen = AlmacenEscenarios(directorio)
+
+        print(f"{'Sistema':>8} {'Plazo':>6} {'Calcular (µs)':>14} {'Cargar (µs)':>12} {'Sin copia':>10}")
+        for clave, sistema in SISTEMAS.items():
+            for plazo in PLAZOS_ANOS:
+                parametros = (100000, 12.0, plazo, 30)
+                guardada = almacen.guardar(*parametros, sistema=clave)
+                veces = 200
+                calcular = timeit.timeit(lambda: sistema.generar_tabla(*parametros), number=veces) / veces
+                cargar = timeit.timeit(lambda: almacen.cargar(guardada), number=veces) / veces
+                arreglo = almacen.cargar(guardada).arreglos_centavos()['saldo_pendiente']
+                sin_copia = not arreglo.flags.owndata and not arreglo.flags.writeable
+                print(f"{clave:>8} {plazo:>6} {calcular * 1e6:>14.0f} {cargar * 1e6:>12.0f} "
+                      f"{'sí' if sin_copia else 'NO':>10}")
+
+        generador = np.random.default_rng(0)
+        inicio = time.perf_counter()
+        for i in range(ESCENARIOS):
+            almacen.guardar(
+                int(generador.integers(10, 1000)) * 1000, round(float(generador.uniform(4, 20)), 2),
+                int(generador.integers(1, 31)), 30, cliente=f'cliente_{i % CLIENTES:03d}', nombre=f'escenario_{i}'
+            )
+        guardar = (time.perf_counter() - inicio) / ESCENARIOS
+        print(f"\nGuardar {ESCENARIOS} escenarios: {guardar * 1e3:.2f} ms por escenario")
+
+        veces = 200
+        por_cliente = timeit.timeit(lambda: almacen.buscar(cliente='cliente_007'), number=veces) / veces
+        por_rango = timeit.timeit(
+            lambda: almacen.buscar(monto=(200000, 300000), tasa_anual=(8, 10), plazo_anos=(15, 30)), number=veces
+        ) / veces
+        print(f"Buscar por cliente ({len(almacen.buscar(cliente='cliente_007'))} resultados): "
+              f"{por_cliente * 1e6:.0f} µs")
+        print(f"Buscar por rangos ({len(almacen.buscar(monto=(200000, 300000), tasa_anual=(8, 10), plazo_anos=(15, 30)))}"
+              f" resultados): {por_rango * 1e6:.0f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Compara los despejes vectorizados de nucleo.calculo_inverso con búsquedas
+por fuerza bruta sobre calcular_cuota_mensual: tiempo por consulta y error
+
+Con tasas casi nulas (1 + r)^n - 1 pierde dígitos en calcular_cuota_mensual;
+los errores máximos de los despejes frente a los valores de partida vienen
+de ahí.
+
+Uso: python benchmarks/bench_calculo_inverso.py [consultas]
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'calculadora_credito'))
+
+from nucleo.amortizacion import calcular_cuota_mensual  # noqa: E402
+from nucleo.calculo_inverso import (  # noqa: E402
+    calcular_monto_maximo,
+    calcular_plazo_minimo,
+    calcular_tasa_implicita,
+)
+
+# Las búsquedas por fuerza bruta son lentas: se miden con menos consultas
+CONSULTAS_FUERZA_BRUTA = 200
+PASO_TASA = 0.01
+
+
+def monto_por_biseccion(presupuesto, tasa_anual, plazo_anos):
+    inferior, superior = 0.0, presupuesto * plazo_anos * 12
+    for _ in range(60):
+        medio = (inferior + superior) / 2
+        if calcular_cuota_mensual(medio, tasa_anual, plazo_anos) <= presupuesto:
+            inferior = medio
+        else:
+            superior = medio
+    return inferior
+
+
+def tasa_por_barrido(monto, presupuesto, plazo_anos):
+    tasa = 0.0
+    while calcular_cuota_mensual(monto, tasa + PASO_TASA, plazo_anos) <= presupuesto:
+        tasa += PASO_TASA
+    return tasa
+
+
+def plazo_por_barrido(monto, presupuesto, tasa_anual):
+    for plazo in range(1, 101):
+        if calcular_cuota_mensual(monto, tasa_anual, plazo) <= presupuesto:
+            return plazo
+    return np.inf
+
+
+def medir(funcion, *argumentos):
+    inicio = time.perf_counter()
+    resultado = funcion(*argumentos)
+    return resultado, time.perf_counter() - inicio
+
+
+def fuerza_bruta(funcion, *columnas):
+    return medir(lambda: np.array([funcion(*fila) for fila in zip(*columnas)]))
+
+
+def main():
+    consultas = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    generador = np.random.default_rng(0)
+    montos = generador.uniform(10000, 1000000, consultas)
+    tasas = generador.uniform(0, 30, consultas)
+    tasas[::50] = 0.0
+    plazos = generador.integers(1, 31, consultas)
+    cuotas = np.array([calcular_cuota_mensual(m, t, p) for m, t, p in zip(montos, tasas, plazos)])
+    presupuestos = cuotas * generador.uniform(1.0, 1.5, consultas)
+    b = slice(0, CONSULTAS_FUERZA_BRUTA)
+
+    print(f"{consultas:,} consultas vectorizadas; fuerza bruta con {CONSULTAS_FUERZA_BRUTA}")
+    print(f"{'Despeje':<16} {'Vectorizado (µs)':>17} {'Fuerza bruta (µs)':>18} {'Veces':>7}  Error")
+
+    montos_max, tiempo = medir(calcular_monto_maximo, cuotas, tasas, plazos)
+    montos_bruta, tiempo_bruta = fuerza_bruta(monto_por_biseccion, cuotas[b], tasas[b], plazos[b])
+    error = np.max(np.abs(montos_max - montos) / montos)
+    error_bruta = np.max(np.abs(montos_bruta - montos[b]) / montos[b])
+    imprimir('Monto máximo', tiempo / consultas, tiempo_bruta / CONSULTAS_FUERZA_BRUTA,
+             f"relativo {error:.1e} (bisección {error_bruta:.1e})")
+
+    tasas_implicitas, tiempo = medir(calcular_tasa_implicita, montos, cuotas, plazos)
+    tasas_bruta, tiempo_bruta = fuerza_bruta(tasa_por_barrido, montos[b], cuotas[b], plazos[b])
+    error = np.max(np.abs(tasas_implicitas - tasas))
+    error_bruta = np.max(np.abs(tasas_bruta - tasas[b]))
+    imprimir('Tasa implícita', tiempo / consultas, tiempo_bruta / CONSULTAS_FUERZA_BRUTA,
+             f"{error:.1e} puntos % (barrido {error_bruta:.1e})")
+
+    plazos_min, tiempo = medir(calcular_plazo_minimo, montos, presupuestos, tasas)
+    plazos_bruta, tiempo_bruta = fuerza_bruta(plazo_por_barrido, montos[b], presupuestos[b], tasas[b])
+    distintos = int(np.sum(plazos_min[b] != plazos_bruta))
+    imprimir('Plazo mínimo', tiempo / consultas, tiempo_bruta / CONSULTAS_FUERZA_BRUTA,
+             f"{distintos} de {CONSULTAS_FUERZA_BRUTA} distintos al barrido")
+
+
+def imprimir(nombre, vectorizado, bruta, error):
+    print(f"{nombre:<16} {vectorizado * 1e6:>17.2f} {bruta * 1e6:>18.0f} {bruta / vectorizado:>7,.0f}  {error}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Compara el motor exacto en centavos con el motor de punto flotante y con un
+cálculo mes a mes en Decimal
+
+Uso: python benchmarks/bench_centavos.py
+"""
+import sys
+import timeit
+from decimal import ROUND_HALF_EVEN, Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'calculadora_credito'))
+
+from nucleo.amortizacion import generar_tabla_compacta  # noqa: E402
+from nucleo.amortizacion_centavos import calcular_cuota_centavos, generar_tabla_centavos  # noqa: E402
+
+PLAZOS_ANOS = (1, 5, 15, 30)
+CENTAVO = Decimal('0.01')
+
+
+def tabla_decimal(monto, tasa_anual, plazo_anos):
+    """
+    Referencia mes a mes en Decimal: interés redondeado por período, residuo en la última cuota
+    """
+    cuota = Decimal(calcular_cuota_centavos(monto, tasa_anual, plazo_anos)) / 100
+    tasa_mensual = Decimal(str(tasa_anual)) / 100 / 12
+    saldo = Decimal(monto).quantize(CENTAVO)
+    num_pagos = plazo_anos * 12
+    filas = []
+    for mes in range(1, num_pagos + 1):
+        interes = (saldo * tasa_mensual).quantize(CENTAVO, rounding=ROUND_HALF_EVEN)
+        abono = saldo if mes == num_pagos else cuota - interes
+        saldo -= abono
+        filas.append((interes + abono, interes, abono, saldo))
+    return filas
+
+
+def main():
+    print(f"{'Plazo':>6} {'Flotante (µs)':>14} {'Centavos (µs)':>14} {'Decimal (µs)':>13} "
+          f"{'Σ abono - monto (flot.)':>24} {'Σ abono - monto (cent.)':>24}")
+    for plazo in PLAZOS_ANOS:
+        parametros = (100000, 12.0, plazo, 30)
+        veces = 200
+        flotante = timeit.timeit(lambda: generar_tabla_compacta(*parametros), number=veces) / veces
+        centavos = timeit.timeit(lambda: generar_tabla_centavos(*parametros), number=veces) / veces
+        decimal = timeit.timeit(lambda: tabla_decimal(*parametros[:3]), number=20) / 20
+
+        diferencia_flotante = generar_tabla_compacta(*parametros)['Abono Capital'].sum() - parametros[0]
+        diferencia_centavos = generar_tabla_centavos(*parametros)['Abono Capital'].sum() - parametros[0]
+        print(f"{plazo:>6} {flotante * 1e6:>14.1f} {centavos * 1e6:>14.1f} {decimal * 1e6:>13.1f} "
+              f"{diferencia_flotante:>24.2e} {diferencia_centavos:>24.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Mide trayectorias por segundo y memoria máxima de la simulación de
+escenarios de tasa con uno y varios procesos
+
+Uso: python benchmarks/bench_escenarios.py [trayectorias]
+"""
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'calculadora_credito'))
+
+from nucleo.escenarios_tasa import resumir_escenarios, simular_escenarios_tasa  # noqa: E402
+
+MONTO = 300000
+TASA_ANUAL = 8.0
+PLAZO_ANOS = 30
+
+
+def medir(num_trayectorias, procesos):
+    """
+    Devuelve (segundos, MB máximos en este proceso, intereses medianos)
+    """
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    escenarios = simular_escenarios_tasa(
+        MONTO, TASA_ANUAL, PLAZO_ANOS, num_trayectorias, cada_meses=6, procesos=procesos
+    )
+    resumen = resumir_escenarios(escenarios, PLAZO_ANOS, cada_meses=6)
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico / 1e6, resumen['intereses_pagados'][2]
+
+
+def main():
+    num_trayectorias = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    simular_escenarios_tasa(MONTO, TASA_ANUAL, PLAZO_ANOS, 100)
+    print(f"{num_trayectorias:,} trayectorias, {PLAZO_ANOS * 12} meses, {os.cpu_count()} CPU")
+    print(f"{'Procesos':>8} {'Segundos':>9} {'Tray./s':>10} {'MB máx.':>8} {'Mediana intereses':>18}")
+    for procesos in sorted({1, 2, min(4, os.cpu_count() or 1)}):
+        segundos, megabytes, mediana = medir(num_trayectorias, procesos)
+        print(f"{procesos:>8} {segundos:>9.2f} {num_trayectorias / segundos:>10,.0f} {megabytes:>8.1f} {mediana:>18,.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Tamaño del JSON que se envía al navegador por cada figura, antes (series
+completas con floats sin redondear) y después de graficos.py (agregado,
+centavos y LTTB), y costo por rerun de st.plotly_chart armando la figura,
+con la figura en caché o con su JSON en caché (que Streamlit revalida)
+
+Uso: python benchmarks/bench_graficos.py
+"""
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+import plotly.tools
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'calculadora_credito'))
+
+import graficos  # noqa: E402
+from nucleo import obtener_datos_anuales, obtener_malla_sensibilidad, obtener_tabla_compacta  # noqa: E402
+from nucleo.escenarios_tasa import resumir_escenarios, simular_escenarios_tasa  # noqa: E402
+
+MONTO = 300000
+TASA_ANUAL = 12.0
+PLAZO_ANOS = 30
+CUOTA_SEGURO = 30
+
+
+def enviado(figura):
+    """
+    JSON que arma st.plotly_chart: valida la figura y la serializa
+    """
+    return pio.to_json(plotly.tools.return_figure_from_figure_or_data(figura, validate_figure=True), validate=False)
+
+
+def lineas_completas(series):
+    """
+    Referencia: una traza por serie con todos los meses y floats completos
+    """
+    fig = go.Figure()
+    for nombre, valores in series.items():
+        fig.add_trace(go.Scatter(x=list(range(1, len(valores) + 1)), y=np.asarray(valores, dtype=float), name=nombre))
+    return fig
+
+
+def anual_completa(datos_anuales):
+    fig = go.Figure()
+    for componente in ('Capital', 'Intereses', 'Seguros'):
+        fig.add_trace(go.Bar(name=componente, x=datos_anuales['Año'], y=datos_anuales[componente],
+                             hovertemplate=f'<b>Año %{{x}}</b><br>{componente}: $%{{y:,.2f}}<extra></extra>'))
+    fig.update_layout(barmode='stack', height=500)
+    return fig
+
+
+def medir(nombre, antes, despues, construir):
+    original, liviano = enviado(antes), enviado(despues)
+
+    veces = 20
+    inicio = time.perf_counter()
+    for _ in range(veces):
+        enviado(construir())
+    armando = (time.perf_counter() - inicio) / veces
+    inicio = time.perf_counter()
+    for _ in range(veces):
+        enviado(graficos.figura_en_cache(nombre, construir))
+    en_cache = (time.perf_counter() - inicio) / veces
+    especificacion = pio.to_json(construir(), validate=False)
+    inicio = time.perf_counter()
+    for _ in range(veces):
+        enviado(json.loads(especificacion))
+    json_en_cache = (time.perf_counter() - inicio) / veces
+
+    print(f"{nombre:<13} {len(original) / 1024:>9.1f} {len(liviano) / 1024:>9.1f} "
+          f"{len(gzip.compress(original.encode())) / 1024:>11.1f} {len(gzip.compress(liviano.encode())) / 1024:>11.1f} "
+          f"{armando * 1e3:>10.1f} {en_cache * 1e3:>10.1f} {json_en_cache * 1e3:>10.1f}")
+
+
+def main():
+    tabla = obtener_tabla_compacta(MONTO, TASA_ANUAL, PLAZO_ANOS, CUOTA_SEGURO)
+    datos_anuales = obtener_datos_anuales(MONTO, TASA_ANUAL, PLAZO_ANOS, CUOTA_SEGURO)
+    escenarios = simular_escenarios_tasa(MONTO, TASA_ANUAL, PLAZO_ANOS, 5000)
+    resumen = resumir_escenarios(escenarios, PLAZO_ANOS)
+    malla = obtener_malla_sensibilidad(MONTO, CUOTA_SEGURO)
+    cuota = tabla.columna('Cuota Crédito', 0, 1)[0]
+
+    print(f"Crédito de ${MONTO:,} a {PLAZO_ANOS} años; presupuesto de {graficos.PUNTOS_MAXIMOS} puntos por serie")
+    print(f"{'Figura':<13} {'Antes KB':>9} {'Ahora KB':>9} {'Antes gzip':>11} {'Ahora gzip':>11} "
+          f"{'Armar ms':>10} {'Caché ms':>10} {'JSON ms':>10}")
+    medir('anual', anual_completa(datos_anuales), graficos.figura_anual(datos_anuales),
+          lambda: graficos.figura_anual(datos_anuales))
+    medir('mensual',
+          lineas_completas({'Saldo Pendiente': tabla.columna('Saldo Pendiente'), 'Interés': tabla.columna('Interés')}),
+          graficos.figura_mensual(tabla), lambda: graficos.figura_mensual(tabla))
+    medir('escenarios',
+          lineas_completas({f"P{p}": fila for p, fila in zip(resumen['percentiles'], resumen['cuotas_por_mes'])}),
+          graficos.figura_escenarios(resumen, cuota, 12), lambda: graficos.figura_escenarios(resumen, cuota, 12))
+    medir('sensibilidad',
+          go.Figure(go.Heatmap(z=malla['Cuota Crédito'], x=malla['tasas'], y=malla['plazos'])),
+          graficos.figura_sensibilidad(malla['tasas'], malla['plazos'], malla['Cuota Crédito'], 'Cuota Crédito', MONTO),
+          lambda: graficos.figura_sensibilidad(malla['tasas'], malla['plazos'], malla['Cuota Crédito'],
+                                               'Cuota Crédito', MONTO))
+
+
+if __name__ == '__main__':
+    main()
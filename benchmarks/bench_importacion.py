@@ -0,0 +1,64 @@
+"""
+Mide el tiempo de importación del núcleo de cálculo y de la aplicación con
+python -X importtime
+
+Cada caso corre en un intérprete nuevo, varias veces, y se informa la mediana
+del tiempo acumulado de importación y los módulos pesados que quedaron cargados.
+
+Uso: python benchmarks/bench_importacion.py
+"""
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+DIRECTORIO_APP = Path(__file__).resolve().parent.parent / 'calculadora_credito'
+
+REPETICIONES = 5
+
+CASOS = {
+    # Importaciones que hacía app.py antes de separar el núcleo
+    'app (antes)': (
+        'import streamlit, pandas, numpy, altair, plotly.express, plotly.graph_objects, reportlab.platypus'
+    ),
+    'app (ahora)': 'import streamlit, formato, tareas_pdf, exportaciones, almacen_escenarios, nucleo',
+    'núcleo': 'import nucleo',
+    'núcleo + DataFrame': 'import nucleo; nucleo.generar_tabla_amortizacion(100000, 12, 30)',
+}
+
+MODULOS_PESADOS = ('streamlit', 'pandas', 'plotly', 'altair', 'reportlab', 'pyarrow', 'openpyxl')
+
+_LINEA_IMPORTTIME = re.compile(r'import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)')
+
+
+def medir(codigo):
+    """
+    Devuelve (microsegundos de importación, módulos pesados cargados) de una ejecución
+    """
+    sondeo = f"{codigo}; import sys; print(' '.join(m for m in {MODULOS_PESADOS!r} if m in sys.modules))"
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', sondeo],
+        cwd=DIRECTORIO_APP, capture_output=True, text=True, check=True
+    )
+    # Las importaciones de primer nivel (sin sangría) acumulan a todas las demás
+    total = sum(
+        int(acumulado)
+        for acumulado, sangria, _ in _LINEA_IMPORTTIME.findall(resultado.stderr)
+        if len(sangria) == 1
+    )
+    return total, resultado.stdout.split()
+
+
+def main():
+    print(f"{'Caso':<20} {'Importación (ms)':>17}  Módulos pesados cargados")
+    for nombre, codigo in CASOS.items():
+        tiempos = []
+        for _ in range(REPETICIONES):
+            microsegundos, pesados = medir(codigo)
+            tiempos.append(microsegundos)
+        print(f"{nombre:<20} {statistics.median(tiempos) / 1000:>17.1f}  {', '.join(pesados) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Memoria por sesión de la tabla de amortización: DataFrame completo contra
+TablaCompacta
+
+Uso: python benchmarks/bench_memoria_tabla.py
+"""
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'calculadora_credito'))
+
+from nucleo.amortizacion import generar_tabla_amortizacion, generar_tabla_compacta  # noqa: E402
+
+PLAZOS_ANOS = (1, 5, 15, 30)
+
+
+def memoria_retenida(funcion, *args):
+    """
+    Bytes que siguen asignados mientras se conserva el resultado de funcion(*args)
+    """
+    gc.collect()
+    tracemalloc.start()
+    inicio, _ = tracemalloc.get_traced_memory()
+    resultado = funcion(*args)
+    gc.collect()
+    final, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return final - inicio
+
+
+def main():
+    # Primera llamada fuera de la medición para cargar cachés internas de pandas
+    generar_tabla_amortizacion(100000, 12.0, 1, 30)
+    generar_tabla_compacta(100000, 12.0, 1, 30)
+
+    print(f"{'Plazo':>6} {'DataFrame (B)':>14} {'Compacta (B)':>13} {'Reducción':>10}")
+    for plazo in PLAZOS_ANOS:
+        parametros = (100000, 12.0, plazo, 30)
+        antes = memoria_retenida(generar_tabla_amortizacion, *parametros)
+        despues = memoria_retenida(generar_tabla_compacta, *parametros)
+        print(f"{plazo:>6} {antes:>14,} {despues:>13,} {antes / despues:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
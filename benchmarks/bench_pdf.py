@@ -0,0 +1,51 @@
+"""
+Compara tiempo y memoria pico de la exportación a PDF por bloques contra la
+implementación anterior de una sola tabla
+
+Uso: python benchmarks/bench_pdf.py
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'calculadora_credito'))
+
+from nucleo.amortizacion import generar_tabla_amortizacion  # noqa: E402
+from exportacion_pdf import generar_pdf_tabla_amortizacion, generar_pdf_tabla_unica  # noqa: E402
+
+PLAZOS_MESES = (12, 120, 360)
+REPETICIONES = 5
+
+
+def medir(funcion, *args):
+    """
+    Devuelve el mejor tiempo en segundos y la memoria pico en MiB de funcion(*args)
+    """
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    funcion(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(tiempos), pico / 2**20
+
+
+def main():
+    print(f"{'Meses':>6} {'Versión':<12} {'Tiempo (ms)':>12} {'Pico (MiB)':>11} {'Bytes PDF':>10}")
+    for meses in PLAZOS_MESES:
+        parametros = (100000, 12.0, meses // 12, 30)
+        tabla = generar_tabla_amortizacion(*parametros)
+        for nombre, funcion in (('tabla única', generar_pdf_tabla_unica), ('por bloques', generar_pdf_tabla_amortizacion)):
+            segundos, pico = medir(funcion, tabla, *parametros)
+            tamano = len(funcion(tabla, *parametros).getvalue())
+            print(f"{meses:>6} {nombre:<12} {segundos * 1000:>12.1f} {pico:>11.2f} {tamano:>10}")
+
+
+if __name__ == '__main__':
+    main()
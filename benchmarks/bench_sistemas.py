@@ -0,0 +1,78 @@
+"""
+Compara, para cada sistema de amortización registrado, la tabla vectorizada
+con la referencia mes a mes y comprueba las invariantes del modo exacto
+
+Termina con código 1 si alguna celda difiere en más de un centavo de la
+referencia o si la tabla exacta no cuadra al centavo.
+
+Uso: python benchmarks/bench_sistemas.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'calculadora_credito'))
+
+from nucleo.sistemas_amortizacion import SISTEMAS  # noqa: E402
+from nucleo.tabla_compacta import COLUMNAS_TABLA  # noqa: E402
+
+MONTO = 100000
+CUOTA_SEGURO = 30
+TASAS = (0.0, 7.5, 12.0, 24.0)
+PLAZOS_ANOS = (1, 5, 30)
+TOLERANCIA = 0.01 + 1e-9
+
+
+def diferencias(tabla, referencia):
+    """
+    Máxima diferencia absoluta y celdas que difieren entre las dos tablas
+    """
+    maxima, celdas = 0.0, 0
+    for nombre in COLUMNAS_TABLA:
+        diferencia = np.abs(np.asarray(tabla[nombre], dtype=np.float64) - referencia[nombre].to_numpy())
+        maxima = max(maxima, float(diferencia.max()))
+        celdas += int((diferencia > 1e-9).sum())
+    return maxima, celdas
+
+
+def cuadra_exacta(tabla, monto):
+    """
+    Invariantes del modo exacto: los abonos suman el monto, el saldo termina en
+    cero y en cada mes la cuota es interés más abono
+    """
+    cuota = np.rint(tabla['Cuota Crédito'] * 100)
+    interes = np.rint(tabla['Interés'] * 100)
+    abono = np.rint(tabla['Abono Capital'] * 100)
+    return (abono.sum() == round(monto * 100) and tabla['Saldo Pendiente'][-1] == 0
+            and (cuota == interes + abono).all())
+
+
+def main():
+    print(f"{'Sistema':>8} {'Plazo':>6} {'Tasa':>6} {'Vectorizada (µs)':>17} {'Mes a mes (µs)':>15} "
+          f"{'Dif. máx.':>10} {'Celdas':>7} {'Exacta':>7}")
+    fallas = 0
+    for clave, sistema in SISTEMAS.items():
+        for plazo in PLAZOS_ANOS:
+            for tasa in TASAS:
+                parametros = (MONTO, tasa, plazo, CUOTA_SEGURO)
+                veces = 50
+                vectorizada = timeit.timeit(lambda: sistema.generar_tabla(*parametros), number=veces) / veces
+                mes_a_mes = timeit.timeit(lambda: sistema.generar_tabla_iterativa(*parametros), number=5) / 5
+
+                maxima, celdas = diferencias(sistema.generar_tabla(*parametros),
+                                             sistema.generar_tabla_iterativa(*parametros))
+                exacta = cuadra_exacta(sistema.generar_tabla(*parametros, exacto=True), MONTO)
+                if maxima > TOLERANCIA or not exacta:
+                    fallas += 1
+                print(f"{clave:>8} {plazo:>6} {tasa:>6.1f} {vectorizada * 1e6:>17.0f} {mes_a_mes * 1e6:>15.0f} "
+                      f"{maxima:>10.2f} {celdas:>7} {'sí' if exacta else 'NO':>7}")
+
+    if fallas:
+        print(f"\n{fallas} combinaciones fuera de tolerancia")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
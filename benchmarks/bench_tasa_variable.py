@@ -0,0 +1,58 @@
+"""
+Compara el costo de la tabla con tasa variable (por tramos en forma cerrada)
+con la tabla de tasa fija y con un cálculo mes a mes
+
+Uso: python benchmarks/bench_tasa_variable.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'calculadora_credito'))
+
+from nucleo.amortizacion import calcular_cuota_mensual, calcular_cuota_saldo, generar_tabla_amortizacion  # noqa: E402
+from nucleo.tasa_variable import generar_tabla_tasa_variable, tasas_desde_indice  # noqa: E402
+
+MONTO = 300000
+PLAZO_ANOS = 30
+CAMBIOS = (1, 5, 30, 60, 120)
+
+
+def tabla_mes_a_mes(monto, tasas, plazo_anos):
+    """
+    Referencia con un ciclo de Python por mes
+    """
+    num_pagos = plazo_anos * 12
+    cambios = dict(tasas)
+    saldo = float(monto)
+    filas = []
+    for mes in range(1, num_pagos + 1):
+        if mes in cambios:
+            tasa_mensual = cambios[mes] / 100 / 12
+            cuota = (calcular_cuota_mensual(monto, cambios[mes], plazo_anos) if mes == 1
+                     else calcular_cuota_saldo(saldo, tasa_mensual, num_pagos - mes + 1))
+        interes = saldo * tasa_mensual
+        abono = saldo if mes == num_pagos else cuota - interes
+        saldo -= abono
+        filas.append((round(interes + abono, 2), round(interes, 2), round(abono, 2), round(saldo, 2)))
+    return filas
+
+
+def main():
+    veces = 200
+    generar_tabla_amortizacion(MONTO, 8.0, PLAZO_ANOS)
+    fija = timeit.timeit(lambda: generar_tabla_amortizacion(MONTO, 8.0, PLAZO_ANOS), number=veces) / veces
+    print(f"Tasa fija, {PLAZO_ANOS * 12} meses: {fija * 1e6:.0f} µs")
+    print(f"{'Cambios':>8} {'Por tramos (µs)':>16} {'× fija':>7} {'Mes a mes (µs)':>15}")
+    for cambios in CAMBIOS:
+        cada_meses = PLAZO_ANOS * 12 // cambios
+        tasas = tasas_desde_indice([4.0 + (i % 7) * 0.5 for i in range(cambios)], 2.0, cada_meses)
+        por_tramos = timeit.timeit(
+            lambda: generar_tabla_tasa_variable(MONTO, tasas, PLAZO_ANOS), number=veces
+        ) / veces
+        mes_a_mes = timeit.timeit(lambda: tabla_mes_a_mes(MONTO, tasas, PLAZO_ANOS), number=20) / 20
+        print(f"{cambios:>8} {por_tramos * 1e6:>16.0f} {por_tramos / fija:>7.1f} {mes_a_mes * 1e6:>15.0f}")
+
+
+if __name__ == '__main__':
+    main()
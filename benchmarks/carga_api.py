@@ -0,0 +1,124 @@
+"""
+Prueba de carga local de la API de la calculadora
+
+Levanta calculadora_credito/api.py en un puerto libre (o usa --url), envía
+solicitudes concurrentes de varios tipos y reporta latencia p50/p99,
+solicitudes por segundo y tamaño medio de la respuesta.
+
+Uso: python benchmarks/carga_api.py --solicitudes 200 --concurrencia 16
+"""
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+
+API = Path(__file__).resolve().parent.parent / 'calculadora_credito' / 'api.py'
+
+PRESTAMO = {'monto': 100000, 'tasa_anual': 12.0, 'plazo_anos': 30, 'cuota_seguro': 30}
+
+ESCENARIOS = [
+    # (nombre, ruta, cuerpo, encabezados)
+    ('cuota x1', '/cuota', {'prestamos': [PRESTAMO]}, {}),
+    ('cuota x100', '/cuota', {'prestamos': [dict(PRESTAMO, monto=1000 * (i + 1)) for i in range(100)]}, {}),
+    ('tabla 30 años JSON', '/tabla', {'prestamos': [PRESTAMO]}, {}),
+    ('tabla 30 años gzip', '/tabla', {'prestamos': [PRESTAMO]}, {'Accept-Encoding': 'gzip'}),
+    ('tabla 30 años Arrow', '/tabla', {'prestamos': [PRESTAMO]}, {'Accept': 'application/vnd.apache.arrow.stream'}),
+    ('tabla x50 JSON', '/tabla', {'prestamos': [dict(PRESTAMO, monto=1000 * (i + 1)) for i in range(50)]}, {}),
+    ('tabla x50 Arrow+gzip', '/tabla', {'prestamos': [dict(PRESTAMO, monto=1000 * (i + 1)) for i in range(50)]},
+     {'Accept': 'application/vnd.apache.arrow.stream', 'Accept-Encoding': 'gzip'}),
+    ('anual x10', '/anual', {'prestamos': [dict(PRESTAMO, monto=1000 * (i + 1)) for i in range(10)]}, {}),
+]
+
+
+def _puerto_libre():
+    with socket.socket() as conexion:
+        conexion.bind(('127.0.0.1', 0))
+        return conexion.getsockname()[1]
+
+
+async def _esperar_servidor(cliente, url, segundos=30):
+    limite = time.monotonic() + segundos
+    while True:
+        try:
+            await cliente.fetch(url + '/salud')
+            return
+        except (OSError, HTTPClientError):
+            if time.monotonic() > limite:
+                raise
+            await asyncio.sleep(0.2)
+
+
+async def medir_escenario(cliente, url, ruta, cuerpo, encabezados, solicitudes, concurrencia):
+    """
+    Devuelve (latencias en segundos, segundos totales, bytes medios recibidos)
+    """
+    cuerpo = json.dumps(cuerpo)
+    latencias = []
+    tamanos = []
+    pendientes = iter(range(solicitudes))
+
+    async def trabajador():
+        for _ in pendientes:
+            inicio = time.perf_counter()
+            respuesta = await cliente.fetch(
+                url + ruta, method='POST', body=cuerpo, headers=encabezados, decompress_response=False
+            )
+            latencias.append(time.perf_counter() - inicio)
+            tamanos.append(len(respuesta.body))
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    return latencias, time.perf_counter() - inicio, statistics.mean(tamanos)
+
+
+async def correr(url, solicitudes, concurrencia):
+    cliente = AsyncHTTPClient(max_clients=concurrencia)
+    await _esperar_servidor(cliente, url)
+
+    print(f"{'Escenario':<22} {'p50 (ms)':>9} {'p99 (ms)':>9} {'sol/s':>8} {'bytes':>10}")
+    for nombre, ruta, cuerpo, encabezados in ESCENARIOS:
+        # Una solicitud previa llena las cachés de los trabajadores
+        await medir_escenario(cliente, url, ruta, cuerpo, encabezados, concurrencia, concurrencia)
+        latencias, segundos, tamano = await medir_escenario(
+            cliente, url, ruta, cuerpo, encabezados, solicitudes, concurrencia
+        )
+        percentiles = statistics.quantiles(latencias, n=100, method='inclusive')
+        print(f"{nombre:<22} {percentiles[49] * 1000:>9.2f} {percentiles[98] * 1000:>9.2f} "
+              f"{solicitudes / segundos:>8.0f} {tamano:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API de la calculadora.")
+    parser.add_argument('--url', help="API ya en marcha (por defecto se levanta una local)")
+    parser.add_argument('--procesos', type=int, default=2, help="procesos de la API local")
+    parser.add_argument('--solicitudes', type=int, default=200, help="solicitudes por escenario")
+    parser.add_argument('--concurrencia', type=int, default=16, help="solicitudes simultáneas")
+    args = parser.parse_args()
+
+    servidor = None
+    url = args.url
+    if url is None:
+        puerto = _puerto_libre()
+        servidor = subprocess.Popen(
+            [sys.executable, str(API), '--puerto', str(puerto), '--procesos', str(args.procesos)],
+            stdout=subprocess.DEVNULL
+        )
+        url = f'http://127.0.0.1:{puerto}'
+
+    try:
+        asyncio.run(correr(url.rstrip('/'), args.solicitudes, args.concurrencia))
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""
+Suite de rendimiento de los caminos críticos de la calculadora
+
+Mide tiempo (mejor de varias repeticiones) y memoria pico (tracemalloc) de
+la cuota, la tabla de amortización, los datos anuales, el PDF, el CSV y el
+formato de la página de la tabla para plazos de 1 a 30 años, y del cálculo
+por lotes de 1 a 100,000 préstamos. Los resultados se guardan en JSON y se
+comparan con una línea base: si un caso es más lento (o usa más memoria)
+que la base más la tolerancia, el programa termina con código 1.
+
+La línea base depende de la máquina: se regenera con --guardar-base en la
+máquina donde se vigilan las regresiones.
+
+Uso: python benchmarks/suite.py [--guardar-base] [--rapido] [--filtro texto]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'calculadora_credito'))
+
+from exportacion_pdf import generar_pdf_tabla_amortizacion  # noqa: E402
+from formato import formatear_tabla, generar_csv, periodos_tabla  # noqa: E402
+from lotes import FILAS_POR_BLOQUE, calcular_bloque  # noqa: E402
+from nucleo.amortizacion import (  # noqa: E402
+    calcular_cuota_mensual,
+    generar_datos_anuales,
+    generar_tabla_amortizacion,
+    generar_tabla_compacta,
+)
+from nucleo.cartera import calcular_cuotas_cartera  # noqa: E402
+from nucleo.indice_amortizacion import IndiceAmortizacion  # noqa: E402
+
+DIRECTORIO = Path(__file__).resolve().parent
+LINEA_BASE = DIRECTORIO / 'linea_base.json'
+
+PLAZOS = (1, 5, 10, 20, 30)
+LOTES = (1, 100, 10000, 100000)
+
+MONTO = 100000
+TASA_ANUAL = 12.0
+CUOTA_SEGURO = 30
+
+REPETICIONES = 5
+# Cada repetición dura al menos esto (se llama la función varias veces si es rápida)
+SEGUNDOS_POR_REPETICION = 0.05
+
+TOLERANCIA_TIEMPO = 0.30
+TOLERANCIA_MEMORIA = 0.30
+# Diferencias menores a esto se consideran ruido en los casos de microsegundos
+HOLGURA_SEGUNDOS = 2e-6
+
+
+def cartera(num_prestamos):
+    """
+    Cartera reproducible con plazos de 1 a 30 años
+    """
+    generador = np.random.default_rng(0)
+    return (
+        generador.uniform(1000, 1000000, num_prestamos).round(2),
+        generador.uniform(0, 30, num_prestamos).round(2),
+        generador.integers(1, 31, num_prestamos),
+        np.full(num_prestamos, CUOTA_SEGURO),
+    )
+
+
+def formato_pagina(tabla, indice, plazo_anos):
+    """
+    Lo que arma pagina_tabla_amortizacion: cada período como DataFrame y sus totales
+    """
+    for _, inicio, fin in periodos_tabla(plazo_anos):
+        tabla.a_dataframe(*indice.rango_filas(inicio, fin))
+        indice.totales(inicio, fin)
+
+
+def tablas_por_bloques(montos, tasas_anuales, plazos_anos, cuotas_seguro):
+    """
+    Tablas y totales de una cartera por bloques, como lotes.procesar_archivo sin escribir
+    """
+    for inicio in range(0, len(montos), FILAS_POR_BLOQUE):
+        fin = inicio + FILAS_POR_BLOQUE
+        calcular_bloque(inicio, montos[inicio:fin], tasas_anuales[inicio:fin], plazos_anos[inicio:fin],
+                        cuotas_seguro[inicio:fin])
+
+
+def casos(lotes=LOTES):
+    """
+    Genera (nombre, función sin argumentos) de cada caso de la suite
+    """
+    for plazo in PLAZOS:
+        tabla_df = generar_tabla_amortizacion(MONTO, TASA_ANUAL, plazo, CUOTA_SEGURO)
+        tabla = generar_tabla_compacta(MONTO, TASA_ANUAL, plazo, CUOTA_SEGURO)
+        indice = IndiceAmortizacion(tabla)
+        yield f'cuota_mensual/plazo={plazo}', lambda plazo=plazo: calcular_cuota_mensual(MONTO, TASA_ANUAL, plazo)
+        yield (f'tabla_amortizacion/plazo={plazo}',
+               lambda plazo=plazo: generar_tabla_amortizacion(MONTO, TASA_ANUAL, plazo, CUOTA_SEGURO))
+        yield f'datos_anuales/plazo={plazo}', lambda tabla=tabla: generar_datos_anuales(tabla, CUOTA_SEGURO)
+        yield (f'pdf/plazo={plazo}',
+               lambda tabla_df=tabla_df, plazo=plazo: generar_pdf_tabla_amortizacion(
+                   tabla_df, MONTO, TASA_ANUAL, plazo, CUOTA_SEGURO))
+        yield f'csv/plazo={plazo}', lambda tabla_df=tabla_df: generar_csv(tabla_df)
+        yield f'formatear_tabla/plazo={plazo}', lambda tabla_df=tabla_df: formatear_tabla(tabla_df)
+        yield (f'formato_pagina/plazo={plazo}',
+               lambda tabla=tabla, indice=indice, plazo=plazo: formato_pagina(tabla, indice, plazo))
+
+    for num_prestamos in lotes:
+        montos, tasas_anuales, plazos_anos, cuotas_seguro = cartera(num_prestamos)
+        yield (f'cuotas_ciclo/prestamos={num_prestamos}',
+               lambda m=montos.tolist(), t=tasas_anuales.tolist(), p=plazos_anos.tolist(): [
+                   calcular_cuota_mensual(*prestamo) for prestamo in zip(m, t, p)])
+        yield (f'cuotas_cartera/prestamos={num_prestamos}',
+               lambda m=montos, t=tasas_anuales, p=plazos_anos: calcular_cuotas_cartera(m, t, p))
+        yield (f'tablas_lote/prestamos={num_prestamos}',
+               lambda datos=(montos, tasas_anuales, plazos_anos, cuotas_seguro): tablas_por_bloques(*datos))
+
+
+def medir(funcion):
+    """
+    Mejor tiempo por llamada en segundos y memoria pico en bytes
+    """
+    # La primera llamada calienta cachés e importaciones diferidas y no se cuenta
+    funcion()
+    inicio = time.perf_counter()
+    funcion()
+    una_llamada = time.perf_counter() - inicio
+    llamadas = max(1, int(SEGUNDOS_POR_REPETICION / max(una_llamada, 1e-9)))
+    repeticiones = REPETICIONES if una_llamada < 1 else 3
+
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for _ in range(llamadas):
+            funcion()
+        tiempos.append((time.perf_counter() - inicio) / llamadas)
+
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'segundos': min(tiempos), 'memoria_maxima': pico, 'llamadas': llamadas * repeticiones}
+
+
+def comparar(resultados, base, tolerancia_tiempo, tolerancia_memoria, funciones=None):
+    """
+    Devuelve los casos que empeoraron frente a la base: (nombre, medida, base, actual)
+
+    Un caso más lento que el límite se vuelve a medir una vez (si se dan
+    las funciones) para no fallar por ruido pasajero de la máquina.
+    """
+    regresiones = []
+    for nombre, actual in resultados.items():
+        anterior = base.get(nombre)
+        if anterior is None:
+            continue
+        limite = anterior['segundos'] * (1 + tolerancia_tiempo) + HOLGURA_SEGUNDOS
+        if actual['segundos'] > limite and funciones is not None:
+            actual['segundos'] = min(actual['segundos'], medir(funciones[nombre])['segundos'])
+        if actual['segundos'] > limite:
+            regresiones.append((nombre, 'tiempo', anterior['segundos'], actual['segundos']))
+        if actual['memoria_maxima'] > anterior['memoria_maxima'] * (1 + tolerancia_memoria) + 1024:
+            regresiones.append((nombre, 'memoria', anterior['memoria_maxima'], actual['memoria_maxima']))
+    return regresiones
+
+
+def metadatos():
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'procesadores': os.cpu_count(),
+    }
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Suite de rendimiento de la calculadora de crédito")
+    parser.add_argument('--base', type=Path, default=LINEA_BASE, help="Archivo JSON con la línea base")
+    parser.add_argument('--guardar-base', action='store_true', help="Guarda los resultados como nueva línea base")
+    parser.add_argument('--salida', type=Path, help="Archivo JSON donde guardar los resultados")
+    parser.add_argument('--filtro', default='', help="Solo los casos cuyo nombre contiene este texto")
+    parser.add_argument('--rapido', action='store_true', help="Omite el lote más grande")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_TIEMPO,
+                        help="Aumento de tiempo permitido frente a la base (0.30 = 30%%)")
+    parser.add_argument('--tolerancia-memoria', type=float, default=TOLERANCIA_MEMORIA,
+                        help="Aumento de memoria pico permitido frente a la base")
+    argumentos = parser.parse_args(argumentos)
+
+    base = {}
+    if argumentos.base.exists() and not argumentos.guardar_base:
+        base = json.loads(argumentos.base.read_text(encoding='utf-8'))['resultados']
+
+    resultados = {}
+    funciones = {}
+    print(f"{'Caso':<34} {'Tiempo':>12} {'Memoria':>11} {'Base':>12} {'Cambio':>8}")
+    for nombre, funcion in casos(LOTES[:-1] if argumentos.rapido else LOTES):
+        if argumentos.filtro not in nombre:
+            continue
+        funciones[nombre] = funcion
+        resultados[nombre] = medir(funcion)
+        actual = resultados[nombre]
+        anterior = base.get(nombre)
+        referencia = f"{anterior['segundos'] * 1e3:>10.3f}ms" if anterior else f"{'-':>12}"
+        cambio = f"{actual['segundos'] / anterior['segundos'] - 1:>+8.0%}" if anterior else f"{'':>8}"
+        print(f"{nombre:<34} {actual['segundos'] * 1e3:>10.3f}ms {actual['memoria_maxima'] / 2**20:>8.2f}MiB "
+              f"{referencia} {cambio}")
+
+    documento = {'metadatos': metadatos(), 'resultados': resultados}
+    if argumentos.salida:
+        argumentos.salida.write_text(json.dumps(documento, indent=2, ensure_ascii=False), encoding='utf-8')
+    if argumentos.guardar_base:
+        argumentos.base.write_text(json.dumps(documento, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+        print(f"\nLínea base guardada en {argumentos.base}")
+        return 0
+
+    if not base:
+        print(f"\nNo hay línea base en {argumentos.base}; créala con --guardar-base")
+        return 0
+
+    regresiones = comparar(resultados, base, argumentos.tolerancia, argumentos.tolerancia_memoria, funciones)
+    if regresiones:
+        print(f"\n{len(regresiones)} regresiones frente a la línea base:")
+        for nombre, medida, anterior, actual in regresiones:
+            if medida == 'tiempo':
+                print(f"  {nombre}: tiempo {anterior * 1e3:.3f} ms -> {actual * 1e3:.3f} ms")
+            else:
+                print(f"  {nombre}: memoria {anterior / 2**20:.2f} MiB -> {actual / 2**20:.2f} MiB")
+        return 1
+
+    print("\nSin regresiones frente a la línea base")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
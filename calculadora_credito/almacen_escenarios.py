@@ -0,0 +1,378 @@
+"""
+Almacén persistente de escenarios de crédito calculados
+
+Los metadatos (parámetros normalizados, cliente, nombre y totales) viven en
+una base SQLite indexada por cliente y por rango de monto, tasa y plazo. Las
+tablas de amortización se guardan aparte, una por archivo Arrow IPC sin
+comprimir con sus columnas en centavos enteros, nombrado por la llave
+normalizada del crédito: dos escenarios con los mismos parámetros comparten
+el archivo.
+
+Al cargar, el archivo se mapea en memoria y la TablaCompacta se arma con
+vistas de solo lectura sobre él, sin copiar ni recalcular nada. Usado como
+respaldo de la caché de cálculos (cache_calculos.respaldo = almacén), toda
+tabla guardada se lee del disco en lugar de calcularse.
+
+El directorio es CALCULADORA_ALMACEN (por defecto ~/.calculadora_credito).
+pyarrow se importa recién al leer o escribir una tabla.
+
+Uso:
+    python calculadora_credito/almacen_escenarios.py guardar 100000 12 30 --seguro 30 --cliente ACME --nombre base
+    python calculadora_credito/almacen_escenarios.py buscar --cliente ACME --monto 50000:200000 --tasa 8:14
+    python calculadora_credito/almacen_escenarios.py exportar CLAVE tabla.parquet
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from nucleo.cache_calculos import cache_calculos, llave_tabla
+from nucleo.sistemas_amortizacion import FRANCES, SISTEMAS, calcular_totales_credito
+from nucleo.tabla_compacta import TablaCompacta
+
+DIRECTORIO_ALMACEN = Path(os.environ.get('CALCULADORA_ALMACEN', Path.home() / '.calculadora_credito'))
+
+ESQUEMA_SQL = """
+CREATE TABLE IF NOT EXISTS tablas (
+    clave TEXT PRIMARY KEY,
+    monto NUMERIC NOT NULL,
+    tasa_anual REAL NOT NULL,
+    plazo_anos INTEGER NOT NULL,
+    cuota_seguro NUMERIC NOT NULL,
+    exacto INTEGER NOT NULL,
+    sistema TEXT NOT NULL,
+    opciones TEXT NOT NULL,
+    meses INTEGER NOT NULL,
+    primera_cuota REAL NOT NULL,
+    total_intereses REAL NOT NULL,
+    total_general REAL NOT NULL,
+    creada TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tablas_parametros ON tablas (monto, tasa_anual, plazo_anos);
+CREATE INDEX IF NOT EXISTS tablas_tasa ON tablas (tasa_anual, plazo_anos);
+CREATE TABLE IF NOT EXISTS escenarios (
+    cliente TEXT NOT NULL,
+    nombre TEXT NOT NULL,
+    clave TEXT NOT NULL REFERENCES tablas (clave),
+    guardado TEXT NOT NULL,
+    PRIMARY KEY (cliente, nombre)
+);
+CREATE INDEX IF NOT EXISTS escenarios_clave ON escenarios (clave);
+CREATE INDEX IF NOT EXISTS escenarios_guardado ON escenarios (guardado);
+"""
+
+# Columnas de búsqueda por rango y su nombre en SQL
+RANGOS = {'monto': 't.monto', 'tasa_anual': 't.tasa_anual', 'plazo_anos': 't.plazo_anos'}
+
+COLUMNAS_ESCENARIO = (
+    'cliente', 'nombre', 'clave', 'guardado', 'monto', 'tasa_anual', 'plazo_anos', 'cuota_seguro',
+    'exacto', 'sistema', 'opciones', 'meses', 'primera_cuota', 'total_intereses', 'total_general',
+)
+
+
+def clave_tabla(llave):
+    """
+    Clave de contenido (y nombre de archivo) de la tabla con la llave normalizada dada
+    """
+    return hashlib.sha256(repr(llave).encode()).hexdigest()
+
+
+def nombre_automatico(monto, tasa_anual, plazo_anos, sistema=FRANCES):
+    """
+    Nombre por defecto de un escenario a partir de sus parámetros
+    """
+    nombre_sistema = SISTEMAS[sistema].nombre if sistema in SISTEMAS else sistema
+    return f"${monto:,.0f} · {tasa_anual:g}% · {plazo_anos} años · {nombre_sistema}"
+
+
+def _tabla_a_arrow(tabla):
+    """
+    Columnas en centavos de la tabla como RecordBatch, con los valores escalares en los metadatos
+    """
+    import pyarrow as pa
+
+    arreglos = tabla.arreglos_centavos()
+    columnas = {nombre: arreglos[nombre] for nombre in ('interes', 'abono_capital', 'saldo_pendiente')}
+    extra = {
+        'cuota_seguro': tabla.cuota_seguro.item() if hasattr(tabla.cuota_seguro, 'item') else tabla.cuota_seguro,
+        'sin_interes': tabla.sin_interes,
+        'cuota_variable': tabla.cuota_variable,
+    }
+    if tabla.cuota_variable:
+        columnas['cuota'] = arreglos['cuota']
+        columnas['pago_total'] = arreglos['pago_total']
+    else:
+        extra['cuota'] = arreglos['cuota'].tolist()
+        extra['pago_total'] = arreglos['pago_total'].tolist()
+    lote = pa.RecordBatch.from_pydict({nombre: pa.array(valores) for nombre, valores in columnas.items()})
+    return lote.replace_schema_metadata({'tabla_compacta': json.dumps(extra)})
+
+
+def _tabla_desde_arrow(lote):
+    """
+    TablaCompacta con vistas sobre las columnas del RecordBatch (sin copiarlas)
+    """
+    extra = json.loads(lote.schema.metadata[b'tabla_compacta'])
+    columnas = {nombre: lote.column(nombre).to_numpy(zero_copy_only=True) for nombre in lote.schema.names}
+    if extra['cuota_variable']:
+        cuota, pago_total = columnas['cuota'], columnas['pago_total']
+    else:
+        cuota = np.array(extra['cuota'], dtype=np.int64)
+        pago_total = np.array(extra['pago_total'], dtype=np.int64)
+    return TablaCompacta.desde_arreglos(
+        columnas['interes'], columnas['abono_capital'], columnas['saldo_pendiente'], cuota, pago_total,
+        extra['cuota_seguro'], extra['sin_interes'], extra['cuota_variable']
+    )
+
+
+class AlmacenEscenarios:
+    """
+    Escenarios guardados en disco: metadatos en SQLite y tablas en archivos Arrow mapeados en memoria
+
+    Cada operación abre su propia conexión, así que una misma instancia se
+    puede usar desde varias sesiones e hilos (y varios procesos pueden
+    compartir el directorio).
+    """
+
+    def __init__(self, directorio=DIRECTORIO_ALMACEN):
+        self.directorio = Path(directorio)
+        self.directorio_tablas = self.directorio / 'tablas'
+        self.directorio_tablas.mkdir(parents=True, exist_ok=True)
+        self.ruta_base = self.directorio / 'escenarios.sqlite'
+        with closing(self._conectar()) as conexion:
+            conexion.execute('PRAGMA journal_mode=WAL')
+            conexion.executescript(ESQUEMA_SQL)
+
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta_base, timeout=30)
+        conexion.row_factory = sqlite3.Row
+        return conexion
+
+    def ruta_tabla(self, clave):
+        return self.directorio_tablas / f'{clave}.arrow'
+
+    def _escribir_tabla(self, clave, tabla):
+        """
+        Escribe el archivo de la tabla de forma atómica, salvo que ya exista uno legible
+        """
+        import pyarrow as pa
+
+        ruta = self.ruta_tabla(clave)
+        if ruta.exists() and self.cargar(clave) is not None:
+            return
+        lote = _tabla_a_arrow(tabla)
+        temporal = ruta.with_name(ruta.name + f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        with pa.OSFile(str(temporal), 'wb') as archivo:
+            with pa.ipc.new_file(archivo, lote.schema) as escritor:
+                escritor.write_batch(lote)
+        os.replace(temporal, ruta)
+
+    def cargar(self, clave):
+        """
+        Tabla compacta guardada con la clave dada, leída por mapeo en memoria, o None
+
+        Un archivo que falta o no se puede leer (dañado, o de otro formato) se
+        trata como una tabla no guardada: quien llama la vuelve a calcular.
+        """
+        import pyarrow as pa
+
+        try:
+            archivo = pa.memory_map(str(self.ruta_tabla(clave)))
+            return _tabla_desde_arrow(pa.ipc.open_file(archivo).get_batch(0))
+        except (OSError, ValueError, KeyError):
+            # pa.ArrowInvalid es un ValueError
+            return None
+
+    def cargar_tabla(self, llave):
+        """
+        Tabla guardada con la llave normalizada de llave_tabla, o None (respaldo de la caché)
+        """
+        return self.cargar(clave_tabla(llave))
+
+    def guardar(self, monto, tasa_anual, plazo_anos, cuota_seguro=0, exacto=False, sistema=FRANCES,
+                opciones=None, cliente=None, nombre=None, tabla=None):
+        """
+        Guarda la tabla del crédito y, si se da un cliente, el escenario con su nombre
+
+        Sin tabla se toma de la caché de cálculos. Un escenario con el mismo
+        cliente y nombre se reemplaza. Devuelve la clave de la tabla.
+        """
+        llave = llave_tabla(monto, tasa_anual, plazo_anos, cuota_seguro, exacto, sistema, opciones)
+        clave = clave_tabla(llave)
+        if tabla is None:
+            tabla = cache_calculos.tabla_compacta(monto, tasa_anual, plazo_anos, cuota_seguro, exacto,
+                                                  sistema, opciones)
+        self._escribir_tabla(clave, tabla)
+
+        monto, tasa_anual, plazo_anos, cuota_seguro = llave[2:6]
+        # Los mismos totales que la página de resumen de la aplicación
+        totales = calcular_totales_credito(tabla, monto, tasa_anual, plazo_anos, cuota_seguro, exacto, llave[6])
+        ahora = datetime.now().isoformat(timespec='seconds')
+        with closing(self._conectar()) as conexion, conexion:
+            # Si la tabla ya estaba se conserva su fecha y se actualizan los totales
+            conexion.execute(
+                'INSERT INTO tablas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (clave) DO UPDATE SET '
+                'primera_cuota = excluded.primera_cuota, total_intereses = excluded.total_intereses, '
+                'total_general = excluded.total_general',
+                (clave, monto, tasa_anual, plazo_anos, cuota_seguro, int(exacto), llave[6],
+                 json.dumps(dict(llave[7:])), len(tabla),
+                 round(float(totales['cuota_mensual']), 2), round(float(totales['intereses_pagados']), 2),
+                 round(float(totales['total_general']), 2), ahora)
+            )
+            if cliente:
+                conexion.execute(
+                    'INSERT OR REPLACE INTO escenarios VALUES (?, ?, ?, ?)',
+                    (cliente, nombre or nombre_automatico(monto, tasa_anual, plazo_anos, llave[6]), clave, ahora)
+                )
+        return clave
+
+    def buscar(self, cliente=None, monto=None, tasa_anual=None, plazo_anos=None, sistema=None, limite=None):
+        """
+        Escenarios guardados, del más reciente al más antiguo, como lista de diccionarios
+
+        monto, tasa_anual y plazo_anos son rangos (mínimo, máximo) inclusivos;
+        cualquiera de los extremos puede ser None.
+        """
+        condiciones, valores = [], []
+        if cliente is not None:
+            condiciones.append('e.cliente = ?')
+            valores.append(cliente)
+        if sistema is not None:
+            condiciones.append('t.sistema = ?')
+            valores.append(sistema)
+        for nombre, rango in (('monto', monto), ('tasa_anual', tasa_anual), ('plazo_anos', plazo_anos)):
+            if rango is None:
+                continue
+            minimo, maximo = rango
+            if minimo is not None:
+                condiciones.append(f'{RANGOS[nombre]} >= ?')
+                valores.append(minimo)
+            if maximo is not None:
+                condiciones.append(f'{RANGOS[nombre]} <= ?')
+                valores.append(maximo)
+
+        consulta = (
+            'SELECT e.cliente, e.nombre, e.clave, e.guardado, t.monto, t.tasa_anual, t.plazo_anos, '
+            't.cuota_seguro, t.exacto, t.sistema, t.opciones, t.meses, t.primera_cuota, '
+            't.total_intereses, t.total_general '
+            'FROM escenarios e JOIN tablas t ON t.clave = e.clave'
+        )
+        if condiciones:
+            consulta += ' WHERE ' + ' AND '.join(condiciones)
+        consulta += ' ORDER BY e.guardado DESC, e.cliente, e.nombre'
+        if limite is not None:
+            consulta += ' LIMIT ?'
+            valores.append(int(limite))
+
+        with closing(self._conectar()) as conexion:
+            filas = conexion.execute(consulta, valores).fetchall()
+        escenarios = []
+        for fila in filas:
+            escenario = dict(fila)
+            escenario['exacto'] = bool(escenario['exacto'])
+            escenario['opciones'] = json.loads(escenario['opciones'])
+            escenarios.append(escenario)
+        return escenarios
+
+    def clientes(self):
+        """
+        Clientes con al menos un escenario guardado, en orden alfabético
+        """
+        with closing(self._conectar()) as conexion:
+            return [fila[0] for fila in conexion.execute('SELECT DISTINCT cliente FROM escenarios ORDER BY cliente')]
+
+    def eliminar(self, cliente, nombre):
+        """
+        Borra un escenario; la tabla se conserva porque otros escenarios pueden compartirla
+        """
+        with closing(self._conectar()) as conexion, conexion:
+            return conexion.execute(
+                'DELETE FROM escenarios WHERE cliente = ? AND nombre = ?', (cliente, nombre)
+            ).rowcount > 0
+
+
+def _rango(texto):
+    """
+    Convierte 'mínimo:máximo' (cualquiera de los dos puede faltar) en una tupla de números
+    """
+    minimo, _, maximo = texto.partition(':')
+    try:
+        return (float(minimo) if minimo else None, float(maximo) if maximo else None)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"rango inválido: {texto} (use mínimo:máximo)") from None
+
+
+def _opcion(texto):
+    nombre, _, valor = texto.partition('=')
+    try:
+        return nombre, float(valor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"opción inválida: {texto} (use nombre=valor)") from None
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Guarda, busca y exporta escenarios de crédito calculados.")
+    parser.add_argument('--almacen', default=DIRECTORIO_ALMACEN,
+                        help=f"directorio del almacén (por defecto {DIRECTORIO_ALMACEN})")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    guardar = comandos.add_parser('guardar', help="calcula (o reutiliza) y guarda un escenario")
+    guardar.add_argument('monto', type=float)
+    guardar.add_argument('tasa_anual', type=float)
+    guardar.add_argument('plazo_anos', type=int)
+    guardar.add_argument('--seguro', type=float, default=0.0, help="cuota mensual de seguro")
+    guardar.add_argument('--exacto', action='store_true', help="cálculo exacto en centavos")
+    guardar.add_argument('--sistema', default=FRANCES, choices=list(SISTEMAS))
+    guardar.add_argument('--opcion', type=_opcion, action='append', default=[],
+                         help="opción del sistema como nombre=valor (por ejemplo meses_gracia=12)")
+    guardar.add_argument('--cliente', required=True)
+    guardar.add_argument('--nombre')
+
+    buscar = comandos.add_parser('buscar', help="lista escenarios guardados en CSV")
+    buscar.add_argument('--cliente')
+    buscar.add_argument('--sistema', choices=list(SISTEMAS))
+    buscar.add_argument('--monto', type=_rango, help="rango mínimo:máximo")
+    buscar.add_argument('--tasa', type=_rango, help="rango mínimo:máximo de la tasa anual (%%)")
+    buscar.add_argument('--plazo', type=_rango, help="rango mínimo:máximo del plazo en años")
+    buscar.add_argument('--limite', type=int)
+
+    exportar = comandos.add_parser('exportar', help="escribe la tabla de un escenario (.csv, .parquet o .xlsx)")
+    exportar.add_argument('clave')
+    exportar.add_argument('salida')
+    args = parser.parse_args(argumentos)
+
+    try:
+        almacen = AlmacenEscenarios(args.almacen)
+        if args.comando == 'guardar':
+            print(almacen.guardar(args.monto, args.tasa_anual, args.plazo_anos, args.seguro, args.exacto, args.sistema,
+                                  dict(args.opcion), args.cliente, args.nombre))
+        elif args.comando == 'buscar':
+            escritor = csv.DictWriter(sys.stdout, COLUMNAS_ESCENARIO)
+            escritor.writeheader()
+            for escenario in almacen.buscar(args.cliente, args.monto, args.tasa, args.plazo, args.sistema,
+                                            args.limite):
+                escenario['opciones'] = json.dumps(escenario['opciones'])
+                escritor.writerow(escenario)
+        else:
+            from exportaciones import EscritorTablas, esquema_tabla
+
+            tabla = almacen.cargar(args.clave)
+            if tabla is None:
+                parser.exit(1, f"Error: no hay una tabla guardada con la clave {args.clave}\n")
+            with EscritorTablas(args.salida, esquema_tabla()) as escritor:
+                escritor.escribir(tabla.a_dataframe())
+    except (OSError, ValueError, sqlite3.Error) as error:
+        parser.exit(1, f"Error: {error}\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""
+API HTTP (JSON) para calcular cuotas, tablas de amortización y datos anuales
+
+Cada solicitud puede traer un lote de préstamos. El servidor (tornado) solo
+recibe y responde; el cálculo, la serialización y la compresión se hacen en
+un grupo de procesos, así una tabla grande no detiene las demás solicitudes.
+
+Rutas (todas POST con {"prestamos": [{"monto", "tasa_anual", "plazo_anos",
+"cuota_seguro"}, ...], "exacto": false}):
+
+    /cuota   cuota mensual de cada préstamo
+    /tabla   tabla de amortización de cada préstamo
+    /anual   capital, intereses y seguros pagados por año
+
+Las respuestas son JSON, o Arrow IPC (formato largo con la columna
+'Préstamo') si se pide con ?formato=arrow o Accept: application/vnd.apache.arrow.stream.
+Con Accept-Encoding: gzip las respuestas grandes se comprimen.
+
+Uso: python calculadora_credito/api.py --puerto 8600 --procesos 2
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from tornado.web import Application, RequestHandler
+
+from nucleo.amortizacion_centavos import calcular_cuota_centavos
+from nucleo.cache_calculos import obtener_datos_anuales, obtener_tabla_compacta
+from nucleo.cartera import calcular_cuotas_cartera
+from nucleo.comparacion import LIMITES_PARAMETROS
+from nucleo.tabla_compacta import COLUMNAS_TABLA
+
+PUERTO = 8600
+PROCESOS = 2
+
+MAX_PRESTAMOS = 1000
+MAX_PLAZO_ANOS = 50
+
+# Respuestas más pequeñas que esto no se comprimen
+BYTES_MINIMOS_GZIP = 1024
+
+TIPO_JSON = 'application/json; charset=UTF-8'
+TIPO_ARROW = 'application/vnd.apache.arrow.stream'
+
+COLUMNAS_ANUALES = ['Año', 'Capital', 'Intereses', 'Seguros']
+
+
+def leer_solicitud(cuerpo):
+    """
+    Valida el cuerpo JSON y devuelve (lista de (monto, tasa, plazo, seguro), exacto)
+    """
+    try:
+        datos = json.loads(cuerpo)
+    except ValueError:
+        raise ValueError("El cuerpo de la solicitud no es JSON válido")
+
+    prestamos = datos.get('prestamos') if isinstance(datos, dict) else None
+    if not isinstance(prestamos, list) or not prestamos:
+        raise ValueError("Se espera un objeto con una lista 'prestamos' no vacía")
+    if len(prestamos) > MAX_PRESTAMOS:
+        raise ValueError(f"Como máximo {MAX_PRESTAMOS} préstamos por solicitud")
+
+    exacto = datos.get('exacto', False)
+    if not isinstance(exacto, bool):
+        raise ValueError("'exacto' debe ser true o false")
+
+    parametros = []
+    for posicion, prestamo in enumerate(prestamos):
+        try:
+            # true/false son int en Python: no se aceptan como números
+            if any(isinstance(prestamo.get(campo), bool) for campo in ('monto', 'tasa_anual', 'cuota_seguro')):
+                raise TypeError
+            monto = float(prestamo['monto'])
+            tasa_anual = float(prestamo['tasa_anual'])
+            plazo_anos = prestamo['plazo_anos']
+            cuota_seguro = float(prestamo.get('cuota_seguro', 0))
+        except (AttributeError, KeyError, TypeError, ValueError):
+            raise ValueError(f"Préstamo {posicion}: se requieren monto, tasa_anual y plazo_anos numéricos")
+        if isinstance(plazo_anos, bool) or not isinstance(plazo_anos, int) or not 1 <= plazo_anos <= MAX_PLAZO_ANOS:
+            raise ValueError(f"Préstamo {posicion}: plazo_anos debe ser un entero entre 1 y {MAX_PLAZO_ANOS}")
+        # Mismos rangos que la interfaz; NaN no cumple ninguna comparación
+        for parametro, valor in (('monto', monto), ('tasa_anual', tasa_anual), ('cuota_seguro', cuota_seguro)):
+            minimo, maximo = LIMITES_PARAMETROS[parametro]
+            if not minimo <= valor <= maximo:
+                raise ValueError(f"Préstamo {posicion}: {parametro} debe estar entre {minimo:,} y {maximo:,}")
+        parametros.append((monto, tasa_anual, plazo_anos, cuota_seguro))
+
+    return parametros, exacto
+
+
+def _cuotas(prestamos, exacto):
+    if exacto:
+        return [calcular_cuota_centavos(*prestamo[:3]) / 100 for prestamo in prestamos]
+    montos, tasas_anuales, plazos_anos, _ = zip(*prestamos)
+    return calcular_cuotas_cartera(montos, tasas_anuales, plazos_anos).tolist()
+
+
+def _tablas(prestamos, exacto):
+    tablas = [obtener_tabla_compacta(*prestamo, exacto) for prestamo in prestamos]
+    return [{columna: tabla.columna(columna) for columna in COLUMNAS_TABLA} for tabla in tablas]
+
+
+def _anuales(prestamos, exacto):
+    anuales = [obtener_datos_anuales(*prestamo, exacto) for prestamo in prestamos]
+    return [{columna: datos[columna].to_numpy() for columna in COLUMNAS_ANUALES} for datos in anuales]
+
+
+def _a_arrow(columnas_por_prestamo):
+    """
+    Une las columnas de cada préstamo en una tabla larga y la serializa como Arrow IPC
+    """
+    import pyarrow as pa
+
+    filas = [len(next(iter(columnas.values()))) for columnas in columnas_por_prestamo]
+    tabla = {'Préstamo': np.repeat(np.arange(len(filas)), filas)}
+    for columna in columnas_por_prestamo[0]:
+        tabla[columna] = np.concatenate([np.asarray(columnas[columna]) for columnas in columnas_por_prestamo])
+    tabla = pa.table(tabla)
+
+    destino = pa.BufferOutputStream()
+    with pa.ipc.new_stream(destino, tabla.schema) as escritor:
+        escritor.write_table(tabla)
+    return destino.getvalue().to_pybytes()
+
+
+def calcular_respuesta(operacion, prestamos, exacto, formato, comprimir):
+    """
+    Calcula y serializa la respuesta de una solicitud; se ejecuta en un proceso trabajador
+
+    Devuelve (bytes del cuerpo, si va comprimido con gzip).
+    """
+    if operacion == 'cuota':
+        cuotas = _cuotas(prestamos, exacto)
+        if formato == 'arrow':
+            cuerpo = _a_arrow([{'Cuota': [cuota]} for cuota in cuotas])
+        else:
+            cuerpo = json.dumps({'cuotas': cuotas}).encode()
+    else:
+        columnas = _tablas(prestamos, exacto) if operacion == 'tabla' else _anuales(prestamos, exacto)
+        if formato == 'arrow':
+            cuerpo = _a_arrow(columnas)
+        else:
+            llave = 'tablas' if operacion == 'tabla' else 'anuales'
+            cuerpo = json.dumps({llave: [
+                {columna: valores.tolist() for columna, valores in tabla.items()} for tabla in columnas
+            ]}, ensure_ascii=False).encode()
+
+    if comprimir and len(cuerpo) >= BYTES_MINIMOS_GZIP:
+        return gzip.compress(cuerpo, compresslevel=6), True
+    return cuerpo, False
+
+
+class ManejadorCalculo(RequestHandler):
+    """
+    Atiende una operación de cálculo delegando el trabajo al grupo de procesos
+    """
+
+    def initialize(self, operacion, grupo):
+        self.operacion = operacion
+        self.grupo = grupo
+
+    async def post(self):
+        try:
+            prestamos, exacto = leer_solicitud(self.request.body)
+        except ValueError as error:
+            self.set_status(400)
+            self.finish({'error': str(error)})
+            return
+
+        formato = 'arrow' if (
+            self.get_query_argument('formato', '') == 'arrow'
+            or TIPO_ARROW in self.request.headers.get('Accept', '')
+        ) else 'json'
+        comprimir = 'gzip' in self.request.headers.get('Accept-Encoding', '')
+
+        try:
+            cuerpo, comprimido = await asyncio.get_running_loop().run_in_executor(
+                self.grupo, calcular_respuesta, self.operacion, prestamos, exacto, formato, comprimir
+            )
+        except ValueError as error:
+            # Parámetros válidos por separado que el cálculo no puede representar
+            self.set_status(422)
+            self.finish({'error': str(error)})
+            return
+
+        self.set_header('Content-Type', TIPO_ARROW if formato == 'arrow' else TIPO_JSON)
+        self.set_header('Vary', 'Accept-Encoding')
+        if comprimido:
+            self.set_header('Content-Encoding', 'gzip')
+        self.finish(cuerpo)
+
+    def write_error(self, status_code, **kwargs):
+        """
+        Cualquier otro error (un trabajador caído, un fallo inesperado) se responde en JSON, no en HTML
+        """
+        self.set_header('Content-Type', TIPO_JSON)
+        self.finish({'error': self._reason})
+
+
+class ManejadorSalud(RequestHandler):
+    """
+    Responde si el servidor está atendiendo
+    """
+
+    def get(self):
+        self.finish({'estado': 'ok'})
+
+
+def crear_aplicacion(grupo):
+    """
+    Aplicación tornado con las rutas de cálculo atendidas por el grupo de procesos dado
+    """
+    return Application([
+        (r'/cuota', ManejadorCalculo, {'operacion': 'cuota', 'grupo': grupo}),
+        (r'/tabla', ManejadorCalculo, {'operacion': 'tabla', 'grupo': grupo}),
+        (r'/anual', ManejadorCalculo, {'operacion': 'anual', 'grupo': grupo}),
+        (r'/salud', ManejadorSalud),
+    ])
+
+
+async def servir(puerto=PUERTO, procesos=PROCESOS):
+    """
+    Atiende solicitudes hasta que se cancele la tarea
+    """
+    # 'spawn' igual que en tareas_pdf: el bucle de eventos puede tener hilos
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context('spawn')) as grupo:
+        servidor = crear_aplicacion(grupo).listen(puerto)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            servidor.stop()
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="API HTTP de la calculadora de crédito.")
+    parser.add_argument('--puerto', type=int, default=PUERTO, help=f"puerto (por defecto {PUERTO})")
+    parser.add_argument('--procesos', type=int, default=PROCESOS,
+                        help=f"procesos de cálculo (por defecto {PROCESOS})")
+    args = parser.parse_args(argumentos)
+
+    print(f"API de la calculadora en http://localhost:{args.puerto}")
+    try:
+        asyncio.run(servir(args.puerto, args.procesos))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,58 @@
+import os
+
 import streamlit as st
-import pandas as pd
-import numpy as np
-import altair as alt
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
-import io
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
+
+from nucleo import (
+    cache_calculos,
+    calcular_totales_credito,
+    normalizar_parametros,
+    obtener_datos_anuales,
+    obtener_indice_amortizacion,
+    obtener_malla_sensibilidad,
+    obtener_tabla_compacta,
+)
+from nucleo.abonos_extra import REDUCIR_CUOTA, REDUCIR_PLAZO, SimuladorAbonos
+from nucleo.comparacion import LIMITES_PARAMETROS, ComparadorCreditos
+from nucleo.escenarios_tasa import CAMINATA, VASICEK, resumir_escenarios, simular_escenarios_tasa
+from nucleo.sensibilidad import buscar_en_malla
+from nucleo.sistemas_amortizacion import FRANCES, SISTEMAS, normalizar_sistema
+from formato import (
+    configuracion_columnas_comparacion,
+    configuracion_columnas_escenarios,
+    configuracion_columnas_resumen_anual,
+    configuracion_columnas_tabla,
+    configuracion_columnas_tabla_abonos,
+    periodos_tabla,
+)
+from exportaciones import (
+    FORMATOS,
+    clave_exportacion,
+    clave_exportacion_escenarios,
+    exportar_escenarios,
+    exportar_tabla,
+    formatos_disponibles,
+    obtener_exportacion,
+)
+from perfilado import (
+    RUTA_METRICAS,
+    activado_por_entorno,
+    ejecutar_con_cprofile,
+    etapa,
+    iniciar_rerun,
+    terminar_rerun,
+)
+from graficos import (
+    figura_anual,
+    figura_comparacion,
+    figura_escenarios,
+    figura_en_cache,
+    figura_mensual,
+    figura_saldos_abonos,
+    figura_sensibilidad,
+    mostrar_figura,
+)
+from tareas_pdf import clave_pdf, obtener_pdf, solicitar_pdf
 
 # Configuración de la página
 st.set_page_config(
@@ -53,188 +96,237 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def calcular_cuota_mensual(monto, tasa_anual, plazo_anos):
-    """
-    Calcula la cuota mensual usando la fórmula de amortización estándar
-    """
-    if tasa_anual == 0:
-        return monto / (plazo_anos * 12)
-    
-    tasa_mensual = tasa_anual / 100 / 12
-    num_pagos = plazo_anos * 12
-    
-    cuota = monto * (tasa_mensual * (1 + tasa_mensual)**num_pagos) / ((1 + tasa_mensual)**num_pagos - 1)
-    return cuota
-
-def generar_tabla_amortizacion(monto, tasa_anual, plazo_anos, cuota_seguro=0):
-    """
-    Genera la tabla de amortización completa con cálculos precisos
-    """
-    cuota_mensual = calcular_cuota_mensual(monto, tasa_anual, plazo_anos)
-    tasa_mensual = tasa_anual / 100 / 12
-    num_pagos = plazo_anos * 12
-    
-    tabla = []
-    saldo_pendiente = monto
-    
-    for mes in range(1, num_pagos + 1):
-        if tasa_anual == 0:
-            interes = 0
-            abono_capital = cuota_mensual
-        else:
-            interes = saldo_pendiente * tasa_mensual
-            abono_capital = cuota_mensual - interes
-        
-        # Para el último pago, ajustar para que el saldo sea exactamente 0
-        if mes == num_pagos:
-            abono_capital = saldo_pendiente
-            cuota_ajustada = interes + abono_capital
-        else:
-            cuota_ajustada = cuota_mensual
-        
-        saldo_pendiente -= abono_capital
-        
-        # Asegurar que el saldo no sea negativo
-        if saldo_pendiente < 0.01:
-            saldo_pendiente = 0
-        
-        tabla.append({
-            'Mes': mes,
-            'Cuota Crédito': round(cuota_ajustada, 2),
-            'Interés': round(interes, 2),
-            'Abono Capital': round(abono_capital, 2),
-            'Seguro': round(cuota_seguro, 2),
-            'Pago Total': round(cuota_ajustada + cuota_seguro, 2),
-            'Saldo Pendiente': round(saldo_pendiente, 2)
-        })
-    
-    return pd.DataFrame(tabla)
-
-def generar_datos_anuales(tabla_amortizacion, cuota_seguro):
-    """
-    Genera datos agregados por año para el gráfico de barras apiladas
-    """
-    # Crear una copia para no modificar la tabla original
-    tabla_copia = tabla_amortizacion.copy()
-    
-    # Agregar columna de año
-    tabla_copia['Año'] = ((tabla_copia['Mes'] - 1) // 12) + 1
-    
-    # Agrupar por año y sumar
-    datos_anuales = tabla_copia.groupby('Año').agg({
-        'Abono Capital': 'sum',
-        'Interés': 'sum',
-        'Seguro': 'sum'
-    }).reset_index()
-    
-    # Renombrar columnas para mejor presentación
-    datos_anuales.columns = ['Año', 'Capital', 'Intereses', 'Seguros']
-    
-    return datos_anuales
-
-def generar_pdf_tabla_amortizacion(tabla_amortizacion, monto, tasa_anual, plazo_anos, cuota_seguro):
-    """
-    Genera un PDF con la tabla de amortización
-    """
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Título
-    title = Paragraph("Tabla de Amortización", styles['Title'])
-    story.append(title)
-    story.append(Spacer(1, 12))
-    
-    # Información del crédito
-    info_text = f"""
-    <b>Información del Crédito:</b><br/>
-    Monto: ${monto:,.2f}<br/>
-    Tasa Anual: {tasa_anual:.2f}%<br/>
-    Plazo: {plazo_anos} años<br/>
-    Seguro Mensual: ${cuota_seguro:,.2f}
-    """
-    info = Paragraph(info_text, styles['Normal'])
-    story.append(info)
-    story.append(Spacer(1, 12))
-    
-    # Preparar datos para la tabla
-    data = [['Mes', 'Cuota Crédito', 'Interés', 'Abono Capital', 'Seguro', 'Pago Total', 'Saldo Pendiente']]
-    
-    for _, row in tabla_amortizacion.iterrows():
-        data.append([
-            str(int(row['Mes'])),
-            f"${row['Cuota Crédito']:,.2f}",
-            f"${row['Interés']:,.2f}",
-            f"${row['Abono Capital']:,.2f}",
-            f"${row['Seguro']:,.2f}",
-            f"${row['Pago Total']:,.2f}",
-            f"${row['Saldo Pendiente']:,.2f}"
-        ])
-    
-    # Crear tabla
-    table = Table(data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    story.append(table)
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+# Valores iniciales de los controles del crédito. Van en session_state (y no
+# en value=) para que cargar un escenario guardado pueda cambiarlos
+VALORES_INICIALES = {'monto': 100000, 'tasa_anual': 12.0, 'plazo_anos': 5, 'cuota_seguro': 30}
 
 def obtener_parametros_credito():
     """
     Obtiene los parámetros del crédito desde el sidebar
     """
     st.sidebar.header("📝 Parámetros del Crédito")
+    for llave, valor in VALORES_INICIALES.items():
+        st.session_state.setdefault(llave, valor)
     
     monto = st.sidebar.number_input(
         "Monto del préstamo ($)",
         min_value=1000,
         max_value=10000000,
-        value=100000,
         step=1000,
-        help="Ingresa el monto del préstamo (entre $1,000 y $10,000,000)"
+        help="Ingresa el monto del préstamo (entre $1,000 y $10,000,000)",
+        key="monto"
     )
     
     tasa_anual = st.sidebar.number_input(
         "Tasa de interés anual (%)",
         min_value=0.0,
         max_value=50.0,
-        value=12.0,
         step=0.1,
-        help="Ingresa la tasa de interés anual (entre 0% y 50%)"
+        help="Ingresa la tasa de interés anual (entre 0% y 50%)",
+        key="tasa_anual"
     )
     
     plazo_anos = st.sidebar.number_input(
         "Plazo en años",
         min_value=1,
         max_value=30,
-        value=5,
         step=1,
-        help="Ingresa el plazo del crédito (entre 1 y 30 años)"
+        help="Ingresa el plazo del crédito (entre 1 y 30 años)",
+        key="plazo_anos"
     )
     
     cuota_seguro = st.sidebar.number_input(
         "Cuota mensual de seguro ($)",
         min_value=0,
         max_value=500,
-        value=30,
         step=5,
-        help="Ingresa la cuota mensual de seguro (entre $0 y $500)"
+        help="Ingresa la cuota mensual de seguro (entre $0 y $500)",
+        key="cuota_seguro"
     )
     
     return monto, tasa_anual, plazo_anos, cuota_seguro
 
+def obtener_sistema_amortizacion():
+    """
+    Sistema de amortización y sus opciones, con un control por cada opción que declare el sistema
+    """
+    sistema = st.sidebar.selectbox(
+        "Sistema de amortización",
+        list(SISTEMAS),
+        format_func=lambda clave: SISTEMAS[clave].nombre,
+        key="sistema_amortizacion",
+        help="\n\n".join(f"**{sistema.nombre}:** {sistema.descripcion}" for sistema in SISTEMAS.values())
+    )
+    opciones = {}
+    for nombre, definicion in SISTEMAS[sistema].opciones.items():
+        st.session_state.setdefault(f"sistema_{sistema}_{nombre}", definicion['valor'])
+        opciones[nombre] = st.sidebar.number_input(
+            definicion['etiqueta'],
+            min_value=definicion['minimo'],
+            max_value=definicion['maximo'],
+            step=definicion['paso'],
+            help=definicion['ayuda'],
+            key=f"sistema_{sistema}_{nombre}"
+        )
+    return sistema, opciones
+
+# Escenarios guardados que se listan en el sidebar (los más recientes)
+ESCENARIOS_LISTADOS = 50
+
+@st.cache_resource
+def obtener_almacen():
+    """
+    Almacén de escenarios compartido por las sesiones; también respalda la caché de cálculos
+
+    Se importa y se crea en disco solo cuando se usa por primera vez.
+    """
+    from almacen_escenarios import AlmacenEscenarios
+
+    almacen = AlmacenEscenarios()
+    cache_calculos.respaldo = almacen
+    return almacen
+
+def almacen_en_disco():
+    """
+    Devuelve el almacén si ya existe en disco (sin crearlo), o None
+    """
+    from almacen_escenarios import DIRECTORIO_ALMACEN
+
+    return obtener_almacen() if DIRECTORIO_ALMACEN.exists() else None
+
+def cargar_escenario(escenario):
+    """
+    Pasa los parámetros de un escenario guardado a los controles del sidebar y pide calcularlo
+    """
+    st.session_state.monto = escenario['monto']
+    st.session_state.tasa_anual = float(escenario['tasa_anual'])
+    st.session_state.plazo_anos = escenario['plazo_anos']
+    st.session_state.cuota_seguro = escenario['cuota_seguro']
+    st.session_state.calculo_exacto = escenario['exacto']
+    st.session_state.sistema_amortizacion = escenario['sistema']
+    for nombre, valor in escenario['opciones'].items():
+        st.session_state[f"sistema_{escenario['sistema']}_{nombre}"] = valor
+    st.session_state.calcular_escenario = True
+
+def mostrar_escenarios_guardados():
+    """
+    Guarda el último cálculo como escenario de un cliente y busca o carga escenarios guardados
+    """
+    with st.sidebar.expander("💾 Escenarios guardados"):
+        cliente = st.text_input("Cliente", key="escenario_cliente").strip()
+        nombre = st.text_input("Nombre del escenario", key="escenario_nombre",
+                               placeholder="Automático según los parámetros").strip()
+        calculado = 'parametros' in st.session_state
+        if st.button("💾 Guardar último cálculo", disabled=not (calculado and cliente),
+                     help="Calcula primero y escribe el nombre del cliente"):
+            parametros = st.session_state.parametros
+            obtener_almacen().guardar(
+                parametros['monto'], parametros['tasa_anual'], parametros['plazo_anos'],
+                parametros['cuota_seguro'], parametros['exacto'], parametros['sistema'],
+                parametros['opciones'], cliente, nombre or None, st.session_state.tabla_amortizacion
+            )
+            st.success(f"✅ Escenario guardado para {cliente}")
+
+        st.markdown("---")
+        almacen = almacen_en_disco()
+        if almacen is None:
+            st.caption("No hay escenarios guardados")
+            return
+        filtro = st.selectbox("Buscar por cliente", ["Todos"] + almacen.clientes(), key="escenario_filtro")
+        guardados = almacen.buscar(cliente=None if filtro == "Todos" else filtro, limite=ESCENARIOS_LISTADOS)
+        if not guardados:
+            st.caption("No hay escenarios guardados")
+            return
+        elegido = st.selectbox(
+            "Escenario",
+            range(len(guardados)),
+            format_func=lambda i: f"{guardados[i]['cliente']} · {guardados[i]['nombre']}",
+            key="escenario_elegido"
+        )
+        st.button("📂 Cargar escenario", on_click=cargar_escenario, args=(guardados[elegido],))
+
+# Desde este número de trayectorias la simulación se reparte entre procesos;
+# con menos, arrancar los procesos cuesta más que simular
+TRAYECTORIAS_EN_PARALELO = 20000
+
+def obtener_parametros_escenarios():
+    """
+    Obtiene del sidebar la configuración de la simulación de escenarios de tasa, o None
+    """
+    with st.sidebar.expander("🎲 Escenarios de tasa (Monte Carlo)"):
+        simular = st.checkbox(
+            "Simular escenarios de tasa variable",
+            value=False,
+            help="Simula muchas trayectorias de la tasa y muestra la distribución de intereses y cuotas"
+        )
+        modelo = st.selectbox(
+            "Modelo de tasa",
+            [VASICEK, CAMINATA],
+            format_func={VASICEK: "Vasicek (reversión a la media)", CAMINATA: "Caminata aleatoria"}.get
+        )
+        num_trayectorias = st.select_slider("Trayectorias", [1000, 5000, 10000, 50000, 100000], value=5000)
+        volatilidad = st.number_input("Volatilidad anual (puntos %)", min_value=0.0, max_value=10.0, value=1.0, step=0.1)
+        cada_meses = st.selectbox("Revisión de tasa", [12, 6], format_func={12: "Anual", 6: "Semestral"}.get)
+        semilla = st.number_input("Semilla", min_value=0, value=0, step=1)
+    
+    if not simular:
+        return None
+    return {
+        'modelo': modelo,
+        'num_trayectorias': num_trayectorias,
+        'volatilidad': volatilidad,
+        'cada_meses': cada_meses,
+        'semilla': int(semilla),
+    }
+
+def mostrar_escenarios_tasa(monto, tasa_anual, plazo_anos, cuota_mensual, intereses_pagados, escenarios):
+    """
+    Percentiles de intereses y cuotas bajo escenarios de tasa, con gráfico de abanico
+    """
+    st.markdown("## 🎲 Escenarios de Tasa")
+    
+    procesos = min(4, os.cpu_count() or 1) if escenarios['num_trayectorias'] >= TRAYECTORIAS_EN_PARALELO else None
+    with st.spinner(f"Simulando {escenarios['num_trayectorias']:,} trayectorias..."):
+        resultados = simular_escenarios_tasa(
+            monto, tasa_anual, plazo_anos,
+            num_trayectorias=escenarios['num_trayectorias'],
+            modelo=escenarios['modelo'],
+            volatilidad=escenarios['volatilidad'],
+            cada_meses=escenarios['cada_meses'],
+            semilla=escenarios['semilla'],
+            procesos=procesos
+        )
+        resumen = resumir_escenarios(resultados, plazo_anos, escenarios['cada_meses'])
+    
+    percentiles = resumen['percentiles']
+    mediana = percentiles.index(50)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("📊 Intereses (mediana)", f"${resumen['intereses_pagados'][mediana]:,.0f}",
+                  delta=f"${resumen['intereses_pagados'][mediana] - intereses_pagados:,.0f}", delta_color="inverse")
+    with col2:
+        st.metric(f"⚠️ Intereses (percentil {percentiles[-1]})", f"${resumen['intereses_pagados'][-1]:,.0f}")
+    with col3:
+        st.metric(f"💵 Cuota máxima (percentil {percentiles[-1]})", f"${resumen['cuota_maxima'][-1]:,.0f}")
+    
+    # Gráfico de abanico de la cuota mensual
+    llave_figura = ('escenarios', monto, tasa_anual, plazo_anos) + tuple(sorted(escenarios.items()))
+    mostrar_figura(figura_en_cache(
+        llave_figura, lambda: figura_escenarios(resumen, cuota_mensual, escenarios['cada_meses'])
+    ))
+    
+    st.dataframe(
+        {
+            'Percentil': [f"P{p}" for p in percentiles],
+            'Intereses pagados': resumen['intereses_pagados'],
+            'Cuota máxima': resumen['cuota_maxima'],
+        },
+        width='stretch',
+        hide_index=True,
+        column_config=configuracion_columnas_escenarios()
+    )
+
 def pagina_entrada_datos_resumen():
     """
     Página de entrada de datos, resumen y gráfico
@@ -243,6 +335,15 @@ def pagina_entrada_datos_resumen():
     
     # Obtener parámetros
     monto, tasa_anual, plazo_anos, cuota_seguro = obtener_parametros_credito()
+    sistema, opciones = obtener_sistema_amortizacion()
+    exacto = st.sidebar.checkbox(
+        "🎯 Cálculo exacto en centavos",
+        value=False,
+        help="Redondea cada cuota al centavo y ajusta la última para que la tabla sume exactamente el monto del préstamo",
+        key="calculo_exacto"
+    )
+    escenarios = obtener_parametros_escenarios()
+    mostrar_escenarios_guardados()
     
     # Información adicional
     st.sidebar.markdown("---")
@@ -254,16 +355,35 @@ def pagina_entrada_datos_resumen():
     """)
     
     # Cálculos principales
-    if st.sidebar.button("🔄 Calcular", type="primary"):
-        # Calcular métricas principales
-        cuota_mensual = calcular_cuota_mensual(monto, tasa_anual, plazo_anos)
-        total_pagado = cuota_mensual * plazo_anos * 12
-        intereses_pagados = total_pagado - monto
-        total_seguros = cuota_seguro * plazo_anos * 12
-        total_general = total_pagado + total_seguros
+    # Cargar un escenario guardado también dispara el cálculo
+    if st.sidebar.button("🔄 Calcular", type="primary") or st.session_state.pop('calcular_escenario', False):
+        # Generar tabla de amortización (compacta; se convierte a DataFrame al mostrarla)
+        with etapa('tabla'):
+            try:
+                tabla_amortizacion = obtener_tabla_compacta(
+                    monto, tasa_anual, plazo_anos, cuota_seguro, exacto, sistema, opciones
+                )
+            except ValueError as error:
+                st.error(f"⚠️ {error}")
+                return
         
-        # Generar tabla de amortización
-        tabla_amortizacion = generar_tabla_amortizacion(monto, tasa_anual, plazo_anos, cuota_seguro)
+        # Calcular métricas principales
+        with etapa('metricas'):
+            # Mismos totales que guarda el almacén de escenarios; fuera del francés
+            # simple salen del índice de la tabla, que ya está en caché
+            indice = None
+            if exacto or sistema != FRANCES:
+                indice = obtener_indice_amortizacion(
+                    monto, tasa_anual, plazo_anos, cuota_seguro, exacto, sistema, opciones
+                )
+            totales = calcular_totales_credito(
+                tabla_amortizacion, monto, tasa_anual, plazo_anos, cuota_seguro, exacto, sistema, indice
+            )
+        cuota_mensual = totales['cuota_mensual']
+        total_pagado = totales['total_pagado']
+        intereses_pagados = totales['intereses_pagados']
+        total_seguros = totales['total_seguros']
+        total_general = totales['total_general']
         
         # Guardar en session state para usar en otras páginas
         st.session_state.tabla_amortizacion = tabla_amortizacion
@@ -276,13 +396,17 @@ def pagina_entrada_datos_resumen():
             'total_pagado': total_pagado,
             'intereses_pagados': intereses_pagados,
             'total_seguros': total_seguros,
-            'total_general': total_general
+            'total_general': total_general,
+            'exacto': exacto,
+            'sistema': sistema,
+            'opciones': opciones
         }
         
         # Mostrar resumen compacto
         st.markdown("## 📊 Resumen del Crédito")
         
         # Métricas principales en formato compacto
+        etiqueta_cuota = "Primera cuota" if tabla_amortizacion.cuota_variable else "Cuota Crédito"
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
@@ -291,7 +415,7 @@ def pagina_entrada_datos_resumen():
         
         with col2:
             st.metric("⏱️ Plazo", f"{plazo_anos} años")
-            st.metric("💵 Cuota Crédito", f"${cuota_mensual:,.0f}")
+            st.metric(f"💵 {etiqueta_cuota}", f"${cuota_mensual:,.0f}")
         
         with col3:
             st.metric("🛡️ Cuota Seguro", f"${cuota_seguro:,.0f}")
@@ -312,9 +436,10 @@ def pagina_entrada_datos_resumen():
             - Monto del préstamo: ${monto:,.2f}
             - Tasa de interés anual: {tasa_anual:.2f}%
             - Plazo: {plazo_anos} años ({plazo_anos * 12} pagos)
+            - Sistema: {SISTEMAS[sistema].nombre}
             
             **💵 Pagos Mensuales:**
-            - Cuota del crédito: ${cuota_mensual:,.2f}
+            - {etiqueta_cuota} del crédito: ${cuota_mensual:,.2f}
             - Cuota de seguro: ${cuota_seguro:,.2f}
             - Total mensual: ${cuota_mensual + cuota_seguro:,.2f}
             """)
@@ -333,78 +458,43 @@ def pagina_entrada_datos_resumen():
         st.markdown("## 📊 Distribución Anual de Pagos")
         
         # Generar datos anuales
-        datos_anuales = generar_datos_anuales(tabla_amortizacion, cuota_seguro)
-        
-        # Crear gráfico de barras apiladas con Plotly
-        fig = go.Figure()
+        with etapa('datos_anuales'):
+            datos_anuales = obtener_datos_anuales(
+                monto, tasa_anual, plazo_anos, cuota_seguro, exacto, sistema, opciones
+            )
         
-        # Agregar barras para cada componente
-        fig.add_trace(go.Bar(
-            name='Capital',
-            x=datos_anuales['Año'],
-            y=datos_anuales['Capital'],
-            marker_color='#1f77b4',
-            hovertemplate='<b>Año %{x}</b><br>Capital: $%{y:,.2f}<extra></extra>'
-        ))
-        
-        fig.add_trace(go.Bar(
-            name='Intereses',
-            x=datos_anuales['Año'],
-            y=datos_anuales['Intereses'],
-            marker_color='#ff7f0e',
-            hovertemplate='<b>Año %{x}</b><br>Intereses: $%{y:,.2f}<extra></extra>'
-        ))
-        
-        fig.add_trace(go.Bar(
-            name='Seguros',
-            x=datos_anuales['Año'],
-            y=datos_anuales['Seguros'],
-            marker_color='#2ca02c',
-            hovertemplate='<b>Año %{x}</b><br>Seguros: $%{y:,.2f}<extra></extra>'
-        ))
-        
-        # Configurar el layout del gráfico
-        fig.update_layout(
-            title='Distribución de Pagos por Año',
-            xaxis_title='Año del Crédito',
-            yaxis_title='Monto ($)',
-            barmode='stack',
-            height=500,
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            hovermode='x unified',
-            yaxis=dict(tickformat='$,.0f')
+        # Figuras armadas con los datos ya agregados, en caché por parámetros
+        llave_figuras = (
+            normalizar_parametros(monto, tasa_anual, plazo_anos, cuota_seguro) + (exacto,)
+            + normalizar_sistema(sistema, opciones)
         )
+        with etapa('grafico_anual'):
+            mostrar_figura(figura_en_cache(('anual',) + llave_figuras, lambda: figura_anual(datos_anuales)))
         
-        st.plotly_chart(fig, use_container_width=True)
+        st.markdown("### 📉 Saldo e Interés Mensual")
+        with etapa('grafico_mensual'):
+            mostrar_figura(figura_en_cache(('mensual',) + llave_figuras, lambda: figura_mensual(tabla_amortizacion)))
         
         # Resumen anual compacto
         st.markdown("### 📋 Resumen por Año")
-        resumen_anual = datos_anuales.copy()
-        resumen_anual['Total Año'] = resumen_anual['Capital'] + resumen_anual['Intereses'] + resumen_anual['Seguros']
-        resumen_anual['Capital'] = resumen_anual['Capital'].apply(lambda x: f"${x:,.0f}")
-        resumen_anual['Intereses'] = resumen_anual['Intereses'].apply(lambda x: f"${x:,.0f}")
-        resumen_anual['Seguros'] = resumen_anual['Seguros'].apply(lambda x: f"${x:,.0f}")
-        resumen_anual['Total Año'] = resumen_anual['Total Año'].apply(lambda x: f"${x:,.0f}")
+        with etapa('resumen_anual'):
+            # El resumen se muestra en dólares enteros, sin centavos
+            resumen_anual = datos_anuales.assign(
+                **{'Total Año': datos_anuales['Capital'] + datos_anuales['Intereses'] + datos_anuales['Seguros']}
+            ).round({'Capital': 0, 'Intereses': 0, 'Seguros': 0, 'Total Año': 0})
+
+            st.dataframe(
+                resumen_anual,
+                width='stretch',
+                hide_index=True,
+                column_config=configuracion_columnas_resumen_anual()
+            )
         
-        st.dataframe(
-            resumen_anual,
-            width='stretch',
-            hide_index=True,
-            column_config={
-                "Año": st.column_config.NumberColumn("Año", help="Año del crédito"),
-                "Capital": st.column_config.TextColumn("Capital", help="Capital pagado en el año"),
-                "Intereses": st.column_config.TextColumn("Intereses", help="Intereses pagados en el año"),
-                "Seguros": st.column_config.TextColumn("Seguros", help="Seguros pagados en el año"),
-                "Total Año": st.column_config.TextColumn("Total Año", help="Total pagado en el año")
-            }
-        )
+        if escenarios is not None and sistema != FRANCES:
+            st.info("🎲 Los escenarios de tasa se simulan solo para el sistema francés")
+        elif escenarios is not None:
+            with etapa('escenarios'):
+                mostrar_escenarios_tasa(monto, tasa_anual, plazo_anos, cuota_mensual, intereses_pagados, escenarios)
     
     else:
         # Mensaje inicial
@@ -445,6 +535,22 @@ def pagina_entrada_datos_resumen():
         Esto te dará una cuota mensual de aproximadamente $2,224.44
         """)
 
+def mostrar_totales_periodo(totales):
+    """
+    Muestra las métricas de resumen de un rango de meses de la tabla
+    """
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("Total Pagado", f"${totales['Pago Total']:,.2f}")
+    with col2:
+        st.metric("Intereses", f"${totales['Interés']:,.2f}")
+    with col3:
+        st.metric("Capital", f"${totales['Abono Capital']:,.2f}")
+    with col4:
+        st.metric("Seguros", f"${totales['Seguro']:,.2f}")
+    with col5:
+        st.metric("Meses", f"{totales['Meses']}")
+
 def pagina_tabla_amortizacion():
     """
     Página de tabla de amortización con descarga PDF
@@ -460,6 +566,16 @@ def pagina_tabla_amortizacion():
     # Obtener datos del session state
     tabla_amortizacion = st.session_state.tabla_amortizacion
     parametros = st.session_state.parametros
+    with etapa('indice'):
+        indice = obtener_indice_amortizacion(
+            parametros['monto'],
+            parametros['tasa_anual'],
+            parametros['plazo_anos'],
+            parametros['cuota_seguro'],
+            parametros['exacto'],
+            parametros['sistema'],
+            parametros['opciones']
+        )
     
     # Mostrar información del crédito
     st.markdown("## 📋 Información del Crédito")
@@ -472,7 +588,10 @@ def pagina_tabla_amortizacion():
     
     with col2:
         st.metric("⏱️ Plazo", f"{parametros['plazo_anos']} años")
-        st.metric("💵 Cuota Crédito", f"${parametros['cuota_mensual']:,.0f}")
+        st.metric(
+            "💵 Primera cuota" if tabla_amortizacion.cuota_variable else "💵 Cuota Crédito",
+            f"${parametros['cuota_mensual']:,.0f}"
+        )
     
     with col3:
         st.metric("🛡️ Cuota Seguro", f"${parametros['cuota_seguro']:,.0f}")
@@ -486,96 +605,51 @@ def pagina_tabla_amortizacion():
     st.markdown("## 📅 Tabla de Amortización Completa")
     st.markdown("Esta tabla muestra el desglose mes a mes de tu crédito, incluyendo el interés pagado, abono al capital, cuota total y saldo pendiente.")
     
-    # Organizar en pestañas si el plazo es mayor a 1 año
+    # Organizar por períodos si el plazo es mayor a 1 año
     if parametros['plazo_anos'] > 1:
         # Dividir en períodos de 4 años
-        periodos = []
-        for i in range(0, parametros['plazo_anos'], 4):
-            inicio = i * 12 + 1
-            fin = min((i + 4) * 12, parametros['plazo_anos'] * 12)
-            periodos.append((f"Años {i+1}-{min(i+4, parametros['plazo_anos'])}", inicio, fin))
+        periodos = periodos_tabla(parametros['plazo_anos'])
         
-        tabs = st.tabs([periodo[0] for periodo in periodos])
+        # Solo se construye el período seleccionado, no todas las pestañas
+        nombres = [periodo[0] for periodo in periodos]
+        seleccion = st.radio(
+            "Período",
+            nombres,
+            key="periodo_tabla",
+            horizontal=True,
+            label_visibility="collapsed"
+        )
+        nombre_periodo, inicio, fin = periodos[nombres.index(seleccion)] if seleccion in nombres else periodos[0]
         
-        for i, (nombre_periodo, inicio, fin) in enumerate(periodos):
-            with tabs[i]:
-                periodo_df = tabla_amortizacion[(tabla_amortizacion['Mes'] >= inicio) & (tabla_amortizacion['Mes'] <= fin)].copy()
-                
-                # Formatear los números para mejor visualización
-                periodo_df_display = periodo_df.copy()
-                periodo_df_display['Cuota Crédito'] = periodo_df_display['Cuota Crédito'].apply(lambda x: f"${x:,.2f}")
-                periodo_df_display['Interés'] = periodo_df_display['Interés'].apply(lambda x: f"${x:,.2f}")
-                periodo_df_display['Abono Capital'] = periodo_df_display['Abono Capital'].apply(lambda x: f"${x:,.2f}")
-                periodo_df_display['Seguro'] = periodo_df_display['Seguro'].apply(lambda x: f"${x:,.2f}")
-                periodo_df_display['Pago Total'] = periodo_df_display['Pago Total'].apply(lambda x: f"${x:,.2f}")
-                periodo_df_display['Saldo Pendiente'] = periodo_df_display['Saldo Pendiente'].apply(lambda x: f"${x:,.2f}")
-                
-                st.dataframe(
-                    periodo_df_display, 
-                    width='stretch', 
-                    hide_index=True,
-                    column_config={
-                        "Mes": st.column_config.NumberColumn("Mes", help="Número del mes del crédito"),
-                        "Cuota Crédito": st.column_config.TextColumn("Cuota Crédito", help="Pago mensual del crédito (sin seguro)"),
-                        "Interés": st.column_config.TextColumn("Interés", help="Porción de la cuota que corresponde a intereses"),
-                        "Abono Capital": st.column_config.TextColumn("Abono Capital", help="Porción de la cuota que reduce el capital"),
-                        "Seguro": st.column_config.TextColumn("Seguro", help="Cuota mensual de seguro"),
-                        "Pago Total": st.column_config.TextColumn("Pago Total", help="Total a pagar mensualmente (crédito + seguro)"),
-                        "Saldo Pendiente": st.column_config.TextColumn("Saldo Pendiente", help="Capital restante después de cada pago")
-                    }
-                )
-                
-                # Mostrar resumen del período
-                st.markdown(f"**📊 Resumen del período {nombre_periodo}:**")
-                col1, col2, col3, col4, col5 = st.columns(5)
-                with col1:
-                    st.metric("Total Pagado", f"${periodo_df['Pago Total'].sum():,.2f}")
-                with col2:
-                    st.metric("Intereses", f"${periodo_df['Interés'].sum():,.2f}")
-                with col3:
-                    st.metric("Capital", f"${periodo_df['Abono Capital'].sum():,.2f}")
-                with col4:
-                    st.metric("Seguros", f"${periodo_df['Seguro'].sum():,.2f}")
-                with col5:
-                    st.metric("Meses", f"{len(periodo_df)}")
+        with etapa('periodo'):
+            periodo_df = tabla_amortizacion.a_dataframe(*indice.rango_filas(inicio, fin))
+            
+            # Los montos se muestran con formato sin convertirlos a texto
+            st.dataframe(
+                periodo_df, 
+                width='stretch', 
+                hide_index=True,
+                column_config=configuracion_columnas_tabla()
+            )
+        
+        # Mostrar resumen del período
+        st.markdown(f"**📊 Resumen del período {nombre_periodo}:**")
+        with etapa('totales'):
+            mostrar_totales_periodo(indice.totales(inicio, fin))
     else:
         # Mostrar tabla completa para créditos de 1 año o menos
-        tabla_display = tabla_amortizacion.copy()
-        tabla_display['Cuota Crédito'] = tabla_display['Cuota Crédito'].apply(lambda x: f"${x:,.2f}")
-        tabla_display['Interés'] = tabla_display['Interés'].apply(lambda x: f"${x:,.2f}")
-        tabla_display['Abono Capital'] = tabla_display['Abono Capital'].apply(lambda x: f"${x:,.2f}")
-        tabla_display['Seguro'] = tabla_display['Seguro'].apply(lambda x: f"${x:,.2f}")
-        tabla_display['Pago Total'] = tabla_display['Pago Total'].apply(lambda x: f"${x:,.2f}")
-        tabla_display['Saldo Pendiente'] = tabla_display['Saldo Pendiente'].apply(lambda x: f"${x:,.2f}")
-        
-        st.dataframe(
-            tabla_display, 
-            width='stretch', 
-            hide_index=True,
-            column_config={
-                "Mes": st.column_config.NumberColumn("Mes", help="Número del mes del crédito"),
-                "Cuota Crédito": st.column_config.TextColumn("Cuota Crédito", help="Pago mensual del crédito (sin seguro)"),
-                "Interés": st.column_config.TextColumn("Interés", help="Porción de la cuota que corresponde a intereses"),
-                "Abono Capital": st.column_config.TextColumn("Abono Capital", help="Porción de la cuota que reduce el capital"),
-                "Seguro": st.column_config.TextColumn("Seguro", help="Cuota mensual de seguro"),
-                "Pago Total": st.column_config.TextColumn("Pago Total", help="Total a pagar mensualmente (crédito + seguro)"),
-                "Saldo Pendiente": st.column_config.TextColumn("Saldo Pendiente", help="Capital restante después de cada pago")
-            }
-        )
+        with etapa('periodo'):
+            st.dataframe(
+                tabla_amortizacion.a_dataframe(), 
+                width='stretch', 
+                hide_index=True,
+                column_config=configuracion_columnas_tabla()
+            )
         
         # Mostrar resumen para créditos cortos
         st.markdown("**📊 Resumen del crédito:**")
-        col1, col2, col3, col4, col5 = st.columns(5)
-        with col1:
-            st.metric("Total Pagado", f"${tabla_amortizacion['Pago Total'].sum():,.2f}")
-        with col2:
-            st.metric("Intereses", f"${tabla_amortizacion['Interés'].sum():,.2f}")
-        with col3:
-            st.metric("Capital", f"${tabla_amortizacion['Abono Capital'].sum():,.2f}")
-        with col4:
-            st.metric("Seguros", f"${tabla_amortizacion['Seguro'].sum():,.2f}")
-        with col5:
-            st.metric("Meses", f"{len(tabla_amortizacion)}")
+        with etapa('totales'):
+            mostrar_totales_periodo(indice.totales(1, indice.ultimo_mes))
     
     # Botones de descarga
     st.markdown("## 💾 Exportar Datos")
@@ -583,54 +657,509 @@ def pagina_tabla_amortizacion():
     col1, col2 = st.columns(2)
     
     with col1:
-        # Descarga CSV
-        csv = tabla_amortizacion.to_csv(index=False)
-        st.download_button(
-            label="📥 Descargar Tabla de Amortización (CSV)",
-            data=csv,
-            file_name=f"tabla_amortizacion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv"
-        )
+        # Descarga CSV, Parquet o XLSX: el archivo se genera solo al pedirlo
+        with etapa('exportacion'):
+            seccion_exportacion(
+                "Tabla de Amortización",
+                "tabla_amortizacion",
+                "exportacion_tabla",
+                lambda formato: clave_exportacion(
+                    formato,
+                    parametros['monto'],
+                    parametros['tasa_anual'],
+                    parametros['plazo_anos'],
+                    parametros['cuota_seguro'],
+                    parametros['exacto'],
+                    parametros['sistema'],
+                    parametros['opciones']
+                ),
+                lambda clave, formato: exportar_tabla(clave, tabla_amortizacion, formato)
+            )
     
     with col2:
-        # Descarga PDF
-        if st.button("📄 Generar PDF", type="primary"):
-            try:
-                pdf_buffer = generar_pdf_tabla_amortizacion(
+        # Descarga PDF: se genera en segundo plano y se reutiliza si ya existe
+        with etapa('pdf'):
+            clave = clave_pdf(
+                parametros['monto'],
+                parametros['tasa_anual'],
+                parametros['plazo_anos'],
+                parametros['cuota_seguro'],
+                parametros['exacto'],
+                parametros['sistema'],
+                parametros['opciones']
+            )
+            if obtener_pdf(clave) is not None or st.button("📄 Generar PDF", type="primary"):
+                st.session_state.pdf_clave = clave
+                st.session_state.pdf_futuro = solicitar_pdf(
                     tabla_amortizacion,
                     parametros['monto'],
                     parametros['tasa_anual'],
                     parametros['plazo_anos'],
-                    parametros['cuota_seguro']
+                    parametros['cuota_seguro'],
+                    parametros['exacto'],
+                    parametros['sistema'],
+                    parametros['opciones']
                 )
-                
-                st.download_button(
-                    label="📥 Descargar Tabla de Amortización (PDF)",
-                    data=pdf_buffer.getvalue(),
-                    file_name=f"tabla_amortizacion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                    mime="application/pdf"
+
+            if st.session_state.get('pdf_clave') == clave:
+                seccion_descarga_pdf(
+                    st.session_state.pdf_futuro,
+                    f"tabla_amortizacion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
                 )
-            except Exception as e:
-                st.error(f"Error al generar PDF: {str(e)}")
-                st.info("💡 Asegúrate de tener instalada la librería reportlab: pip install reportlab")
+
+def seccion_exportacion(titulo, nombre_archivo, llave, crear_clave, exportar):
+    """
+    Selector de formato y botón de descarga
+
+    El archivo se genera al pulsar "Preparar descarga" y queda en caché por
+    su contenido; si ya está en caché el botón de descarga aparece directo.
+    """
+    formato = st.selectbox(
+        "Formato",
+        formatos_disponibles(),
+        format_func=lambda formato: FORMATOS[formato]['nombre'],
+        key=f"{llave}_formato"
+    )
+    clave = crear_clave(formato)
+    datos = obtener_exportacion(clave)
+    if datos is None and st.button("📦 Preparar descarga", key=f"{llave}_preparar"):
+        with st.spinner("Exportando..."):
+            datos = exportar(clave, formato)
+    if datos is not None:
+        st.download_button(
+            label=f"📥 Descargar {titulo} ({FORMATOS[formato]['nombre']})",
+            data=datos,
+            file_name=f"{nombre_archivo}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{FORMATOS[formato]['extension']}",
+            mime=FORMATOS[formato]['mime'],
+            key=f"{llave}_descargar"
+        )
+
+@st.fragment(run_every=1)
+def esperar_pdf(futuro):
+    """
+    Consulta cada segundo el PDF en curso; al terminar vuelve a ejecutar la
+    página para mostrar la descarga y dejar de consultar
+    """
+    if futuro.done():
+        st.rerun()
+    st.status("⏳ Generando PDF...", state="running")
+
+def seccion_descarga_pdf(futuro, nombre_archivo):
+    """
+    Muestra el avance del PDF en segundo plano y, al terminar, su descarga
+    """
+    if not futuro.done():
+        esperar_pdf(futuro)
+        return
+
+    try:
+        pdf = futuro.result()
+    except Exception as e:
+        st.error(f"Error al generar PDF: {str(e)}")
+        st.info("💡 Asegúrate de tener instalada la librería reportlab: pip install reportlab")
+        return
+
+    st.download_button(
+        label="📥 Descargar Tabla de Amortización (PDF)",
+        data=pdf,
+        file_name=nombre_archivo,
+        mime="application/pdf"
+    )
+
+def obtener_simulador_abonos(parametros, politica):
+    """
+    Simulador de abonos de la sesión; se conserva entre ejecuciones para que
+    cada cambio de abono recalcule solo desde el mes afectado
+    """
+    llave = (parametros['monto'], parametros['tasa_anual'], parametros['plazo_anos'],
+             parametros['cuota_seguro'], politica)
+    if st.session_state.get('simulador_abonos_llave') != llave:
+        st.session_state.simulador_abonos = SimuladorAbonos(*llave)
+        st.session_state.simulador_abonos_llave = llave
+    return st.session_state.simulador_abonos
+
+def pagina_abonos_extra():
+    """
+    Página para simular abonos extraordinarios a capital
+    """
+    st.markdown('<h1 class="main-header">💸 Abonos Extraordinarios</h1>', unsafe_allow_html=True)
+    
+    if 'parametros' not in st.session_state:
+        st.warning("⚠️ Primero debes calcular el crédito en la página de 'Entrada de Datos y Resumen'")
+        st.info("💡 Ve a la primera página, ingresa los parámetros del crédito y haz clic en 'Calcular'")
+        return
+    
+    parametros = st.session_state.parametros
+    if parametros['sistema'] != FRANCES:
+        # El simulador recalcula con cuota fija: con otro sistema simularía un crédito distinto
+        st.info("💸 Los abonos extraordinarios se simulan solo para el sistema francés; "
+                "vuelve a calcular el crédito con ese sistema en la primera página")
+        return
+    num_pagos = parametros['plazo_anos'] * 12
+    
+    politica = st.radio(
+        "¿Qué hacer con los abonos?",
+        [REDUCIR_PLAZO, REDUCIR_CUOTA],
+        format_func={REDUCIR_PLAZO: "Reducir plazo", REDUCIR_CUOTA: "Reducir cuota"}.get,
+        key="politica_abonos",
+        horizontal=True
+    )
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### 💵 Abono único")
+        monto_unico = st.number_input("Monto del abono ($)", min_value=0, value=0, step=1000, key="abono_unico_monto")
+        mes_unico = st.slider("Mes del abono", 1, num_pagos, min(12, num_pagos), key="abono_unico_mes")
+    
+    with col2:
+        st.markdown("### 🔁 Abono recurrente")
+        monto_recurrente = st.number_input("Monto de cada abono ($)", min_value=0, value=0, step=100, key="abono_recurrente_monto")
+        frecuencias = {"Mensual": 1, "Trimestral": 3, "Semestral": 6, "Anual": 12}
+        frecuencia = st.selectbox("Frecuencia", list(frecuencias), index=3, key="abono_recurrente_frecuencia")
+        mes_inicio = st.slider("Desde el mes", 1, num_pagos, min(12, num_pagos), key="abono_recurrente_inicio")
+    
+    abonos = []
+    if monto_unico > 0:
+        abonos.append((mes_unico, monto_unico))
+    if monto_recurrente > 0:
+        abonos.append((mes_inicio, monto_recurrente, frecuencias[frecuencia]))
+    
+    simulador = obtener_simulador_abonos(parametros, politica).simular(abonos)
+    resumen = simulador.resumen()
+    
+    st.markdown("## 📊 Resultado")
+    if parametros['exacto']:
+        st.caption("🎯 La simulación no redondea cada cuota al centavo: puede diferir en centavos del cálculo exacto")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("📅 Meses", f"{resumen['meses']}", delta=f"-{resumen['meses_ahorrados']}" if resumen['meses_ahorrados'] else None, delta_color="inverse")
+    with col2:
+        st.metric("💰 Intereses ahorrados", f"${resumen['intereses_ahorrados']:,.2f}")
+    with col3:
+        st.metric("💵 Cuota final", f"${resumen['cuota_final']:,.2f}")
+    with col4:
+        st.metric("💸 Total abonos extra", f"${resumen['total_abonos_extra']:,.2f}")
+    
+    tabla_abonos = simulador.a_dataframe()
+    
+    # Gráfico de saldo con y sin abonos
+    llave_figura = ('abonos', tuple(parametros[k] for k in ('monto', 'tasa_anual', 'plazo_anos')), politica, tuple(abonos))
+    mostrar_figura(figura_en_cache(
+        llave_figura,
+        lambda: figura_saldos_abonos(simulador.columnas_base()['Saldo Pendiente'], tabla_abonos['Saldo Pendiente'])
+    ))
+    
+    st.dataframe(
+        tabla_abonos,
+        width='stretch',
+        hide_index=True,
+        column_config=configuracion_columnas_tabla_abonos()
+    )
+
+def pagina_sensibilidad():
+    """
+    Página con la cuota y los intereses para todas las combinaciones de tasa y plazo
+    """
+    st.markdown('<h1 class="main-header">🌡️ Sensibilidad a Tasa y Plazo</h1>', unsafe_allow_html=True)
+    
+    # Parte del crédito ya calculado, si lo hay
+    parametros = st.session_state.get('parametros', {})
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        monto = st.number_input(
+            "Monto del préstamo ($)", min_value=1000, max_value=10000000,
+            value=parametros.get('monto', 100000), step=1000, key="sensibilidad_monto"
+        )
+    with col2:
+        cuota_seguro = st.number_input(
+            "Cuota de seguro mensual ($)", min_value=0, max_value=500,
+            value=parametros.get('cuota_seguro', 30), step=5, key="sensibilidad_seguro"
+        )
+    with col3:
+        variable = st.selectbox(
+            "Mostrar",
+            ['Cuota Crédito', 'Pago Total', 'Intereses', 'Total General'],
+            key="sensibilidad_variable"
+        )
+    
+    # La malla se calcula una vez por monto y seguro; los controles de abajo
+    # solo recortan y vuelven a dibujar
+    malla = obtener_malla_sensibilidad(monto, cuota_seguro)
+    tasas = malla['tasas']
+    plazos = malla['plazos']
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        tasa_min, tasa_max = st.slider(
+            "Rango de tasas (%)", float(tasas[0]), float(tasas[-1]), (1.0, 25.0), step=0.1,
+            key="sensibilidad_rango_tasas"
+        )
+        tasa_anual = st.slider(
+            "Tasa a consultar (%)", float(tasas[0]), float(tasas[-1]),
+            float(parametros.get('tasa_anual', 12.0)), step=0.1, key="sensibilidad_tasa"
+        )
+    with col2:
+        plazo_min, plazo_max = st.slider(
+            "Rango de plazos (años)", int(plazos[0]), int(plazos[-1]), (int(plazos[0]), int(plazos[-1])),
+            key="sensibilidad_rango_plazos"
+        )
+        plazo_anos = st.slider(
+            "Plazo a consultar (años)", int(plazos[0]), int(plazos[-1]),
+            int(parametros.get('plazo_anos', 5)), key="sensibilidad_plazo"
+        )
+    
+    consulta = buscar_en_malla(malla, tasa_anual, plazo_anos)
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("💵 Cuota Crédito", f"${consulta['Cuota Crédito']:,.2f}")
+    with col2:
+        st.metric("💳 Pago Total", f"${consulta['Pago Total']:,.2f}")
+    with col3:
+        st.metric("📊 Intereses", f"${consulta['Intereses']:,.0f}")
+    with col4:
+        st.metric("💸 Total General", f"${consulta['Total General']:,.0f}")
+    
+    columnas = (tasas >= tasa_min - 1e-9) & (tasas <= tasa_max + 1e-9)
+    filas = (plazos >= plazo_min) & (plazos <= plazo_max)
+    
+    # Mapa de calor; el punto consultado solo se marca si está dentro de los rangos
+    punto = (consulta['tasa_anual'], consulta['plazo_anos'])
+    visible = tasa_min <= punto[0] <= tasa_max and plazo_min <= punto[1] <= plazo_max
+    llave_figura = ('sensibilidad', monto, cuota_seguro, variable, tasa_min, tasa_max, plazo_min, plazo_max,
+                    punto if visible else None)
+    mostrar_figura(figura_en_cache(
+        llave_figura,
+        lambda: figura_sensibilidad(
+            tasas[columnas], plazos[filas], malla[variable][filas][:, columnas], variable, monto,
+            punto if visible else None
+        )
+    ))
+
+def obtener_comparador():
+    """
+    Comparador de créditos de la sesión; conserva los escenarios ya calculados entre ejecuciones
+    """
+    if 'comparador_creditos' not in st.session_state:
+        st.session_state.comparador_creditos = ComparadorCreditos()
+    return st.session_state.comparador_creditos
+
+def leer_ofertas(filas):
+    """
+    Convierte las filas del editor en escenarios {nombre: (monto, tasa, plazo, seguro)}
+    """
+    escenarios = {}
+    for fila in filas:
+        nombre = (fila.get('Nombre') or '').strip()
+        valores = [fila.get(columna) for columna in ('Monto', 'Tasa (%)', 'Plazo (años)', 'Seguro')]
+        if not nombre and all(valor is None for valor in valores):
+            # Fila agregada que todavía no se llena
+            continue
+        if nombre in escenarios:
+            raise ValueError(f"El nombre '{nombre}' está repetido")
+        monto, tasa_anual, plazo_anos, cuota_seguro = valores
+        escenarios[nombre] = (
+            monto, tasa_anual, int(plazo_anos) if plazo_anos is not None else None, cuota_seguro or 0
+        )
+    return escenarios
+
+def pagina_comparacion():
+    """
+    Página para comparar varias ofertas de crédito lado a lado
+    """
+    st.markdown('<h1 class="main-header">⚖️ Comparar Créditos</h1>', unsafe_allow_html=True)
+    
+    # Ofertas iniciales a partir del crédito calculado (o valores por defecto);
+    # el editor guarda los cambios sobre ellas
+    if 'comparacion_iniciales' not in st.session_state:
+        parametros = st.session_state.get('parametros', {})
+        monto = parametros.get('monto', 100000)
+        tasa_anual = parametros.get('tasa_anual', 12.0)
+        plazo_anos = parametros.get('plazo_anos', 5)
+        cuota_seguro = parametros.get('cuota_seguro', 30)
+        st.session_state.comparacion_iniciales = [
+            {'Nombre': 'Oferta A', 'Monto': monto, 'Tasa (%)': tasa_anual, 'Plazo (años)': plazo_anos, 'Seguro': cuota_seguro},
+            {'Nombre': 'Oferta B', 'Monto': monto, 'Tasa (%)': max(tasa_anual - 1.0, 0.0), 'Plazo (años)': plazo_anos, 'Seguro': cuota_seguro + 20},
+            {'Nombre': 'Oferta C', 'Monto': monto, 'Tasa (%)': tasa_anual, 'Plazo (años)': min(plazo_anos + 5, 30), 'Seguro': cuota_seguro},
+        ]
+    
+    st.markdown("Agrega, edita o quita ofertas; al cambiar una solo se recalcula esa.")
+    filas = st.data_editor(
+        st.session_state.comparacion_iniciales,
+        num_rows="dynamic",
+        key="comparacion_ofertas",
+        width='stretch',
+        hide_index=True,
+        column_config={
+            'Nombre': st.column_config.TextColumn("Nombre", required=True),
+            'Monto': st.column_config.NumberColumn(
+                "Monto ($)", min_value=LIMITES_PARAMETROS['monto'][0], max_value=LIMITES_PARAMETROS['monto'][1],
+                step=1000, format="dollar"
+            ),
+            'Tasa (%)': st.column_config.NumberColumn(
+                "Tasa anual (%)", min_value=LIMITES_PARAMETROS['tasa_anual'][0],
+                max_value=LIMITES_PARAMETROS['tasa_anual'][1], step=0.1
+            ),
+            'Plazo (años)': st.column_config.NumberColumn(
+                "Plazo (años)", min_value=LIMITES_PARAMETROS['plazo_anos'][0],
+                max_value=LIMITES_PARAMETROS['plazo_anos'][1], step=1
+            ),
+            'Seguro': st.column_config.NumberColumn(
+                "Seguro mensual ($)", min_value=LIMITES_PARAMETROS['cuota_seguro'][0],
+                max_value=LIMITES_PARAMETROS['cuota_seguro'][1], step=5, format="dollar"
+            ),
+        }
+    )
+    
+    comparador = obtener_comparador()
+    try:
+        escenarios = leer_ofertas(filas)
+        if not escenarios:
+            st.info("💡 Agrega al menos una oferta para comparar")
+            return
+        comparador.actualizar(escenarios)
+    except ValueError as error:
+        st.error(f"⚠️ {error}")
+        return
+    
+    st.caption(
+        f"Recalculadas: {', '.join(comparador.recalculados) or 'ninguna'} · "
+        f"Memoria: {comparador.nbytes / 1024:,.1f} KB de {comparador.memoria_maxima / 1024:,.0f} KB"
+    )
+    
+    st.markdown("## 📊 Resumen")
+    resumen = comparador.resumen()
+    st.dataframe(
+        resumen,
+        width='stretch',
+        hide_index=True,
+        column_config=configuracion_columnas_comparacion()
+    )
+    if len(comparador.nombres) > 1:
+        # Diferencia está redondeada al centavo: las ofertas con 0 empatan como las más baratas
+        baratas = [
+            f"**{nombre}**" for nombre, diferencia in zip(resumen['Escenario'], resumen['Diferencia'])
+            if diferencia == 0
+        ]
+        if len(baratas) > 1:
+            todas = len(baratas) == len(comparador.nombres)
+            st.success(
+                f"💡 Las ofertas {', '.join(baratas[:-1])} y {baratas[-1]} cuestan lo mismo"
+                + ("" if todas else " y son las más baratas")
+            )
+        else:
+            segunda = sorted(resumen['Diferencia'])[1]
+            st.success(f"💡 La oferta más barata es {baratas[0]}: cuesta ${segunda:,.2f} menos que la siguiente")
+        
+        st.markdown("## 🔀 Mes de Cruce")
+        referencia = st.selectbox("Comparar contra", comparador.nombres, key="comparacion_referencia")
+        otros = [nombre for nombre in comparador.nombres if nombre != referencia]
+        columnas = st.columns(min(len(otros), 4))
+        for i, nombre in enumerate(otros):
+            mes = comparador.mes_cruce(nombre, referencia)
+            with columnas[i % len(columnas)]:
+                st.metric(
+                    f"{nombre} vs {referencia}",
+                    f"Mes {mes}" if mes else "Sin cruce",
+                    help="Mes en que el costo acumulado (intereses más seguros) de una oferta pasa a la otra"
+                )
+    
+    # Saldos superpuestos, en caché por los parámetros de todas las ofertas
+    llave_figura = ('comparacion',) + tuple((nombre, comparador.parametros(nombre)) for nombre in comparador.nombres)
+    mostrar_figura(figura_en_cache(
+        llave_figura,
+        lambda: figura_comparacion({
+            nombre: comparador.tabla(nombre).columna('Saldo Pendiente') for nombre in comparador.nombres
+        })
+    ))
+    
+    # Tablas de todas las ofertas en un solo archivo, escritas oferta por oferta
+    st.markdown("## 💾 Exportar Ofertas")
+    parametros_ofertas = {nombre: comparador.parametros(nombre) for nombre in comparador.nombres}
+    seccion_exportacion(
+        "Tablas de las Ofertas",
+        "comparacion_creditos",
+        "exportacion_comparacion",
+        lambda formato: clave_exportacion_escenarios(formato, parametros_ofertas),
+        lambda clave, formato: exportar_escenarios(
+            clave, ((nombre, comparador.tabla(nombre)) for nombre in comparador.nombres), formato
+        )
+    )
+
+def perfilado_activo():
+    """
+    Medición de tiempos: por variable de entorno o con ?perfilado=1 en la URL
+    """
+    return activado_por_entorno() or st.query_params.get('perfilado') == '1'
+
+def armar_cprofile():
+    st.session_state.cprofile_pendiente = 'armado'
+
+def mostrar_panel_perfilado(perfilador):
+    """
+    Desglose de tiempos del rerun en el sidebar y captura opcional con cProfile
+    """
+    with st.sidebar.expander("⏱️ Tiempos de este rerun", expanded=True):
+        st.dataframe(
+            {
+                'Etapa': [nombre for nombre, _ in perfilador.etapas],
+                'ms': [round(segundos * 1000, 2) for _, segundos in perfilador.etapas],
+            },
+            width='stretch',
+            hide_index=True
+        )
+        st.caption(f"Métricas Prometheus: {RUTA_METRICAS}")
+        st.button(
+            "📸 Perfilar el siguiente rerun con cProfile",
+            on_click=armar_cprofile,
+            help="El siguiente rerun (por ejemplo, al pulsar Calcular) se ejecuta bajo cProfile"
+        )
+        if perfilador.archivo_perfil is not None:
+            st.caption(f"Perfil guardado en {perfilador.archivo_perfil}")
+            st.code(perfilador.resumen_perfil, language=None)
 
 def main():
+    # Si ya hay escenarios guardados, el almacén respalda la caché de cálculos desde el primer rerun
+    almacen_en_disco()
+    
     # Menú lateral para navegación
     st.sidebar.title("🧮 Calculadora de Crédito")
     st.sidebar.markdown("---")
     
-    # Opciones del menú
+    # Opciones del menú: nombre mostrado -> (página, nombre en las métricas)
+    paginas = {
+        "📊 Entrada de Datos y Resumen": (pagina_entrada_datos_resumen, 'resumen'),
+        "📅 Tabla de Amortización": (pagina_tabla_amortizacion, 'tabla'),
+        "💸 Abonos Extraordinarios": (pagina_abonos_extra, 'abonos'),
+        "🌡️ Sensibilidad": (pagina_sensibilidad, 'sensibilidad'),
+        "⚖️ Comparar Créditos": (pagina_comparacion, 'comparacion'),
+    }
     opcion = st.sidebar.radio(
         "📋 Navegación",
-        ["📊 Entrada de Datos y Resumen", "📅 Tabla de Amortización"],
+        list(paginas),
         index=0
     )
+    pagina, nombre_pagina = paginas[opcion]
     
-    # Router simple para mostrar la página correspondiente
-    if opcion == "📊 Entrada de Datos y Resumen":
-        pagina_entrada_datos_resumen()
-    elif opcion == "📅 Tabla de Amortización":
-        pagina_tabla_amortizacion()
+    if not perfilado_activo():
+        pagina()
+        return
+    
+    # Con la medición activa se toma el tiempo de cada etapa; el rerun que arma
+    # cProfile (el clic del botón) se salta y se perfila el siguiente
+    perfilador = iniciar_rerun(nombre_pagina)
+    pendiente = st.session_state.pop('cprofile_pendiente', None)
+    try:
+        if pendiente == 'armado':
+            st.session_state.cprofile_pendiente = 'listo'
+            pagina()
+        elif pendiente == 'listo':
+            ejecutar_con_cprofile(pagina, perfilador)
+        else:
+            pagina()
+    finally:
+        terminar_rerun()
+    mostrar_panel_perfilado(perfilador)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""
+Exportación de la tabla de amortización a PDF
+"""
+import io
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from nucleo.tabla_compacta import COLUMNAS_TABLA
+from formato import formatear_tabla
+
+# Filas de datos por bloque; cada bloque es una tabla pequeña con su propio
+# encabezado, así reportlab nunca mide ni divide una tabla de cientos de filas
+FILAS_POR_BLOQUE = 50
+
+# Altos que reportlab calcula para ESTILO_TABLA; fijarlos evita medir cada fila
+ALTO_ENCABEZADO = 27
+ALTO_FILA = 18
+
+ESTILO_TABLA = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+
+def _encabezado_pdf(monto, tasa_anual, plazo_anos, cuota_seguro):
+    """
+    Título e información del crédito al inicio del documento
+    """
+    styles = getSampleStyleSheet()
+
+    info_text = f"""
+    <b>Información del Crédito:</b><br/>
+    Monto: ${monto:,.2f}<br/>
+    Tasa Anual: {tasa_anual:.2f}%<br/>
+    Plazo: {plazo_anos} años<br/>
+    Seguro Mensual: ${cuota_seguro:,.2f}
+    """
+
+    return [
+        Paragraph("Tabla de Amortización", styles['Title']),
+        Spacer(1, 12),
+        Paragraph(info_text, styles['Normal']),
+        Spacer(1, 12),
+    ]
+
+
+def _anchos_columnas(columnas):
+    """
+    Ancho fijo de cada columna según su texto más largo
+
+    Con anchos fijos reportlab no tiene que medir cada celda de cada bloque.
+    """
+    anchos = []
+    for columna, valores in columnas.items():
+        mas_largo = max(valores, key=len, default='')
+        anchos.append(max(
+            stringWidth(columna, 'Helvetica-Bold', 10),
+            stringWidth(mas_largo, 'Helvetica', 8)
+        ) + 12)
+    return anchos
+
+
+def generar_bloques_tabla(tabla_amortizacion, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Genera la tabla de amortización como bloques de tamaño fijo con encabezado
+
+    Cada bloque repite la fila de encabezado, también cuando reportlab lo
+    parte entre dos páginas.
+    """
+    columnas = formatear_tabla(tabla_amortizacion)
+    anchos = _anchos_columnas(columnas)
+    filas = list(zip(*columnas.values()))
+
+    for inicio in range(0, len(filas), filas_por_bloque):
+        datos = filas[inicio:inicio + filas_por_bloque]
+        bloque = Table(
+            [COLUMNAS_TABLA] + datos,
+            colWidths=anchos,
+            rowHeights=[ALTO_ENCABEZADO] + [ALTO_FILA] * len(datos),
+            repeatRows=1
+        )
+        bloque.setStyle(ESTILO_TABLA)
+        yield bloque
+
+
+def generar_pdf_tabla_amortizacion(tabla_amortizacion, monto, tasa_anual, plazo_anos, cuota_seguro, destino=None):
+    """
+    Genera un PDF con la tabla de amortización
+
+    El documento se escribe directamente en destino (cualquier archivo
+    binario abierto, por ejemplo el buffer de la respuesta); si no se indica
+    se usa un BytesIO nuevo, que se devuelve posicionado al inicio.
+    """
+    buffer = destino if destino is not None else io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+
+    story = _encabezado_pdf(monto, tasa_anual, plazo_anos, cuota_seguro)
+    story.extend(generar_bloques_tabla(tabla_amortizacion))
+
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+
+def generar_pdf_tabla_unica(tabla_amortizacion, monto, tasa_anual, plazo_anos, cuota_seguro):
+    """
+    Implementación anterior con una sola tabla de reportlab para todo el crédito
+
+    Se conserva como referencia para las mediciones de benchmarks/bench_pdf.py.
+    """
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    story = _encabezado_pdf(monto, tasa_anual, plazo_anos, cuota_seguro)
+
+    # Preparar datos para la tabla
+    data = [['Mes', 'Cuota Crédito', 'Interés', 'Abono Capital', 'Seguro', 'Pago Total', 'Saldo Pendiente']]
+
+    for _, row in tabla_amortizacion.iterrows():
+        data.append([
+            str(int(row['Mes'])),
+            f"${row['Cuota Crédito']:,.2f}",
+            f"${row['Interés']:,.2f}",
+            f"${row['Abono Capital']:,.2f}",
+            f"${row['Seguro']:,.2f}",
+            f"${row['Pago Total']:,.2f}",
+            f"${row['Saldo Pendiente']:,.2f}"
+        ])
+
+    # Crear tabla
+    table = Table(data)
+    table.setStyle(ESTILO_TABLA)
+
+    story.append(table)
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
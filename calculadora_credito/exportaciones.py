@@ -0,0 +1,234 @@
+"""
+Exportación de tablas de amortización a CSV, Parquet y XLSX bajo demanda
+
+Los archivos se generan solo cuando se piden y se guardan en una caché
+direccionada por contenido (formato y parámetros normalizados del crédito),
+así el rerun de una página no exporta nada y la segunda descarga del mismo
+archivo no cuesta nada.
+
+EscritorTablas escribe por bloques (un bloque por escenario o por grupo de
+préstamos) en una ruta o en un archivo binario abierto, de modo que una
+exportación grande nunca se arma completa en una cadena de Python. El XLSX
+es opcional: solo está disponible si openpyxl está instalado.
+
+pyarrow y openpyxl se importan recién al exportar, no al cargar la aplicación.
+"""
+import functools
+import hashlib
+import importlib.util
+import io
+import threading
+from pathlib import Path
+
+from cachetools import LRUCache
+
+from formato import generar_csv
+from nucleo.cache_calculos import normalizar_parametros
+from nucleo.sistemas_amortizacion import FRANCES, normalizar_sistema
+from nucleo.tabla_compacta import COLUMNAS_TABLA
+
+FORMATOS = {
+    'csv': {'nombre': 'CSV', 'extension': '.csv', 'mime': 'text/csv'},
+    'parquet': {'nombre': 'Parquet', 'extension': '.parquet', 'mime': 'application/vnd.apache.parquet'},
+    'xlsx': {
+        'nombre': 'Excel',
+        'extension': '.xlsx',
+        'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    },
+}
+
+XLSX_DISPONIBLE = importlib.util.find_spec('openpyxl') is not None
+
+# Filas por hoja de Excel, contando el encabezado
+FILAS_MAXIMAS_XLSX = 1048576
+
+# Límite de la caché de archivos exportados, medido en bytes
+BYTES_MAXIMOS_CACHE = 64 * 2**20
+
+_candado = threading.Lock()
+_exportaciones = LRUCache(maxsize=BYTES_MAXIMOS_CACHE, getsizeof=len)
+
+
+@functools.cache
+def esquema_tabla():
+    """
+    Esquema de Arrow de la tabla de amortización exportada
+    """
+    import pyarrow as pa
+
+    return pa.schema([('Mes', pa.int64())] + [(columna, pa.float64()) for columna in COLUMNAS_TABLA[1:]])
+
+
+@functools.cache
+def esquema_escenarios():
+    """
+    Esquema de Arrow de las tablas de varios escenarios, con la columna 'Escenario'
+    """
+    import pyarrow as pa
+
+    return pa.schema([('Escenario', pa.string())] + list(esquema_tabla()))
+
+
+def formatos_disponibles():
+    """
+    Formatos que se pueden exportar con las dependencias instaladas
+    """
+    return [formato for formato in FORMATOS if formato != 'xlsx' or XLSX_DISPONIBLE]
+
+
+def formato_de_ruta(ruta):
+    """
+    Formato de salida según la extensión del archivo; CSV si no se reconoce
+    """
+    extension = Path(ruta).suffix.lower()
+    if extension in ('.parquet', '.pq'):
+        return 'parquet'
+    if extension == '.xlsx':
+        return 'xlsx'
+    return 'csv'
+
+
+def _validar_formato(formato):
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: {formato}; use uno de {', '.join(FORMATOS)}")
+    if formato == 'xlsx' and not XLSX_DISPONIBLE:
+        raise ValueError("La exportación a XLSX necesita openpyxl (pip install openpyxl)")
+
+
+class EscritorTablas:
+    """
+    Escribe DataFrames por bloques en CSV, Parquet o XLSX
+
+    El destino es una ruta o un archivo binario abierto (que no se cierra).
+    Las columnas y sus tipos salen del esquema de Arrow dado.
+    """
+
+    def __init__(self, destino, esquema, formato=None):
+        self.formato = formato or formato_de_ruta(destino)
+        _validar_formato(self.formato)
+        self.esquema = esquema
+        self.filas = 0
+        self._propio = isinstance(destino, (str, Path))
+        self._archivo = open(destino, 'wb') if self._propio else destino
+        self._parquet = None
+        self._libro = None
+        if self.formato == 'parquet':
+            import pyarrow.parquet as pq
+
+            self._parquet = pq.ParquetWriter(self._archivo, esquema)
+        elif self.formato == 'xlsx':
+            from openpyxl import Workbook
+
+            # En modo de solo escritura openpyxl no guarda las filas en memoria
+            self._libro = Workbook(write_only=True)
+            self._hoja = self._libro.create_sheet('Tabla')
+
+    def escribir(self, tabla):
+        if self.formato == 'parquet':
+            import pyarrow as pa
+
+            self._parquet.write_table(pa.Table.from_pandas(tabla, schema=self.esquema, preserve_index=False))
+        elif self.formato == 'xlsx':
+            if self.filas + len(tabla) + 1 > FILAS_MAXIMAS_XLSX:
+                raise ValueError(f"Una hoja de Excel admite {FILAS_MAXIMAS_XLSX - 1:,} filas; use CSV o Parquet")
+            if self.filas == 0:
+                self._hoja.append(self.esquema.names)
+            columnas = [tabla[nombre].tolist() for nombre in self.esquema.names]
+            for fila in zip(*columnas):
+                self._hoja.append(fila)
+        else:
+            self._archivo.write(generar_csv(tabla, encabezado=self.filas == 0).encode('utf-8'))
+        self.filas += len(tabla)
+
+    def cerrar(self):
+        try:
+            if self.formato == 'parquet':
+                self._parquet.close()
+            elif self.formato == 'xlsx':
+                if self.filas == 0:
+                    self._hoja.append(self.esquema.names)
+                self._libro.save(self._archivo)
+            elif self.filas == 0:
+                self._archivo.write((','.join(self.esquema.names) + '\n').encode('utf-8'))
+        finally:
+            if self._propio:
+                self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *error):
+        self.cerrar()
+
+
+def clave_exportacion(formato, monto, tasa_anual, plazo_anos, cuota_seguro, exacto=False,
+                      sistema=FRANCES, opciones=None):
+    """
+    Clave de contenido del archivo exportado de un crédito
+    """
+    parametros = normalizar_parametros(monto, tasa_anual, plazo_anos, cuota_seguro)
+    llave = ('exportacion', formato, exacto) + parametros + normalizar_sistema(sistema, opciones)
+    return hashlib.sha256(repr(llave).encode()).hexdigest()
+
+
+def clave_exportacion_escenarios(formato, escenarios):
+    """
+    Clave de contenido de la exportación de varios escenarios ({nombre: parámetros normalizados})
+    """
+    return hashlib.sha256(repr(('escenarios', formato) + tuple(escenarios.items())).encode()).hexdigest()
+
+
+def obtener_exportacion(clave):
+    """
+    Devuelve los bytes del archivo si ya está exportado, o None
+    """
+    with _candado:
+        return _exportaciones.get(clave)
+
+
+def _guardar(clave, datos):
+    with _candado:
+        _exportaciones[clave] = datos
+    return datos
+
+
+def exportar_tabla(clave, tabla_compacta, formato):
+    """
+    Exporta la tabla de un crédito (o la toma de la caché) y devuelve sus bytes
+    """
+    datos = obtener_exportacion(clave)
+    if datos is not None:
+        return datos
+
+    destino = io.BytesIO()
+    with EscritorTablas(destino, esquema_tabla(), formato) as escritor:
+        escritor.escribir(tabla_compacta.a_dataframe())
+    return _guardar(clave, destino.getvalue())
+
+
+def escribir_escenarios(destino, tablas, formato=None):
+    """
+    Escribe las tablas de varios escenarios, una tras otra, con la columna 'Escenario'
+
+    tablas es un iterable de (nombre, tabla compacta); cada escenario se
+    convierte y se escribe por separado. Devuelve las filas escritas.
+    """
+    with EscritorTablas(destino, esquema_escenarios(), formato) as escritor:
+        for nombre, tabla_compacta in tablas:
+            tabla = tabla_compacta.a_dataframe()
+            tabla.insert(0, 'Escenario', nombre)
+            escritor.escribir(tabla)
+    return escritor.filas
+
+
+def exportar_escenarios(clave, tablas, formato):
+    """
+    Exporta las tablas de varios escenarios (o las toma de la caché) y devuelve sus bytes
+    """
+    datos = obtener_exportacion(clave)
+    if datos is not None:
+        return datos
+
+    destino = io.BytesIO()
+    escribir_escenarios(destino, tablas, formato)
+    return _guardar(clave, destino.getvalue())
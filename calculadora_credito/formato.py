@@ -0,0 +1,155 @@
+"""
+Formato de montos compartido por la pantalla, la exportación CSV y el PDF
+
+En pantalla los datos se mantienen numéricos y el formato lo aplica
+st.column_config, sin crear copias de texto. Para el PDF cada columna se
+convierte a texto con una sola llamada de formato por columna.
+"""
+from nucleo.tabla_compacta import COLUMNAS_TABLA
+
+# Carácter que no aparece en un monto formateado; separa los valores al
+# formatear una columna completa de una sola vez
+_SEPARADOR = '\x00'
+
+AYUDA_COLUMNAS_TABLA = {
+    'Mes': "Número del mes del crédito",
+    'Cuota Crédito': "Pago mensual del crédito (sin seguro)",
+    'Interés': "Porción de la cuota que corresponde a intereses",
+    'Abono Capital': "Porción de la cuota que reduce el capital",
+    'Seguro': "Cuota mensual de seguro",
+    'Pago Total': "Total a pagar mensualmente (crédito + seguro)",
+    'Saldo Pendiente': "Capital restante después de cada pago",
+}
+
+AYUDA_COLUMNAS_TABLA_ABONOS = dict(
+    list(AYUDA_COLUMNAS_TABLA.items())[:4]
+    + [('Abono Extra', "Abono extraordinario a capital del mes")]
+    + list(AYUDA_COLUMNAS_TABLA.items())[4:]
+)
+
+AYUDA_COLUMNAS_ESCENARIOS = {
+    'Percentil': "Porcentaje de escenarios con un valor menor o igual",
+    'Intereses pagados': "Intereses totales del crédito en ese percentil",
+    'Cuota máxima': "Cuota más alta que llega a pagarse en ese percentil",
+}
+
+AYUDA_COLUMNAS_COMPARACION = {
+    'Escenario': "Nombre de la oferta o escenario",
+    'Cuota Crédito': "Cuota mensual del crédito (sin seguro)",
+    'Pago Mensual': "Cuota del crédito más el seguro",
+    'Meses': "Número de pagos",
+    'Intereses': "Intereses totales del crédito",
+    'Seguros': "Seguros totales del crédito",
+    'Costo Total': "Intereses más seguros: lo que cuesta el crédito",
+    'Total a Pagar': "Total pagado en el crédito (capital, intereses y seguros)",
+    'Diferencia': "Costo total por encima del escenario más barato",
+}
+
+AYUDA_COLUMNAS_RESUMEN_ANUAL = {
+    'Año': "Año del crédito",
+    'Capital': "Capital pagado en el año",
+    'Intereses': "Intereses pagados en el año",
+    'Seguros': "Seguros pagados en el año",
+    'Total Año': "Total pagado en el año",
+}
+
+
+def formatear_moneda(valores, decimales=2):
+    """
+    Convierte una columna de montos a texto con formato $1,234.56
+
+    Todos los valores se formatean en una sola llamada a str.format en lugar
+    de una llamada de Python por celda.
+    """
+    valores = valores.tolist() if hasattr(valores, 'tolist') else list(valores)
+    plantilla = '${:,.%df}' % decimales + _SEPARADOR
+    return (plantilla * len(valores)).format(*valores).split(_SEPARADOR)[:-1]
+
+
+def formatear_tabla(tabla_amortizacion):
+    """
+    Convierte la tabla de amortización a columnas de texto para el PDF
+    """
+    columnas = {'Mes': list(map(str, tabla_amortizacion['Mes'].astype(int).tolist()))}
+    for columna in COLUMNAS_TABLA[1:]:
+        columnas[columna] = formatear_moneda(tabla_amortizacion[columna])
+    return columnas
+
+
+def periodos_tabla(plazo_anos, anos_por_periodo=4):
+    """
+    Períodos de la tabla de amortización: (nombre, mes inicial, mes final) cada 4 años
+    """
+    periodos = []
+    for i in range(0, plazo_anos, anos_por_periodo):
+        inicio = i * 12 + 1
+        fin = min((i + anos_por_periodo) * 12, plazo_anos * 12)
+        periodos.append((f"Años {i+1}-{min(i + anos_por_periodo, plazo_anos)}", inicio, fin))
+    return periodos
+
+
+def generar_csv(tabla_amortizacion, encabezado=True):
+    """
+    Exporta la tabla de amortización a CSV con valores numéricos sin formato
+
+    Con encabezado=False se omiten los nombres de columna, para añadir
+    bloques a un CSV que ya los tiene.
+    """
+    return tabla_amortizacion.to_csv(index=False, header=encabezado)
+
+
+def _columnas_moneda(ayudas, columna_entera, decimales, columna_texto=None):
+    """
+    Configuración de st.dataframe que muestra los montos como $1,234.56, o
+    como $1,235 con decimales=0
+    """
+    import streamlit as st
+
+    configuracion = {}
+    for columna, ayuda in ayudas.items():
+        if columna == columna_texto:
+            configuracion[columna] = st.column_config.TextColumn(columna, help=ayuda)
+        elif columna == columna_entera:
+            configuracion[columna] = st.column_config.NumberColumn(columna, help=ayuda)
+        else:
+            # El formato "dollar" muestra tantos decimales como tenga step:
+            # con decimales=0 queda en dólares enteros ($1,235)
+            configuracion[columna] = st.column_config.NumberColumn(
+                columna, help=ayuda, format="dollar", step=10 ** -decimales
+            )
+    return configuracion
+
+
+def configuracion_columnas_tabla():
+    """
+    Configuración de columnas para mostrar la tabla de amortización
+    """
+    return _columnas_moneda(AYUDA_COLUMNAS_TABLA, 'Mes', 2)
+
+
+def configuracion_columnas_tabla_abonos():
+    """
+    Configuración de columnas para la tabla con abonos extraordinarios
+    """
+    return _columnas_moneda(AYUDA_COLUMNAS_TABLA_ABONOS, 'Mes', 2)
+
+
+def configuracion_columnas_resumen_anual():
+    """
+    Configuración de columnas para mostrar el resumen por año (sin centavos)
+    """
+    return _columnas_moneda(AYUDA_COLUMNAS_RESUMEN_ANUAL, 'Año', 0)
+
+
+def configuracion_columnas_escenarios():
+    """
+    Configuración de columnas para los percentiles de los escenarios de tasa
+    """
+    return _columnas_moneda(AYUDA_COLUMNAS_ESCENARIOS, None, 2, columna_texto='Percentil')
+
+
+def configuracion_columnas_comparacion():
+    """
+    Configuración de columnas para el resumen de la comparación de créditos
+    """
+    return _columnas_moneda(AYUDA_COLUMNAS_COMPARACION, 'Meses', 2, columna_texto='Escenario')
@@ -0,0 +1,276 @@
+"""
+Figuras de Plotly livianas para la interfaz
+
+Las figuras se arman con arreglos ya agregados y redondeados a centavos
+(Plotly serializa cada float con 17 dígitos) y las series largas se reducen
+con LTTB por encima de un presupuesto de puntos. Cada figura se guarda en
+caché por sus parámetros, así en cada rerun no se vuelve a armar; se guarda
+el objeto Figure y no su JSON porque st.plotly_chart vuelve a validar, mucho
+más lento, cualquier figura que reciba como dict. Plotly se importa solo al
+construir una figura.
+"""
+import threading
+
+import numpy as np
+from cachetools import LRUCache
+
+# Puntos por serie a partir de los cuales se reduce con LTTB
+PUNTOS_MAXIMOS = 120
+
+TAMANO_CACHE_FIGURAS = 128
+
+COLORES = {
+    'Capital': '#1f77b4',
+    'Intereses': '#ff7f0e',
+    'Seguros': '#2ca02c',
+}
+
+_figuras = LRUCache(TAMANO_CACHE_FIGURAS)
+_candado = threading.Lock()
+
+
+def _centavos(valores):
+    return np.round(np.asarray(valores, dtype=np.float64), 2)
+
+
+def reducir_lttb(x, y, puntos_maximos=PUNTOS_MAXIMOS):
+    """
+    Reduce una serie a puntos_maximos con Largest-Triangle-Three-Buckets
+
+    Conserva el primer y el último punto y, de cada grupo intermedio, el que
+    forma el triángulo más grande con el punto elegido antes y el promedio
+    del grupo siguiente; así se mantienen los picos y la forma de la curva.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n <= puntos_maximos or puntos_maximos < 3:
+        return x, y
+
+    bordes = np.linspace(1, n - 1, puntos_maximos - 1).astype(np.int64)
+    indices = np.empty(puntos_maximos, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    anterior = 0
+    for i in range(puntos_maximos - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        siguiente_fin = bordes[i + 2] if i + 2 < len(bordes) else n
+        promedio_x = x[fin:siguiente_fin].mean()
+        promedio_y = y[fin:siguiente_fin].mean()
+        area = np.abs(
+            (x[anterior] - promedio_x) * (y[inicio:fin] - y[anterior])
+            - (x[anterior] - x[inicio:fin]) * (promedio_y - y[anterior])
+        )
+        anterior = inicio + int(area.argmax())
+        indices[i + 1] = anterior
+
+    return x[indices], y[indices]
+
+
+def figura_en_cache(llave, construir):
+    """
+    Figura de la llave dada; construir() la arma solo la primera vez
+
+    La figura se comparte entre sesiones y no debe modificarse.
+    """
+    with _candado:
+        figura = _figuras.get(llave)
+    if figura is None:
+        figura = construir()
+        with _candado:
+            _figuras[llave] = figura
+    return figura
+
+
+def mostrar_figura(figura):
+    """
+    Muestra en Streamlit una figura de Plotly
+    """
+    import streamlit as st
+
+    st.plotly_chart(figura, use_container_width=True)
+
+
+def figura_anual(datos_anuales):
+    """
+    Barras apiladas de capital, intereses y seguros por año
+    """
+    import plotly.graph_objects as go
+
+    anos = np.asarray(datos_anuales['Año'])
+    fig = go.Figure()
+    for componente in ('Capital', 'Intereses', 'Seguros'):
+        fig.add_trace(go.Bar(
+            name=componente,
+            x=anos,
+            y=_centavos(datos_anuales[componente]),
+            marker_color=COLORES[componente],
+            hovertemplate=f'<b>Año %{{x}}</b><br>{componente}: $%{{y:,.2f}}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        title='Distribución de Pagos por Año',
+        xaxis_title='Año del Crédito',
+        yaxis_title='Monto ($)',
+        barmode='stack',
+        height=500,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        hovermode='x unified',
+        yaxis=dict(tickformat='$,.0f')
+    )
+    return fig
+
+
+def figura_mensual(tabla_amortizacion, puntos_maximos=PUNTOS_MAXIMOS):
+    """
+    Curvas de saldo pendiente e interés de cada mes, reducidas con LTTB
+    """
+    import plotly.graph_objects as go
+
+    meses = np.arange(1, len(tabla_amortizacion) + 1)
+    fig = go.Figure()
+    for nombre, eje, color in (('Saldo Pendiente', 'y', COLORES['Capital']), ('Interés', 'y2', COLORES['Intereses'])):
+        x, y = reducir_lttb(meses, tabla_amortizacion.columna(nombre), puntos_maximos)
+        fig.add_trace(go.Scatter(
+            x=x.astype(np.int64),
+            y=_centavos(y),
+            name=nombre,
+            yaxis=eje,
+            line=dict(color=color),
+            hovertemplate=f'<b>Mes %{{x}}</b><br>{nombre}: $%{{y:,.2f}}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        title='Saldo e Interés Mensual',
+        xaxis_title='Mes',
+        height=400,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        yaxis=dict(title='Saldo ($)', tickformat='$,.0f'),
+        yaxis2=dict(title='Interés ($)', tickformat='$,.0f', overlaying='y', side='right')
+    )
+    return fig
+
+
+def figura_saldos_abonos(saldo_base, saldo, puntos_maximos=PUNTOS_MAXIMOS):
+    """
+    Saldo pendiente con y sin abonos extraordinarios, reducidos con LTTB
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for nombre, saldos, color in (('Sin abonos', saldo_base, '#B0BEC5'), ('Con abonos', saldo, COLORES['Capital'])):
+        x, y = reducir_lttb(np.arange(1, len(saldos) + 1), saldos, puntos_maximos)
+        fig.add_trace(go.Scatter(x=x.astype(np.int64), y=_centavos(y), name=nombre, line=dict(color=color)))
+
+    fig.update_layout(
+        title="Saldo pendiente",
+        xaxis_title="Mes",
+        yaxis_title="Saldo ($)",
+        height=400,
+        hovermode='x unified'
+    )
+    return fig
+
+
+def figura_escenarios(resumen, cuota_mensual, cada_meses):
+    """
+    Abanico de la cuota mensual por percentiles de los escenarios de tasa
+
+    La cuota solo cambia en cada revisión, así que se grafica un punto por
+    período con líneas escalonadas en lugar de uno por mes.
+    """
+    import plotly.graph_objects as go
+
+    percentiles = resumen['percentiles']
+    mediana = percentiles.index(50)
+    num_pagos = resumen['cuotas_por_mes'].shape[1]
+
+    # Inicio de cada período más el último mes para cerrar el último escalón
+    meses = np.append(np.arange(1, num_pagos + 1, cada_meses), num_pagos)
+    cuotas = _centavos(resumen['cuotas_por_mes'][:, meses - 1])
+
+    fig = go.Figure()
+    for inferior, superior, opacidad in ((0, -1, 0.15), (1, -2, 0.3)):
+        fig.add_trace(go.Scatter(
+            x=meses, y=cuotas[superior], line=dict(width=0, shape='hv'), showlegend=False, hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=meses, y=cuotas[inferior], fill='tonexty', line=dict(width=0, shape='hv'),
+            fillcolor=f'rgba(31, 119, 180, {opacidad})',
+            name=f"Percentiles {percentiles[inferior]}-{percentiles[superior]}",
+            hoverinfo='skip'
+        ))
+    fig.add_trace(go.Scatter(
+        x=meses, y=cuotas[mediana], name='Mediana', line=dict(color=COLORES['Capital'], shape='hv')
+    ))
+    fig.add_trace(go.Scatter(
+        x=[1, num_pagos], y=[round(cuota_mensual, 2)] * 2, name='Tasa fija',
+        line=dict(color=COLORES['Intereses'], dash='dash')
+    ))
+    fig.update_layout(
+        title=f"Cuota mensual en {resumen['trayectorias']:,} escenarios de tasa",
+        xaxis_title='Mes',
+        yaxis_title='Cuota ($)',
+        height=450,
+        hovermode='x unified',
+        yaxis=dict(tickformat='$,.0f')
+    )
+    return fig
+
+
+def figura_sensibilidad(tasas, plazos, valores, variable, monto, consulta=None):
+    """
+    Mapa de calor de una variable por tasa y plazo, con el punto consultado marcado
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Heatmap(
+        z=_centavos(valores),
+        x=tasas,
+        y=plazos,
+        colorscale='Viridis',
+        colorbar=dict(title=variable, tickformat='$,.0f'),
+        hovertemplate="Tasa: %{x:.1f}%<br>Plazo: %{y} años<br>" + variable + ": $%{z:,.2f}<extra></extra>"
+    ))
+    if consulta is not None:
+        fig.add_trace(go.Scatter(
+            x=[consulta[0]], y=[consulta[1]], mode='markers',
+            marker=dict(color='white', size=12, symbol='x', line=dict(color='black', width=1)),
+            name='Consulta', hoverinfo='skip', showlegend=False
+        ))
+    fig.update_layout(
+        title=f"{variable} por tasa y plazo para ${monto:,.0f}",
+        xaxis_title="Tasa anual (%)",
+        yaxis_title="Plazo (años)",
+        height=550
+    )
+    return fig
+
+
+def figura_comparacion(saldos, puntos_maximos=PUNTOS_MAXIMOS):
+    """
+    Saldo pendiente de varios escenarios superpuestos ({nombre: saldos}), reducidos con LTTB
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for nombre, saldo in saldos.items():
+        x, y = reducir_lttb(np.arange(1, len(saldo) + 1), saldo, puntos_maximos)
+        fig.add_trace(go.Scatter(x=x.astype(np.int64), y=_centavos(y), name=nombre))
+
+    fig.update_layout(
+        title="Saldo pendiente por escenario",
+        xaxis_title="Mes",
+        yaxis_title="Saldo ($)",
+        height=450,
+        hovermode='x unified',
+        yaxis=dict(tickformat='$,.0f')
+    )
+    return fig
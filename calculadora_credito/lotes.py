@@ -0,0 +1,234 @@
+"""
+Calculadora por lotes: tablas de amortización de archivos de préstamos
+
+Lee los préstamos de un CSV o Parquet por bloques y escribe, también por
+bloques (en CSV, Parquet o XLSX), las tablas de amortización y una fila de
+resumen por préstamo. La memoria usada depende del tamaño del bloque y no
+del tamaño del archivo.
+
+Las tablas tienen las mismas columnas que el CSV de descarga de la
+aplicación, más la columna 'Préstamo' con la posición del préstamo en el
+archivo de entrada (empezando en 0).
+
+Uso:
+    python calculadora_credito/lotes.py prestamos.csv --tablas tablas.parquet --resumen resumen.csv
+    python calculadora_credito/lotes.py prestamos.parquet --tablas tablas.csv --procesos 4
+"""
+import argparse
+import csv
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from exportaciones import EscritorTablas, formato_de_ruta
+from nucleo.cartera import COLUMNAS_TOTALES, calcular_totales_cartera, generar_tablas_cartera
+from nucleo.tabla_compacta import COLUMNAS_TABLA
+
+COLUMNAS_ENTRADA = ('monto', 'tasa_anual', 'plazo_anos', 'cuota_seguro')
+COLUMNAS_OBLIGATORIAS = COLUMNAS_ENTRADA[:3]
+
+# Préstamos por bloque: con plazos de 30 años un bloque ocupa unos 40 MB
+FILAS_POR_BLOQUE = 2000
+
+ESQUEMA_TABLAS = pa.schema(
+    [('Préstamo', pa.int64()), ('Mes', pa.int64())]
+    + [(columna, pa.float64()) for columna in COLUMNAS_TABLA[1:]]
+)
+ESQUEMA_RESUMEN = pa.schema(
+    [('Préstamo', pa.int64())]
+    + [(columna, pa.int64() if columna == 'plazo_anos' else pa.float64()) for columna in COLUMNAS_TOTALES]
+)
+
+
+def _es_parquet(ruta):
+    return Path(ruta).suffix.lower() in ('.parquet', '.pq')
+
+
+def _columnas_disponibles(ruta):
+    """
+    Nombres de columna del archivo de entrada, sin leer sus datos
+    """
+    if _es_parquet(ruta):
+        return pq.ParquetFile(ruta).schema_arrow.names
+    with open(ruta, newline='', encoding='utf-8-sig') as archivo:
+        return next(csv.reader(archivo), [])
+
+
+def leer_bloques(ruta, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Recorre el archivo de préstamos y entrega bloques (inicio, montos, tasas, plazos, seguros)
+
+    'cuota_seguro' es opcional y vale 0 si falta la columna o el dato.
+    """
+    disponibles = _columnas_disponibles(ruta)
+    faltantes = [columna for columna in COLUMNAS_OBLIGATORIAS if columna not in disponibles]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en {ruta}: {', '.join(faltantes)}")
+    columnas = [columna for columna in COLUMNAS_ENTRADA if columna in disponibles]
+
+    if _es_parquet(ruta):
+        lotes = pq.ParquetFile(ruta).iter_batches(batch_size=filas_por_bloque, columns=columnas)
+    else:
+        lotes = pa_csv.open_csv(
+            ruta,
+            read_options=pa_csv.ReadOptions(block_size=max(filas_por_bloque * 64, 1 << 16)),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=columnas,
+                column_types={'monto': pa.float64(), 'tasa_anual': pa.float64(),
+                              'plazo_anos': pa.int64(), 'cuota_seguro': pa.float64()}
+            )
+        )
+
+    inicio = 0
+    for lote in lotes:
+        for desde in range(0, lote.num_rows, filas_por_bloque):
+            bloque = lote.slice(desde, filas_por_bloque)
+            for columna in COLUMNAS_OBLIGATORIAS:
+                if bloque.column(columna).null_count:
+                    raise ValueError(
+                        f"Hay préstamos sin '{columna}' entre las filas {inicio} y {inicio + bloque.num_rows - 1}"
+                    )
+            montos = bloque.column('monto').to_numpy()
+            tasas = bloque.column('tasa_anual').to_numpy()
+            plazos = bloque.column('plazo_anos').to_numpy()
+            seguros = (
+                bloque.column('cuota_seguro').fill_null(0).to_numpy()
+                if 'cuota_seguro' in columnas else 0
+            )
+            _validar_bloque(inicio, montos, tasas, plazos, seguros)
+            yield inicio, montos, tasas, plazos, seguros
+            inicio += bloque.num_rows
+
+
+def _validar_bloque(inicio, montos, tasas_anuales, plazos_anos, cuotas_seguro):
+    """
+    Falla con ValueError en la primera fila con monto <= 0, tasa o seguro negativos o plazo < 1
+    """
+    reglas = (
+        ('monto', montos, np.isfinite(montos) & (montos > 0), "debe ser mayor que 0"),
+        ('tasa_anual', tasas_anuales, np.isfinite(tasas_anuales) & (tasas_anuales >= 0), "no puede ser negativa"),
+        ('plazo_anos', plazos_anos, plazos_anos >= 1, "debe ser al menos 1"),
+        ('cuota_seguro', cuotas_seguro, np.isfinite(cuotas_seguro) & (cuotas_seguro >= 0), "no puede ser negativa"),
+    )
+    for columna, valores, validos, regla in reglas:
+        if not validos.all():
+            fila = int(np.argmin(validos))
+            raise ValueError(f"Fila {inicio + fila}: '{columna}' {regla} (vale {valores[fila]})")
+
+
+def calcular_bloque(inicio, montos, tasas_anuales, plazos_anos, cuotas_seguro):
+    """
+    Calcula las tablas de amortización y los totales de un bloque de préstamos
+    """
+    tablas = generar_tablas_cartera(montos, tasas_anuales, plazos_anos, cuotas_seguro)
+    tablas['Préstamo'] += inicio
+
+    totales = calcular_totales_cartera(montos, tasas_anuales, plazos_anos, cuotas_seguro)
+    totales.insert(0, 'Préstamo', np.arange(inicio, inicio + len(totales)))
+
+    return tablas, totales
+
+
+def procesar_archivo(entrada, ruta_tablas=None, ruta_resumen=None, procesos=1,
+                     filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Calcula todos los préstamos de un archivo y escribe sus tablas y resúmenes
+
+    Con procesos > 1 los bloques se calculan en paralelo; como mucho hay dos
+    bloques por proceso en vuelo, y se escriben en el orden del archivo.
+    Las salidas se escriben en archivos temporales que reemplazan a los
+    definitivos solo si todo el archivo se procesó; si algo falla no queda
+    ninguna salida a medio escribir.
+    Devuelve (préstamos, filas de tablas) escritos.
+    """
+    salidas = [
+        (tipo, Path(ruta), esquema)
+        for tipo, ruta, esquema in (('tablas', ruta_tablas, ESQUEMA_TABLAS), ('resumen', ruta_resumen, ESQUEMA_RESUMEN))
+        if ruta
+    ]
+    if len(salidas) == 2 and salidas[0][1].resolve() == salidas[1][1].resolve():
+        raise ValueError("Las tablas y el resumen deben escribirse en archivos distintos")
+    temporales = {ruta: ruta.with_name(ruta.name + f'.{os.getpid()}.tmp') for _, ruta, _ in salidas}
+    escritores = []
+
+    prestamos = 0
+    filas_tablas = 0
+
+    def escribir(resultado):
+        nonlocal prestamos, filas_tablas
+        tablas, totales = resultado
+        prestamos += len(totales)
+        filas_tablas += len(tablas)
+        for tipo, escritor in escritores:
+            escritor.escribir(tablas if tipo == 'tablas' else totales)
+
+    try:
+        try:
+            for tipo, ruta, esquema in salidas:
+                # El formato sale de la ruta definitiva: la temporal termina en .tmp
+                escritores.append((tipo, EscritorTablas(temporales[ruta], esquema, formato_de_ruta(ruta))))
+            bloques = leer_bloques(entrada, filas_por_bloque)
+            if procesos > 1:
+                pendientes = deque()
+                with ProcessPoolExecutor(max_workers=procesos) as grupo:
+                    for bloque in bloques:
+                        pendientes.append(grupo.submit(calcular_bloque, *bloque))
+                        if len(pendientes) >= 2 * procesos:
+                            escribir(pendientes.popleft().result())
+                    while pendientes:
+                        escribir(pendientes.popleft().result())
+            else:
+                for bloque in bloques:
+                    escribir(calcular_bloque(*bloque))
+        finally:
+            for _, escritor in escritores:
+                escritor.cerrar()
+    except BaseException:
+        for temporal in temporales.values():
+            temporal.unlink(missing_ok=True)
+        raise
+
+    for ruta, temporal in temporales.items():
+        os.replace(temporal, ruta)
+
+    return prestamos, filas_tablas
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Genera tablas de amortización y resúmenes para un archivo de préstamos (CSV o Parquet)."
+    )
+    parser.add_argument('entrada', help="CSV o Parquet con columnas monto, tasa_anual, plazo_anos y, opcional, cuota_seguro")
+    parser.add_argument('--tablas', help="archivo de salida (.csv, .parquet o .xlsx) con las tablas de amortización")
+    parser.add_argument('--resumen', help="archivo de salida (.csv, .parquet o .xlsx) con una fila de totales por préstamo")
+    parser.add_argument('--procesos', type=int, default=1, help="procesos de cálculo (por defecto 1)")
+    parser.add_argument('--filas-por-bloque', type=int, default=FILAS_POR_BLOQUE,
+                        help=f"préstamos por bloque (por defecto {FILAS_POR_BLOQUE})")
+    args = parser.parse_args(argumentos)
+
+    if not (args.tablas or args.resumen):
+        parser.error("indique al menos una salida con --tablas o --resumen")
+    if args.procesos < 1 or args.filas_por_bloque < 1:
+        parser.error("--procesos y --filas-por-bloque deben ser mayores que 0")
+    if args.tablas and args.resumen and Path(args.tablas).resolve() == Path(args.resumen).resolve():
+        parser.error("--tablas y --resumen deben ser archivos distintos")
+
+    try:
+        prestamos, filas = procesar_archivo(
+            args.entrada, args.tablas, args.resumen, args.procesos, args.filas_por_bloque
+        )
+    except (OSError, ValueError, pa.ArrowInvalid) as error:
+        parser.exit(1, f"Error: {error}\n")
+
+    print(f"{prestamos} préstamos procesados, {filas} filas de tablas de amortización", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Núcleo de cálculo de la calculadora de crédito
+
+Solo depende de NumPy (y cachetools para la caché compartida): se puede
+importar desde scripts por lotes, servicios o procesos de trabajo sin cargar
+Streamlit, Plotly ni reportlab. pandas se importa únicamente al convertir
+resultados en DataFrame.
+"""
+from .amortizacion import (
+    calcular_cuota_mensual,
+    generar_datos_anuales,
+    generar_tabla_amortizacion,
+    generar_tabla_compacta,
+)
+from .amortizacion_centavos import generar_tabla_centavos
+from .calculo_inverso import (
+    calcular_costo_anual_total,
+    calcular_monto_maximo,
+    calcular_plazo_minimo,
+    calcular_tasa_implicita,
+)
+from .cache_calculos import (
+    cache_calculos,
+    llave_tabla,
+    normalizar_parametros,
+    obtener_datos_anuales,
+    obtener_indice_amortizacion,
+    obtener_malla_sensibilidad,
+    obtener_tabla_compacta,
+)
+from .cartera import calcular_totales_cartera, generar_matrices_cartera, generar_tablas_cartera
+from .indice_amortizacion import IndiceAmortizacion
+from .sistemas_amortizacion import (
+    SISTEMAS,
+    SistemaAmortizacion,
+    calcular_totales_credito,
+    generar_tabla_sistema,
+    normalizar_sistema,
+    obtener_sistema,
+    registrar_sistema,
+)
+from .tabla_compacta import COLUMNAS_TABLA, TablaCompacta
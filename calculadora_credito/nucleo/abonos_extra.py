@@ -0,0 +1,244 @@
+"""
+Simulación de abonos extraordinarios (prepagos) a capital
+
+Un plan de abonos es una lista de tuplas (mes, monto) para un abono único o
+(mes, monto, cada_meses[, hasta_mes]) para uno recurrente; por ejemplo
+(12, 500, 12) abona $500 cada diciembre. El abono se aplica después del
+pago regular del mes.
+
+Con la política 'plazo' la cuota se mantiene y el crédito termina antes;
+con 'cuota' el plazo se mantiene y la cuota se recalcula después de cada
+abono. Entre dos abonos el saldo sigue la forma cerrada de la anualidad,
+así que cada tramo se calcula de una vez con NumPy.
+"""
+import numpy as np
+
+from .amortizacion import (
+    _redondeo_ambiguo,
+    calcular_columnas_amortizacion,
+    calcular_cuota_mensual,
+    calcular_cuota_saldo,
+    redondear_centavos,
+)
+from .tabla_compacta import COLUMNAS_TABLA
+
+REDUCIR_PLAZO = 'plazo'
+REDUCIR_CUOTA = 'cuota'
+POLITICAS = (REDUCIR_PLAZO, REDUCIR_CUOTA)
+
+COLUMNAS_TABLA_ABONOS = COLUMNAS_TABLA[:4] + ['Abono Extra'] + COLUMNAS_TABLA[4:]
+
+
+def expandir_abonos(abonos, num_pagos):
+    """
+    Convierte un plan de abonos en un arreglo con el abono extra de cada mes
+    """
+    extras = np.zeros(num_pagos)
+    for abono in abonos:
+        mes, monto = abono[:2]
+        cada_meses = abono[2] if len(abono) > 2 else 0
+        hasta_mes = abono[3] if len(abono) > 3 else None
+        if int(mes) < 1 or monto < 0 or cada_meses < 0:
+            raise ValueError(f"Abono inválido {abono!r}: el mes debe ser >= 1 y el monto y la frecuencia no negativos")
+        fin = num_pagos if hasta_mes is None else min(int(hasta_mes), num_pagos)
+        extras[int(mes) - 1:fin:int(cada_meses) or num_pagos] += monto
+    return extras
+
+
+class SimuladorAbonos:
+    """
+    Tabla de amortización de un crédito con abonos extraordinarios
+
+    Cada llamada a simular() compara el plan nuevo con el anterior y solo
+    recalcula desde el primer mes cuyo abono cambió: los meses previos no
+    dependen de los abonos posteriores y se conservan tal cual. Sin abonos
+    la tabla coincide con la de generar_tabla_amortizacion.
+    """
+
+    def __init__(self, monto, tasa_anual, plazo_anos, cuota_seguro=0, politica=REDUCIR_PLAZO):
+        if politica not in POLITICAS:
+            raise ValueError(f"Política desconocida {politica!r}; use una de {POLITICAS}")
+
+        self.monto = monto
+        self.tasa_anual = tasa_anual
+        self.plazo_anos = plazo_anos
+        self.cuota_seguro = cuota_seguro
+        self.politica = politica
+        self.tasa_mensual = tasa_anual / 100 / 12
+        self.num_pagos = plazo_anos * 12
+
+        # Tabla sin abonos, con la misma garantía de redondeo que la tabla normal;
+        # hasta el primer abono el crédito coincide con ella
+        base = calcular_columnas_amortizacion(monto, tasa_anual, plazo_anos)
+        if _redondeo_ambiguo(base, monto, tasa_anual, cuota_seguro):
+            base = calcular_columnas_amortizacion(monto, tasa_anual, plazo_anos, recurrencia=True)
+        self._base = base
+
+        n = self.num_pagos
+        self._extras = np.zeros(n)
+        self._cuota = base['Cuota Crédito'].copy()
+        self._cuota_vigente = np.full(n, calcular_cuota_mensual(monto, tasa_anual, plazo_anos))
+        self._interes = base['Interés'].copy()
+        self._abono_capital = base['Abono Capital'].copy()
+        self._abono_extra = np.zeros(n)
+        self._saldo = base['Saldo Pendiente'].copy()
+        self.meses_pagados = n
+        self.meses_recalculados = n
+
+    def simular(self, abonos):
+        """
+        Aplica un plan de abonos y devuelve el simulador actualizado
+        """
+        extras = expandir_abonos(abonos, self.num_pagos)
+        cambios = np.flatnonzero(extras != self._extras)
+        self._extras = extras
+        if len(cambios) == 0 or cambios[0] >= self.meses_pagados:
+            # Abonos iguales, o cambios después de que el crédito ya quedó pagado
+            self.meses_recalculados = 0
+        else:
+            self._recalcular_desde(int(cambios[0]))
+        return self
+
+    def _recalcular_desde(self, inicio):
+        n = self.num_pagos
+        tasa = self.tasa_mensual
+        self.meses_recalculados = n - inicio
+
+        if not self._extras[:inicio].any():
+            # Hasta el primer abono (incluido el pago regular de ese mes) la tabla es la base
+            con_abono = np.flatnonzero(self._extras[inicio:])
+            hasta = inicio + int(con_abono[0]) + 1 if len(con_abono) else n
+            for destino, origen in ((self._cuota, 'Cuota Crédito'), (self._interes, 'Interés'),
+                                    (self._abono_capital, 'Abono Capital'), (self._saldo, 'Saldo Pendiente')):
+                destino[inicio:hasta] = self._base[origen][inicio:hasta]
+            self._cuota_vigente[inicio:hasta] = self._cuota_vigente[0]
+            self._abono_extra[inicio:hasta] = 0.0
+            if not len(con_abono):
+                self.meses_pagados = n
+                return
+            saldo = self._aplicar_abono(hasta - 1, self._saldo[hasta - 1])
+            cuota = self._cuota_vigente[0]
+            mes = hasta
+        else:
+            saldo = self._saldo[inicio - 1]
+            cuota = self._cuota_vigente[inicio]
+            mes = inicio
+
+        while mes < n and saldo > 0:
+            if self.politica == REDUCIR_CUOTA and mes > 0 and self._abono_extra[mes - 1] > 0:
+                cuota = calcular_cuota_saldo(saldo, tasa, n - mes)
+
+            # Tramo sin abonos: hasta el próximo mes con abono o el final del plazo
+            siguientes = np.flatnonzero(self._extras[mes:])
+            fin = mes + int(siguientes[0]) + 1 if len(siguientes) else n
+            meses = np.arange(1, fin - mes + 1)
+            if tasa == 0:
+                saldos = saldo - cuota * meses
+            else:
+                saldos = saldo - (cuota - saldo * tasa) * np.expm1(meses * np.log1p(tasa)) / tasa
+
+            # El crédito se cierra en el primer mes con saldo menor a un centavo
+            # o en el último mes del plazo
+            cerrados = saldos < 0.01
+            cierre = int(np.argmax(cerrados)) if cerrados.any() else (len(saldos) - 1 if fin == n else None)
+            if cierre is not None:
+                saldos = saldos[:cierre + 1]
+                fin = mes + cierre + 1
+
+            anteriores = np.concatenate(([saldo], saldos[:-1]))
+            interes = anteriores * tasa
+            self._interes[mes:fin] = interes
+            self._abono_capital[mes:fin] = cuota - interes
+            self._cuota[mes:fin] = cuota
+            self._cuota_vigente[mes:fin] = cuota
+            self._abono_extra[mes:fin] = 0.0
+            self._saldo[mes:fin] = saldos
+
+            if cierre is not None:
+                # Último pago ajustado para que el saldo quede exactamente en 0
+                self._abono_capital[fin - 1] = anteriores[-1]
+                self._cuota[fin - 1] = interes[-1] + anteriores[-1]
+                self._saldo[fin - 1] = 0.0
+                saldo = 0.0
+            else:
+                saldo = self._aplicar_abono(fin - 1, saldos[-1])
+            mes = fin
+
+        self.meses_pagados = mes
+        for columna in (self._cuota, self._interes, self._abono_capital, self._abono_extra, self._saldo):
+            columna[mes:] = 0.0
+
+    def _aplicar_abono(self, posicion, saldo):
+        """
+        Descuenta el abono del mes (sin pasar del saldo) y devuelve el saldo resultante
+        """
+        abono = min(self._extras[posicion], saldo)
+        saldo -= abono
+        if saldo < 0.01:
+            abono += saldo
+            saldo = 0.0
+        self._abono_extra[posicion] = abono
+        self._saldo[posicion] = saldo
+        return saldo
+
+    def columnas(self):
+        """
+        Columnas de la tabla redondeadas a centavos, solo de los meses pagados
+        """
+        m = self.meses_pagados
+        cuota = self._cuota[:m]
+        extra = self._abono_extra[:m]
+        return {
+            'Mes': np.arange(1, m + 1),
+            'Cuota Crédito': redondear_centavos(cuota),
+            'Interés': redondear_centavos(self._interes[:m]),
+            'Abono Capital': redondear_centavos(self._abono_capital[:m]),
+            'Abono Extra': redondear_centavos(extra),
+            'Seguro': np.full(m, round(self.cuota_seguro, 2)),
+            'Pago Total': redondear_centavos(cuota + extra + self.cuota_seguro),
+            'Saldo Pendiente': redondear_centavos(self._saldo[:m]),
+        }
+
+    def columnas_base(self):
+        """
+        Columnas del mismo crédito sin abonos, redondeadas a centavos
+        """
+        return {
+            nombre: redondear_centavos(self._base[nombre])
+            for nombre in ('Cuota Crédito', 'Interés', 'Abono Capital', 'Saldo Pendiente')
+        }
+
+    def a_dataframe(self):
+        """
+        Tabla de amortización con la columna 'Abono Extra' como DataFrame
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.columnas(), columns=COLUMNAS_TABLA_ABONOS)
+
+    def resumen(self):
+        """
+        Totales del crédito con abonos y lo ahorrado frente al crédito sin abonos
+
+        'cuota_final' es la cuota vigente al terminar, sin el ajuste del último pago.
+        """
+        columnas = self.columnas()
+        intereses = float(columnas['Interés'].sum())
+        intereses_base = float(self.columnas_base()['Interés'].sum())
+        return {
+            'meses': self.meses_pagados,
+            'meses_ahorrados': self.num_pagos - self.meses_pagados,
+            'cuota_final': round(float(self._cuota_vigente[self.meses_pagados - 1]), 2),
+            'total_abonos_extra': float(columnas['Abono Extra'].sum()),
+            'intereses_pagados': intereses,
+            'intereses_ahorrados': intereses_base - intereses,
+            'total_seguros': float(columnas['Seguro'].sum()),
+            'total_general': float(columnas['Pago Total'].sum()),
+        }
+
+
+def generar_tabla_abonos(monto, tasa_anual, plazo_anos, cuota_seguro=0, abonos=(), politica=REDUCIR_PLAZO):
+    """
+    Tabla de amortización con un plan de abonos extraordinarios
+    """
+    return SimuladorAbonos(monto, tasa_anual, plazo_anos, cuota_seguro, politica).simular(abonos).a_dataframe()
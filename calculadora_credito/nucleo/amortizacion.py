@@ -0,0 +1,234 @@
+import numpy as np
+
+from .indice_amortizacion import IndiceAmortizacion
+from .tabla_compacta import COLUMNAS_TABLA, TablaCompacta
+
+
+def calcular_cuota_mensual(monto, tasa_anual, plazo_anos):
+    """
+    Calcula la cuota mensual usando la fórmula de amortización estándar
+    """
+    if tasa_anual == 0:
+        return monto / (plazo_anos * 12)
+
+    tasa_mensual = tasa_anual / 100 / 12
+    num_pagos = plazo_anos * 12
+
+    cuota = monto * (tasa_mensual * (1 + tasa_mensual)**num_pagos) / ((1 + tasa_mensual)**num_pagos - 1)
+    return cuota
+
+
+def calcular_cuota_saldo(saldo, tasa_mensual, meses):
+    """
+    Cuota que amortiza un saldo en los meses restantes a la tasa mensual dada
+    """
+    if tasa_mensual == 0:
+        return saldo / meses
+    # r / (1 - (1 + r)^-n), estable para plazos largos y tasas altas
+    return saldo * tasa_mensual / -np.expm1(-meses * np.log1p(tasa_mensual))
+
+
+def redondear_centavos(valores):
+    """
+    Redondea un arreglo a 2 decimales con el mismo resultado que round(x, 2)
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    escalado = valores * 100
+    redondeado = np.rint(escalado) / 100
+
+    # Cerca de medio centavo el producto x * 100 puede cruzar el empate;
+    # esos pocos casos se delegan a round() para conservar su resultado exacto
+    dudosos = np.abs(escalado - np.floor(escalado) - 0.5) < 1e-6
+    if dudosos.any():
+        redondeado[dudosos] = [round(float(v), 2) for v in valores[dudosos]]
+
+    return redondeado
+
+
+def _saldos_recurrencia(monto, tasa_mensual, cuota_mensual, num_pagos):
+    """
+    Saldos mes a mes con la misma aritmética de punto flotante que la versión iterativa
+    """
+    saldos = np.empty(num_pagos)
+    saldo_pendiente = monto
+
+    for i in range(num_pagos):
+        saldo_pendiente -= cuota_mensual - saldo_pendiente * tasa_mensual
+        if saldo_pendiente < 0.01:
+            saldo_pendiente = 0
+        saldos[i] = saldo_pendiente
+
+    return saldos
+
+
+def calcular_columnas_amortizacion(monto, tasa_anual, plazo_anos, recurrencia=False):
+    """
+    Calcula cuota, interés, abono y saldo de todos los meses a la vez (sin redondear)
+
+    Usa la forma cerrada del saldo de una anualidad:
+    saldo_k = P - (C - P·r) · ((1 + r)^k - 1) / r
+    Con recurrencia=True el saldo se obtiene mes a mes, reproduciendo bit a bit
+    el error de redondeo acumulado de la versión iterativa.
+    """
+    cuota_mensual = calcular_cuota_mensual(monto, tasa_anual, plazo_anos)
+    tasa_mensual = tasa_anual / 100 / 12
+    num_pagos = plazo_anos * 12
+    meses = np.arange(1, num_pagos + 1)
+
+    if tasa_anual == 0:
+        # Restas sucesivas en el mismo orden que el ciclo: resultado idéntico
+        saldo = np.subtract.accumulate(np.concatenate(([float(monto)], np.full(num_pagos, cuota_mensual))))[1:]
+    elif recurrencia:
+        saldo = _saldos_recurrencia(monto, tasa_mensual, cuota_mensual, num_pagos)
+    else:
+        crecimiento = np.expm1(meses * np.log1p(tasa_mensual))
+        saldo = monto - (cuota_mensual - monto * tasa_mensual) * crecimiento / tasa_mensual
+
+    # Asegurar que el saldo no sea negativo: a partir del primer mes con
+    # saldo menor a un centavo el crédito queda cerrado
+    cerrados = saldo < 0.01
+    if cerrados.any():
+        saldo[int(np.argmax(cerrados)):] = 0.0
+
+    saldo_anterior = np.empty(num_pagos)
+    saldo_anterior[0] = monto
+    saldo_anterior[1:] = saldo[:-1]
+
+    interes = saldo_anterior * tasa_mensual
+    abono_capital = cuota_mensual - interes
+    cuota_ajustada = np.full(num_pagos, float(cuota_mensual))
+
+    # Para el último pago, ajustar para que el saldo sea exactamente 0
+    abono_capital[-1] = saldo_anterior[-1]
+    cuota_ajustada[-1] = interes[-1] + saldo_anterior[-1]
+    saldo[-1] = 0.0
+
+    return {
+        'Mes': meses,
+        'Cuota Crédito': cuota_ajustada,
+        'Interés': interes,
+        'Abono Capital': abono_capital,
+        'Saldo Pendiente': saldo,
+    }
+
+
+def _redondeo_ambiguo(columnas, monto, tasa_anual, cuota_seguro):
+    """
+    Indica si algún valor de la forma cerrada está tan cerca de medio centavo
+    que el error acumulado del ciclo iterativo podría redondearlo distinto
+
+    Acepta un préstamo (arreglos 1-D) o una cartera (filas de arreglos 2-D con
+    monto, tasa y seguro como columnas); en ese caso responde por fila.
+    """
+    tasa_anual = np.asarray(tasa_anual, dtype=np.float64)
+    tasa_mensual = tasa_anual / 100 / 12
+    meses = columnas['Mes']
+    cuota_mensual = columnas['Cuota Crédito'][..., :1]
+
+    # Cota empírica del error de la recurrencia (medida ~0.45; margen ×4)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tolerancia = 2 * np.finfo(np.float64).eps * meses * (monto + cuota_mensual / tasa_mensual) * np.exp(meses * np.log1p(tasa_mensual))
+    tolerancia = tolerancia * 100 + 1e-6
+
+    saldo = columnas['Saldo Pendiente']
+    ambiguo = (np.abs(saldo - 0.01) * 100 < tolerancia).any(axis=-1)
+
+    for valores in (columnas['Cuota Crédito'], columnas['Cuota Crédito'] + cuota_seguro,
+                    columnas['Interés'], columnas['Abono Capital'], saldo):
+        escalado = valores * 100
+        ambiguo |= (np.abs(escalado - np.floor(escalado) - 0.5) < tolerancia).any(axis=-1)
+
+    # Sin interés el motor ya reproduce las restas del ciclo exactamente
+    return ambiguo & np.reshape(tasa_anual != 0, np.shape(ambiguo))
+
+
+def generar_tabla_compacta(monto, tasa_anual, plazo_anos, cuota_seguro=0):
+    """
+    Genera la tabla de amortización completa en su representación compacta
+    """
+    columnas = calcular_columnas_amortizacion(monto, tasa_anual, plazo_anos)
+    if _redondeo_ambiguo(columnas, monto, tasa_anual, cuota_seguro):
+        columnas = calcular_columnas_amortizacion(monto, tasa_anual, plazo_anos, recurrencia=True)
+
+    # La cuota es la misma todos los meses salvo el ajuste del último pago
+    cuota_credito = redondear_centavos(columnas['Cuota Crédito'][[0, -1]])
+    pago_total = redondear_centavos(columnas['Cuota Crédito'][[0, -1]] + cuota_seguro)
+
+    return TablaCompacta(
+        redondear_centavos(columnas['Interés']),
+        redondear_centavos(columnas['Abono Capital']),
+        redondear_centavos(columnas['Saldo Pendiente']),
+        cuota_credito[0], cuota_credito[1],
+        pago_total[0], pago_total[1],
+        round(cuota_seguro, 2),
+        sin_interes=tasa_anual == 0
+    )
+
+
+def generar_tabla_amortizacion(monto, tasa_anual, plazo_anos, cuota_seguro=0):
+    """
+    Genera la tabla de amortización completa con cálculos vectorizados
+    """
+    return generar_tabla_compacta(monto, tasa_anual, plazo_anos, cuota_seguro).a_dataframe()
+
+
+def generar_datos_anuales(tabla_amortizacion, cuota_seguro, indice=None):
+    """
+    Genera datos agregados por año para el gráfico de barras apiladas
+
+    Se calcula con las sumas acumuladas del índice de la tabla; si ya se
+    tiene el índice (por ejemplo desde la caché) se pasa para no reconstruirlo.
+    """
+    if indice is None:
+        indice = IndiceAmortizacion(tabla_amortizacion)
+
+    return indice.datos_anuales()
+
+
+def generar_tabla_amortizacion_iterativa(monto, tasa_anual, plazo_anos, cuota_seguro=0):
+    """
+    Versión de referencia mes a mes de generar_tabla_amortizacion
+
+    Se conserva para comprobar la equivalencia del motor vectorizado.
+    """
+    cuota_mensual = calcular_cuota_mensual(monto, tasa_anual, plazo_anos)
+    tasa_mensual = tasa_anual / 100 / 12
+    num_pagos = plazo_anos * 12
+
+    tabla = []
+    saldo_pendiente = monto
+
+    for mes in range(1, num_pagos + 1):
+        if tasa_anual == 0:
+            interes = 0
+            abono_capital = cuota_mensual
+        else:
+            interes = saldo_pendiente * tasa_mensual
+            abono_capital = cuota_mensual - interes
+
+        # Para el último pago, ajustar para que el saldo sea exactamente 0
+        if mes == num_pagos:
+            abono_capital = saldo_pendiente
+            cuota_ajustada = interes + abono_capital
+        else:
+            cuota_ajustada = cuota_mensual
+
+        saldo_pendiente -= abono_capital
+
+        # Asegurar que el saldo no sea negativo
+        if saldo_pendiente < 0.01:
+            saldo_pendiente = 0
+
+        tabla.append({
+            'Mes': mes,
+            'Cuota Crédito': round(cuota_ajustada, 2),
+            'Interés': round(interes, 2),
+            'Abono Capital': round(abono_capital, 2),
+            'Seguro': round(cuota_seguro, 2),
+            'Pago Total': round(cuota_ajustada + cuota_seguro, 2),
+            'Saldo Pendiente': round(saldo_pendiente, 2)
+        })
+
+    import pandas as pd
+
+    return pd.DataFrame(tabla)
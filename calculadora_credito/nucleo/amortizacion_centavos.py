@@ -0,0 +1,98 @@
+"""
+Motor de amortización exacto en centavos enteros
+
+Todas las columnas se calculan como enteros de centavos (int64) con redondeo
+bancario (mitad al par). Cada saldo se redondea por período a partir de la
+forma cerrada y el abono a capital es la diferencia entre saldos
+consecutivos, así que:
+
+- cada fila cumple Cuota Crédito == Interés + Abono Capital exactamente,
+- la suma de Abono Capital es exactamente el monto del préstamo,
+- el residuo de redondeo se acumula en la última cuota.
+"""
+import numpy as np
+
+from .tabla_compacta import TablaCompacta, comprobar_centavos
+
+
+def a_centavos(monto):
+    """
+    Convierte un monto en pesos a centavos enteros con redondeo bancario
+
+    Falla con ValueError si el monto no es finito o sus centavos no caben en int64.
+    """
+    return int(comprobar_centavos(np.rint(np.float64(monto) * 100)))
+
+
+def calcular_cuota_centavos(monto, tasa_anual, plazo_anos):
+    """
+    Cuota mensual en centavos enteros, redondeada al centavo par más cercano
+    """
+    monto_centavos = a_centavos(monto)
+    num_pagos = plazo_anos * 12
+
+    if tasa_anual == 0:
+        return int(np.rint(monto_centavos / num_pagos))
+
+    tasa_mensual = tasa_anual / 100 / 12
+    # r / (1 - (1 + r)^-n), estable para plazos largos y tasas altas
+    factor = tasa_mensual / -np.expm1(-num_pagos * np.log1p(tasa_mensual))
+    return int(np.rint(monto_centavos * factor))
+
+
+def calcular_columnas_centavos(monto, tasa_anual, plazo_anos):
+    """
+    Calcula las columnas de la tabla en centavos enteros, todos los meses a la vez
+    """
+    monto_centavos = a_centavos(monto)
+    cuota = calcular_cuota_centavos(monto, tasa_anual, plazo_anos)
+    tasa_mensual = tasa_anual / 100 / 12
+    num_pagos = plazo_anos * 12
+    meses = np.arange(1, num_pagos + 1)
+
+    # Saldo exacto con la cuota ya redondeada, redondeado por período
+    if tasa_anual == 0:
+        saldo = monto_centavos - cuota * meses
+    else:
+        crecimiento = np.expm1(meses * np.log1p(tasa_mensual))
+        saldo = np.rint(monto_centavos - (cuota - monto_centavos * tasa_mensual) * crecimiento / tasa_mensual)
+    saldo = np.maximum(comprobar_centavos(saldo), 0).astype(np.int64)
+
+    saldo_anterior = np.empty(num_pagos, dtype=np.int64)
+    saldo_anterior[0] = monto_centavos
+    saldo_anterior[1:] = saldo[:-1]
+
+    # El último pago cancela el saldo restante y absorbe el residuo
+    saldo[-1] = 0
+    abono_capital = saldo_anterior - saldo
+    interes = cuota - abono_capital
+    interes[-1] = int(np.rint(saldo_anterior[-1] * tasa_mensual))
+    cuota_credito = np.full(num_pagos, cuota, dtype=np.int64)
+    cuota_credito[-1] = interes[-1] + abono_capital[-1]
+
+    return {
+        'Mes': meses,
+        'Cuota Crédito': cuota_credito,
+        'Interés': interes,
+        'Abono Capital': abono_capital,
+        'Saldo Pendiente': saldo,
+    }
+
+
+def generar_tabla_centavos(monto, tasa_anual, plazo_anos, cuota_seguro=0):
+    """
+    Genera la tabla de amortización exacta en centavos como TablaCompacta
+    """
+    columnas = calcular_columnas_centavos(monto, tasa_anual, plazo_anos)
+    seguro = a_centavos(cuota_seguro)
+    cuota_credito = columnas['Cuota Crédito']
+
+    return TablaCompacta.desde_centavos(
+        columnas['Interés'],
+        columnas['Abono Capital'],
+        columnas['Saldo Pendiente'],
+        cuota_credito[0], cuota_credito[-1],
+        cuota_credito[0] + seguro, cuota_credito[-1] + seguro,
+        round(cuota_seguro, 2),
+        sin_interes=tasa_anual == 0
+    )
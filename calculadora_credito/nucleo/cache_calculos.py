@@ -0,0 +1,238 @@
+"""
+Caché compartida de tablas de amortización y datos anuales
+
+Las tablas se guardan en memoria del proceso, de modo que todas las sesiones
+de Streamlit (y cualquier script por lotes) reutilizan los cálculos de los
+mismos parámetros. La caché es LRU con vencimiento por tiempo (TTL).
+
+Opcionalmente tiene un respaldo persistente (por ejemplo, el almacén de
+escenarios): ante un fallo, las tablas se buscan ahí antes de calcularlas.
+"""
+import threading
+
+from cachetools import TTLCache
+
+from .amortizacion import generar_datos_anuales
+from .indice_amortizacion import IndiceAmortizacion
+from .sensibilidad import calcular_malla_sensibilidad
+from .sistemas_amortizacion import FRANCES, normalizar_sistema, obtener_sistema
+
+TAMANO_MAXIMO = 256
+SEGUNDOS_VIGENCIA = 3600
+
+# Decimales conservados al normalizar la tasa: absorbe el ruido de punto
+# flotante de los controles (12.000000000000002 == 12.0)
+DECIMALES_TASA = 6
+
+
+def normalizar_parametros(monto, tasa_anual, plazo_anos, cuota_seguro=0):
+    """
+    Normaliza los parámetros del crédito para usarlos como llave de caché
+
+    Monto y seguro pasan a float redondeado al centavo: 100000 y 100000.0
+    dan la misma llave (y el mismo archivo en el almacén de escenarios). Los
+    tipos de columna de la tabla no dependen del tipo de los parámetros.
+    """
+    return (
+        float(round(monto, 2)),
+        round(float(tasa_anual), DECIMALES_TASA),
+        int(plazo_anos),
+        float(round(cuota_seguro, 2)),
+    )
+
+
+def llave_tabla(monto, tasa_anual, plazo_anos, cuota_seguro=0, exacto=False, sistema=FRANCES, opciones=None):
+    """
+    Llave normalizada de la tabla de un crédito, compartida por la caché y su respaldo
+    """
+    return (
+        ('tabla', exacto)
+        + normalizar_parametros(monto, tasa_anual, plazo_anos, cuota_seguro)
+        + normalizar_sistema(sistema, opciones)
+    )
+
+
+class _TTLCacheContada(TTLCache):
+    """
+    TTLCache que cuenta los desalojos por tamaño y los vencimientos por tiempo
+    """
+
+    def __init__(self, maxsize, ttl):
+        super().__init__(maxsize, ttl)
+        self.desalojos = 0
+        self.vencimientos = 0
+
+    def popitem(self):
+        llave, valor = super().popitem()
+        self.desalojos += 1
+        return llave, valor
+
+    def expire(self, time=None):
+        vencidos = super().expire(time)
+        self.vencimientos += len(vencidos)
+        return vencidos
+
+
+class CacheCalculos:
+    """
+    Caché acotada de cálculos de amortización con contadores de uso
+
+    Las tablas compactas, los índices y los datos anuales devueltos se
+    comparten entre sesiones y no deben modificarse.
+
+    respaldo es un objeto con cargar_tabla(llave), que devuelve la tabla
+    compacta guardada con esa llave (ver llave_tabla) o None.
+    """
+
+    def __init__(self, tamano_maximo=TAMANO_MAXIMO, segundos_vigencia=SEGUNDOS_VIGENCIA, respaldo=None):
+        self._cache = _TTLCacheContada(tamano_maximo, segundos_vigencia)
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.respaldo = respaldo
+        self.cargadas = 0
+
+    def _obtener(self, llave, calcular):
+        with self._candado:
+            valor = self._cache.get(llave)
+            if valor is not None:
+                self.aciertos += 1
+                return valor
+            self.fallos += 1
+
+        # El cálculo se hace fuera del candado para no bloquear otras sesiones
+        valor = calcular()
+        with self._candado:
+            self._cache[llave] = valor
+        return valor
+
+    def tabla_compacta(self, monto, tasa_anual, plazo_anos, cuota_seguro=0, exacto=False,
+                       sistema=FRANCES, opciones=None):
+        """
+        Tabla de amortización compacta de los parámetros dados, calculada una sola vez
+
+        Con exacto=True se usa el motor en centavos enteros; sistema y
+        opciones eligen el sistema de amortización (francés por defecto).
+        """
+        llave = llave_tabla(monto, tasa_anual, plazo_anos, cuota_seguro, exacto, sistema, opciones)
+        return self._obtener(llave, lambda: self._cargar_o_generar(llave))
+
+    def _cargar_o_generar(self, llave):
+        respaldo = self.respaldo
+        if respaldo is not None:
+            tabla = respaldo.cargar_tabla(llave)
+            if tabla is not None:
+                with self._candado:
+                    self.cargadas += 1
+                return tabla
+        parametros, llave_sistema = llave[2:6], llave[6:]
+        return obtener_sistema(llave_sistema[0]).generar_tabla(
+            *parametros, exacto=llave[1], **dict(llave_sistema[1:])
+        )
+
+    def tabla_amortizacion(self, monto, tasa_anual, plazo_anos, cuota_seguro=0, exacto=False,
+                           sistema=FRANCES, opciones=None):
+        """
+        Tabla de amortización como DataFrame nuevo, convertida desde la tabla compacta en caché
+        """
+        return self.tabla_compacta(
+            monto, tasa_anual, plazo_anos, cuota_seguro, exacto, sistema, opciones
+        ).a_dataframe()
+
+    def datos_anuales(self, monto, tasa_anual, plazo_anos, cuota_seguro=0, exacto=False,
+                      sistema=FRANCES, opciones=None):
+        """
+        Datos agregados por año de los parámetros dados, calculados una sola vez
+        """
+        parametros = normalizar_parametros(monto, tasa_anual, plazo_anos, cuota_seguro)
+        llave_sistema = normalizar_sistema(sistema, opciones)
+        return self._obtener(
+            ('anual', exacto) + parametros + llave_sistema,
+            lambda: generar_datos_anuales(
+                self.tabla_compacta(*parametros, exacto, sistema, opciones), parametros[3],
+                self.indice_amortizacion(*parametros, exacto, sistema, opciones)
+            )
+        )
+
+    def indice_amortizacion(self, monto, tasa_anual, plazo_anos, cuota_seguro=0, exacto=False,
+                            sistema=FRANCES, opciones=None):
+        """
+        Índice por mes y sumas acumuladas de la tabla, calculados una sola vez
+        """
+        parametros = normalizar_parametros(monto, tasa_anual, plazo_anos, cuota_seguro)
+        llave_sistema = normalizar_sistema(sistema, opciones)
+        return self._obtener(
+            ('indice', exacto) + parametros + llave_sistema,
+            lambda: IndiceAmortizacion(self.tabla_compacta(*parametros, exacto, sistema, opciones))
+        )
+
+    def malla_sensibilidad(self, monto, cuota_seguro=0):
+        """
+        Malla de cuotas e intereses por tasa y plazo de un monto, calculada una sola vez
+        """
+        monto, _, _, cuota_seguro = normalizar_parametros(monto, 0, 0, cuota_seguro)
+        return self._obtener(
+            ('malla', monto, cuota_seguro),
+            lambda: calcular_malla_sensibilidad(monto, cuota_seguro)
+        )
+
+    def estadisticas(self):
+        """
+        Devuelve los contadores de aciertos, fallos, tablas cargadas del respaldo, desalojos y vencimientos
+        """
+        with self._candado:
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'cargadas': self.cargadas,
+                'desalojos': self._cache.desalojos,
+                'vencimientos': self._cache.vencimientos,
+                'entradas': len(self._cache),
+            }
+
+    def limpiar(self):
+        """
+        Vacía la caché y reinicia los contadores
+        """
+        with self._candado:
+            self._cache = _TTLCacheContada(self._cache.maxsize, self._cache.ttl)
+            self.aciertos = 0
+            self.fallos = 0
+            self.cargadas = 0
+
+
+# Instancia compartida por todas las sesiones del proceso
+cache_calculos = CacheCalculos()
+
+
+def obtener_tabla_compacta(monto, tasa_anual, plazo_anos, cuota_seguro=0, exacto=False,
+                           sistema=FRANCES, opciones=None):
+    """
+    Tabla de amortización compacta desde la caché compartida
+    """
+    return cache_calculos.tabla_compacta(monto, tasa_anual, plazo_anos, cuota_seguro, exacto, sistema, opciones)
+
+
+def obtener_datos_anuales(monto, tasa_anual, plazo_anos, cuota_seguro=0, exacto=False,
+                          sistema=FRANCES, opciones=None):
+    """
+    Datos anuales desde la caché compartida
+    """
+    return cache_calculos.datos_anuales(monto, tasa_anual, plazo_anos, cuota_seguro, exacto, sistema, opciones)
+
+
+def obtener_indice_amortizacion(monto, tasa_anual, plazo_anos, cuota_seguro=0, exacto=False,
+                                sistema=FRANCES, opciones=None):
+    """
+    Índice de la tabla de amortización desde la caché compartida
+    """
+    return cache_calculos.indice_amortizacion(
+        monto, tasa_anual, plazo_anos, cuota_seguro, exacto, sistema, opciones
+    )
+
+
+def obtener_malla_sensibilidad(monto, cuota_seguro=0):
+    """
+    Malla de sensibilidad a tasa y plazo desde la caché compartida
+    """
+    return cache_calculos.malla_sensibilidad(monto, cuota_seguro)
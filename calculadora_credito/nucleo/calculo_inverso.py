@@ -0,0 +1,165 @@
+"""
+Cálculo inverso: partir del presupuesto mensual en lugar del monto
+
+Despeja el monto máximo, la tasa implícita o el plazo mínimo de la fórmula
+de la cuota. Las funciones aceptan números o arreglos (con broadcasting de
+NumPy) para resolver miles de consultas en una sola llamada; con números
+devuelven un float. El presupuesto es el pago total del mes, así que la
+cuota de seguro se descuenta antes de despejar.
+"""
+import numpy as np
+
+# Newton converge en pocas iteraciones; el límite solo protege de casos raros
+MAX_ITERACIONES = 100
+TOLERANCIA_TASA = 1e-15
+
+
+def _factor_cuota(tasa_mensual, meses):
+    """
+    Cuota por cada peso prestado: r / (1 - (1 + r)^-n), y 1/n con tasa 0
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = tasa_mensual / -np.expm1(-meses * np.log1p(tasa_mensual))
+    return np.where(tasa_mensual == 0, 1 / meses, factor)
+
+
+def _derivada_factor(tasa_mensual, meses):
+    """
+    Derivada analítica del factor de cuota respecto a la tasa mensual
+    """
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        descuento = -np.expm1(-meses * np.log1p(tasa_mensual))
+        derivada = (descuento - tasa_mensual * meses * np.exp(-(meses + 1) * np.log1p(tasa_mensual))) / descuento ** 2
+    # Cerca de 0 la fórmula pierde precisión; ahí vale (n + 1) / 2n
+    return np.where(tasa_mensual * meses < 1e-6, (meses + 1) / (2 * meses), derivada)
+
+
+def _como_resultado(valores, escalar):
+    return float(valores) if escalar else valores
+
+
+def _es_escalar(*valores):
+    return all(np.ndim(valor) == 0 for valor in valores)
+
+
+def calcular_monto_maximo(presupuesto, tasa_anual, plazo_anos, cuota_seguro=0):
+    """
+    Monto máximo que se puede pedir con un pago mensual dado (forma cerrada)
+
+    Si el presupuesto no alcanza para el seguro el monto es 0.
+    """
+    escalar = _es_escalar(presupuesto, tasa_anual, plazo_anos, cuota_seguro)
+    cuota = np.maximum(np.asarray(presupuesto, dtype=np.float64) - cuota_seguro, 0.0)
+    tasa_mensual = np.asarray(tasa_anual, dtype=np.float64) / 100 / 12
+    monto = cuota / _factor_cuota(tasa_mensual, np.asarray(plazo_anos) * 12)
+    return _como_resultado(monto, escalar)
+
+
+def calcular_tasa_implicita(monto, presupuesto, plazo_anos, cuota_seguro=0):
+    """
+    Tasa anual (%) con la que la cuota del crédito más el seguro es el presupuesto
+
+    Resuelve con Newton y derivada analítica, partiendo de una cota superior
+    de la tasa; como la cuota es creciente y convexa en la tasa las
+    iteraciones bajan sin pasarse de la raíz. Si un paso sale del intervalo
+    conocido se usa bisección. Devuelve NaN cuando ninguna tasa no negativa
+    da esa cuota (el presupuesto no cubre ni el crédito sin intereses).
+    """
+    escalar = _es_escalar(monto, presupuesto, plazo_anos, cuota_seguro)
+    monto, cuota, meses = np.broadcast_arrays(
+        np.asarray(monto, dtype=np.float64),
+        np.asarray(presupuesto, dtype=np.float64) - cuota_seguro,
+        np.asarray(plazo_anos, dtype=np.float64) * 12,
+    )
+    forma = monto.shape
+    meses = np.atleast_1d(meses)
+    objetivo = np.atleast_1d(cuota / monto)
+
+    # La cuota por peso es mayor que la tasa, así que la tasa está en [0, objetivo]
+    inferior = np.zeros(objetivo.shape)
+    superior = objetivo.copy()
+    tasa = superior.copy()
+    sin_interes = 1 / meses
+    factible = objetivo > sin_interes
+    exacta_cero = np.isclose(objetivo, sin_interes, rtol=1e-12, atol=0)
+    pendientes = factible & ~exacta_cero
+
+    for _ in range(MAX_ITERACIONES):
+        if not pendientes.any():
+            break
+        r = tasa[pendientes]
+        n = meses[pendientes]
+        error = _factor_cuota(r, n) - objetivo[pendientes]
+
+        # Mantener el intervalo que contiene la raíz
+        lo = np.where(error < 0, r, inferior[pendientes])
+        hi = np.where(error > 0, r, superior[pendientes])
+        nueva = r - error / _derivada_factor(r, n)
+        fuera = ~np.isfinite(nueva) | (nueva <= lo) | (nueva >= hi)
+        nueva = np.where(fuera, (lo + hi) / 2, nueva)
+
+        inferior[pendientes] = lo
+        superior[pendientes] = hi
+        tasa[pendientes] = nueva
+        convergidas = (np.abs(nueva - r) <= TOLERANCIA_TASA * np.maximum(1.0, r)) | (error == 0)
+        pendientes[pendientes] = ~convergidas
+
+    tasa = np.where(exacta_cero, 0.0, np.where(factible, tasa, np.nan))
+    return _como_resultado((tasa * 12 * 100).reshape(forma), escalar)
+
+
+def calcular_plazo_minimo(monto, presupuesto, tasa_anual, cuota_seguro=0, en_meses=False):
+    """
+    Plazo mínimo en años (o meses) cuya cuota cabe en el presupuesto
+
+    En años es el menor plazo_anos con
+    calcular_cuota_mensual(monto, tasa_anual, plazo_anos) + cuota_seguro <= presupuesto,
+    comparados al centavo.
+    Devuelve inf cuando la cuota no alcanza ni para los intereses del mes.
+    """
+    escalar = _es_escalar(monto, presupuesto, tasa_anual, cuota_seguro)
+    monto, cuota, tasa_mensual = np.broadcast_arrays(
+        np.asarray(monto, dtype=np.float64),
+        np.asarray(presupuesto, dtype=np.float64) - cuota_seguro,
+        np.asarray(tasa_anual, dtype=np.float64) / 100 / 12,
+    )
+    factible = cuota > monto * tasa_mensual
+
+    # n = -log(1 - P·r / C) / log(1 + r), o P / C sin intereses
+    with np.errstate(divide='ignore', invalid='ignore'):
+        meses = np.where(
+            tasa_mensual == 0,
+            monto / cuota,
+            -np.log1p(-monto * tasa_mensual / cuota) / np.log1p(tasa_mensual),
+        )
+    meses = np.where(factible, meses, np.inf)
+    unidad = 1 if en_meses else 12
+    plazo = np.ceil(meses / unidad)
+
+    # El redondeo de la forma cerrada puede dejar el plazo un período corto o
+    # largo justo en el límite; se corrige comparando la cuota en centavos, así
+    # un presupuesto igual a la cuota de un plazo alcanza para ese plazo
+    finitos = np.isfinite(plazo)
+    plazo = np.where(finitos, np.maximum(plazo, 1), plazo)
+    sin_infinitos = np.where(finitos, plazo, 1)
+    limite = np.round(cuota * 100)
+    cabe = np.round(_factor_cuota(tasa_mensual, sin_infinitos * unidad) * monto * 100) <= limite
+    cabe_antes = np.round(
+        _factor_cuota(tasa_mensual, np.maximum(sin_infinitos - 1, 1) * unidad) * monto * 100
+    ) <= limite
+    plazo = np.where(finitos & ~cabe, plazo + 1, plazo)
+    plazo = np.where(finitos & cabe & cabe_antes & (plazo > 1), plazo - 1, plazo)
+
+    return _como_resultado(plazo, escalar)
+
+
+def calcular_costo_anual_total(monto, tasa_anual, plazo_anos, cuota_seguro=0):
+    """
+    Tasa anual (%) equivalente al pago total del mes, seguro incluido
+
+    Es la tasa implícita de un crédito sin seguro cuya cuota fuera la cuota
+    del crédito más el seguro; sirve para comparar ofertas con distinto seguro.
+    """
+    tasa_mensual = np.asarray(tasa_anual, dtype=np.float64) / 100 / 12
+    cuota = np.asarray(monto, dtype=np.float64) * _factor_cuota(tasa_mensual, np.asarray(plazo_anos) * 12)
+    return calcular_tasa_implicita(monto, cuota + cuota_seguro, plazo_anos)
@@ -0,0 +1,245 @@
+"""
+Cálculo de carteras completas de créditos en una sola llamada
+
+Cada préstamo es una fila y cada mes una columna: las cuotas, intereses y
+saldos de todos los créditos se calculan a la vez con NumPy. Las carteras
+grandes pueden repartirse en bloques entre varios procesos.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .amortizacion import (
+    COLUMNAS_TABLA,
+    _redondeo_ambiguo,
+    calcular_columnas_amortizacion,
+    redondear_centavos,
+)
+
+COLUMNAS_TOTALES = [
+    'monto', 'tasa_anual', 'plazo_anos', 'cuota_seguro', 'cuota_mensual',
+    'total_pagado', 'intereses_pagados', 'total_seguros', 'total_general'
+]
+
+TAMANO_BLOQUE = 5000
+
+
+def _preparar_cartera(montos, tasas_anuales, plazos_anos, cuotas_seguro=0):
+    """
+    Convierte los parámetros de la cartera en arreglos 1-D de igual longitud
+    """
+    montos, tasas_anuales, plazos_anos, cuotas_seguro = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(montos, dtype=np.float64)),
+        np.atleast_1d(np.asarray(tasas_anuales, dtype=np.float64)),
+        np.atleast_1d(np.asarray(plazos_anos, dtype=np.int64)),
+        np.atleast_1d(np.asarray(cuotas_seguro, dtype=np.float64)),
+    )
+    if montos.ndim != 1:
+        raise ValueError("Los parámetros de la cartera deben ser arreglos de una dimensión")
+    if (plazos_anos < 1).any():
+        raise ValueError("Todos los plazos deben ser de al menos 1 año")
+
+    return montos, tasas_anuales, plazos_anos, cuotas_seguro
+
+
+def calcular_cuotas_cartera(montos, tasas_anuales, plazos_anos):
+    """
+    Versión vectorizada de calcular_cuota_mensual para muchos préstamos
+    """
+    montos, tasas_anuales, plazos_anos, _ = _preparar_cartera(montos, tasas_anuales, plazos_anos)
+
+    tasa_mensual = tasas_anuales / 100 / 12
+    num_pagos = plazos_anos * 12
+
+    # (1 + r)^n con la potencia de Python (pow de libm), que no siempre coincide
+    # bit a bit con np.power; se evalúa una vez por combinación de tasa y plazo
+    combinaciones, posiciones = np.unique(
+        np.column_stack((1 + tasa_mensual, num_pagos)), axis=0, return_inverse=True
+    )
+    factor = np.array([base**int(exponente) for base, exponente in combinaciones])[posiciones.ravel()]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cuota = montos * (tasa_mensual * factor) / (factor - 1)
+
+    return np.where(tasas_anuales == 0, montos / num_pagos, cuota)
+
+
+def calcular_columnas_cartera(montos, tasas_anuales, plazos_anos, num_meses=None):
+    """
+    Calcula las columnas de amortización de todos los préstamos (sin redondear)
+
+    Devuelve matrices préstamos × meses; los meses posteriores al plazo de
+    cada préstamo quedan en NaN.
+    """
+    montos, tasas_anuales, plazos_anos, _ = _preparar_cartera(montos, tasas_anuales, plazos_anos)
+
+    cuotas = calcular_cuotas_cartera(montos, tasas_anuales, plazos_anos)[:, None]
+    tasa_mensual = (tasas_anuales / 100 / 12)[:, None]
+    num_pagos = plazos_anos * 12
+    if num_meses is None:
+        num_meses = int(num_pagos.max())
+    monto = montos[:, None]
+    meses = np.arange(1, num_meses + 1)
+    filas = np.arange(len(montos))
+    ultimo = num_pagos - 1
+
+    # Saldo en forma cerrada; sin interés, restas sucesivas como en el ciclo
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crecimiento = np.expm1(meses * np.log1p(tasa_mensual))
+        saldo = monto - (cuotas - monto * tasa_mensual) * crecimiento / tasa_mensual
+    sin_interes = tasas_anuales == 0
+    if sin_interes.any():
+        restas = np.concatenate((monto[sin_interes], np.repeat(cuotas[sin_interes], num_meses, axis=1)), axis=1)
+        saldo[sin_interes] = np.subtract.accumulate(restas, axis=1)[:, 1:]
+
+    # A partir del primer mes con saldo menor a un centavo el crédito queda cerrado
+    saldo[np.logical_or.accumulate(saldo < 0.01, axis=1)] = 0.0
+
+    saldo_anterior = np.empty_like(saldo)
+    saldo_anterior[:, 0] = montos
+    saldo_anterior[:, 1:] = saldo[:, :-1]
+
+    interes = saldo_anterior * tasa_mensual
+    abono_capital = cuotas - interes
+    cuota_ajustada = np.repeat(cuotas, num_meses, axis=1)
+
+    # Último pago de cada préstamo: ajustar para que el saldo sea exactamente 0
+    abono_capital[filas, ultimo] = saldo_anterior[filas, ultimo]
+    cuota_ajustada[filas, ultimo] = interes[filas, ultimo] + saldo_anterior[filas, ultimo]
+    saldo[filas, ultimo] = 0.0
+
+    fuera_de_plazo = meses[None, :] > num_pagos[:, None]
+    for matriz in (cuota_ajustada, interes, abono_capital, saldo):
+        matriz[fuera_de_plazo] = np.nan
+
+    return {
+        'Mes': meses,
+        'Cuota Crédito': cuota_ajustada,
+        'Interés': interes,
+        'Abono Capital': abono_capital,
+        'Saldo Pendiente': saldo,
+    }
+
+
+def _bloque_cartera(montos, tasas_anuales, plazos_anos, cuotas_seguro, num_meses):
+    """
+    Calcula y redondea las matrices de un bloque de préstamos
+    """
+    columnas = calcular_columnas_cartera(montos, tasas_anuales, plazos_anos, num_meses)
+
+    # Los préstamos cuyo redondeo depende del error acumulado del ciclo
+    # iterativo se recalculan con su misma aritmética, igual que en
+    # generar_tabla_amortizacion
+    ambiguos = np.flatnonzero(_redondeo_ambiguo(
+        columnas, montos[:, None], tasas_anuales[:, None], cuotas_seguro[:, None]
+    ))
+    for i in ambiguos:
+        exactas = calcular_columnas_amortizacion(montos[i], tasas_anuales[i], int(plazos_anos[i]), recurrencia=True)
+        n = len(exactas['Mes'])
+        for nombre in ('Cuota Crédito', 'Interés', 'Abono Capital', 'Saldo Pendiente'):
+            columnas[nombre][i, :n] = exactas[nombre]
+
+    fuera_de_plazo = np.isnan(columnas['Cuota Crédito'])
+    seguro = np.repeat(redondear_centavos(cuotas_seguro)[:, None], num_meses, axis=1)
+    seguro[fuera_de_plazo] = np.nan
+    mes = np.broadcast_to(columnas['Mes'], seguro.shape).astype(np.float64)
+    mes[fuera_de_plazo] = np.nan
+
+    return {
+        'Mes': mes,
+        'Cuota Crédito': redondear_centavos(columnas['Cuota Crédito']),
+        'Interés': redondear_centavos(columnas['Interés']),
+        'Abono Capital': redondear_centavos(columnas['Abono Capital']),
+        'Seguro': seguro,
+        'Pago Total': redondear_centavos(columnas['Cuota Crédito'] + cuotas_seguro[:, None]),
+        'Saldo Pendiente': redondear_centavos(columnas['Saldo Pendiente'])
+    }
+
+
+def generar_matrices_cartera(montos, tasas_anuales, plazos_anos, cuotas_seguro=0,
+                             procesos=None, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Genera las tablas de amortización de una cartera como matrices préstamos × meses
+
+    Devuelve un diccionario con una matriz por columna de la tabla de
+    amortización, rellenada con NaN después del plazo de cada préstamo.
+    Con procesos > 1 la cartera se reparte en bloques de tamano_bloque
+    préstamos entre un grupo de procesos.
+    """
+    montos, tasas_anuales, plazos_anos, cuotas_seguro = _preparar_cartera(
+        montos, tasas_anuales, plazos_anos, cuotas_seguro
+    )
+    num_meses = int(plazos_anos.max()) * 12
+
+    bloques = [
+        (montos[i:i + tamano_bloque], tasas_anuales[i:i + tamano_bloque],
+         plazos_anos[i:i + tamano_bloque], cuotas_seguro[i:i + tamano_bloque], num_meses)
+        for i in range(0, len(montos), tamano_bloque)
+    ]
+
+    if procesos and procesos > 1 and len(bloques) > 1:
+        with ProcessPoolExecutor(max_workers=procesos) as grupo:
+            resultados = list(grupo.map(_bloque_cartera, *zip(*bloques)))
+    else:
+        resultados = [_bloque_cartera(*bloque) for bloque in bloques]
+
+    if len(resultados) == 1:
+        return resultados[0]
+
+    return {
+        columna: np.concatenate([resultado[columna] for resultado in resultados])
+        for columna in COLUMNAS_TABLA
+    }
+
+
+def generar_tablas_cartera(montos, tasas_anuales, plazos_anos, cuotas_seguro=0,
+                           procesos=None, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Genera las tablas de amortización de una cartera apiladas en formato largo
+
+    Cada fila es un mes de un préstamo; la columna 'Préstamo' indica la
+    posición del préstamo en los arreglos de entrada.
+    """
+    matrices = generar_matrices_cartera(
+        montos, tasas_anuales, plazos_anos, cuotas_seguro, procesos, tamano_bloque
+    )
+    en_plazo = ~np.isnan(matrices['Mes'])
+    prestamo = np.broadcast_to(np.arange(en_plazo.shape[0])[:, None], en_plazo.shape)
+
+    import pandas as pd
+
+    tablas = pd.DataFrame({'Préstamo': prestamo[en_plazo]})
+    for columna in COLUMNAS_TABLA:
+        tablas[columna] = matrices[columna][en_plazo]
+    tablas['Mes'] = tablas['Mes'].astype(np.int64)
+
+    return tablas
+
+
+def calcular_totales_cartera(montos, tasas_anuales, plazos_anos, cuotas_seguro=0):
+    """
+    Calcula por préstamo los mismos totales que el resumen del crédito
+
+    Las columnas coinciden con las llaves de st.session_state.parametros.
+    """
+    montos, tasas_anuales, plazos_anos, cuotas_seguro = _preparar_cartera(
+        montos, tasas_anuales, plazos_anos, cuotas_seguro
+    )
+
+    cuota_mensual = calcular_cuotas_cartera(montos, tasas_anuales, plazos_anos)
+    total_pagado = cuota_mensual * plazos_anos * 12
+    total_seguros = cuotas_seguro * plazos_anos * 12
+
+    import pandas as pd
+
+    return pd.DataFrame({
+        'monto': montos,
+        'tasa_anual': tasas_anuales,
+        'plazo_anos': plazos_anos,
+        'cuota_seguro': cuotas_seguro,
+        'cuota_mensual': cuota_mensual,
+        'total_pagado': total_pagado,
+        'intereses_pagados': total_pagado - montos,
+        'total_seguros': total_seguros,
+        'total_general': total_pagado + total_seguros
+    }, columns=COLUMNAS_TOTALES)
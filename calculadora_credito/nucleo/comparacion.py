@@ -0,0 +1,164 @@
+"""
+Comparación de varios créditos (ofertas) lado a lado
+
+Cada escenario tiene un nombre y sus parámetros (monto, tasa anual, plazo
+y seguro). Se guarda solo su tabla compacta y un resumen de totales; al
+actualizar los escenarios se recalculan únicamente los que cambiaron. La
+memoria de las tablas de una comparación tiene un tope.
+"""
+import numpy as np
+
+from .cache_calculos import normalizar_parametros, obtener_tabla_compacta
+
+# Tope de memoria de las tablas de una comparación (una sesión); un crédito
+# a 30 años ocupa unos 4 KB
+MEMORIA_MAXIMA = 256 * 1024
+
+LIMITES_PARAMETROS = {
+    'monto': (1000, 10000000),
+    'tasa_anual': (0.0, 50.0),
+    'plazo_anos': (1, 30),
+    'cuota_seguro': (0, 500),
+}
+
+
+def validar_escenario(nombre, monto, tasa_anual, plazo_anos, cuota_seguro=0):
+    """
+    Valida los parámetros de un escenario con los mismos rangos de la interfaz
+    """
+    if not str(nombre).strip():
+        raise ValueError("Cada escenario necesita un nombre")
+    valores = {'monto': monto, 'tasa_anual': tasa_anual, 'plazo_anos': plazo_anos, 'cuota_seguro': cuota_seguro}
+    for parametro, valor in valores.items():
+        minimo, maximo = LIMITES_PARAMETROS[parametro]
+        if valor is None or not minimo <= valor <= maximo:
+            raise ValueError(f"{nombre}: {parametro} debe estar entre {minimo:,} y {maximo:,}")
+    if int(plazo_anos) != plazo_anos:
+        raise ValueError(f"{nombre}: el plazo debe ser un número entero de años")
+
+
+class ComparadorCreditos:
+    """
+    Escenarios de crédito con nombre, recalculados solo cuando cambian
+
+    Las tablas salen de la caché compartida (tablas compactas, de solo
+    lectura); el tope de memoria cuenta las tablas que la comparación
+    mantiene referenciadas.
+    """
+
+    def __init__(self, memoria_maxima=MEMORIA_MAXIMA):
+        self.memoria_maxima = memoria_maxima
+        self._escenarios = {}
+        self.recalculados = []
+
+    def actualizar(self, escenarios):
+        """
+        Reemplaza los escenarios por los dados ({nombre: (monto, tasa, plazo, seguro)})
+
+        Conserva el cálculo de los escenarios cuyos parámetros no cambiaron.
+        Si los escenarios nuevos superan el tope de memoria se lanza
+        ValueError y la comparación queda como estaba.
+        """
+        nuevos = {}
+        recalculados = []
+        for nombre, parametros in escenarios.items():
+            validar_escenario(nombre, *parametros)
+            llave = normalizar_parametros(*parametros)
+            anterior = self._escenarios.get(nombre)
+            if anterior is not None and anterior['parametros'] == llave:
+                nuevos[nombre] = anterior
+            else:
+                nuevos[nombre] = self._calcular(llave)
+                recalculados.append(nombre)
+
+        memoria = sum(escenario['tabla'].nbytes for escenario in nuevos.values())
+        if memoria > self.memoria_maxima:
+            raise ValueError(
+                f"Los escenarios ocupan {memoria / 1024:,.0f} KB y el máximo es "
+                f"{self.memoria_maxima / 1024:,.0f} KB; quita algunos o acorta los plazos"
+            )
+
+        self._escenarios = nuevos
+        self.recalculados = recalculados
+        return self
+
+    @staticmethod
+    def _calcular(parametros):
+        tabla = obtener_tabla_compacta(*parametros)
+        intereses = round(float(tabla.columna('Interés').sum()), 2)
+        seguros = round(float(tabla.columna('Seguro').sum()), 2)
+        return {
+            'parametros': parametros,
+            'tabla': tabla,
+            'cuota': float(tabla.columna('Cuota Crédito', 0, 1)[0]),
+            'intereses': intereses,
+            'seguros': seguros,
+            'total_general': round(float(tabla.columna('Pago Total').sum()), 2),
+        }
+
+    @property
+    def nombres(self):
+        return list(self._escenarios)
+
+    @property
+    def nbytes(self):
+        """
+        Bytes de las tablas referenciadas por la comparación
+        """
+        return sum(escenario['tabla'].nbytes for escenario in self._escenarios.values())
+
+    def parametros(self, nombre):
+        """
+        Parámetros normalizados del escenario
+        """
+        return self._escenarios[nombre]['parametros']
+
+    def tabla(self, nombre):
+        """
+        Tabla compacta del escenario
+        """
+        return self._escenarios[nombre]['tabla']
+
+    def resumen(self):
+        """
+        Totales de cada escenario como columnas, con la diferencia de costo
+        frente al escenario más barato (intereses más seguros)
+        """
+        escenarios = list(self._escenarios.values())
+        costos = [round(escenario['intereses'] + escenario['seguros'], 2) for escenario in escenarios]
+        minimo = min(costos, default=0.0)
+        return {
+            'Escenario': self.nombres,
+            'Cuota Crédito': [escenario['cuota'] for escenario in escenarios],
+            'Pago Mensual': [round(escenario['cuota'] + escenario['parametros'][3], 2) for escenario in escenarios],
+            'Meses': [len(escenario['tabla']) for escenario in escenarios],
+            'Intereses': [escenario['intereses'] for escenario in escenarios],
+            'Seguros': [escenario['seguros'] for escenario in escenarios],
+            'Costo Total': costos,
+            'Total a Pagar': [escenario['total_general'] for escenario in escenarios],
+            'Diferencia': [round(costo - minimo, 2) for costo in costos],
+        }
+
+    def costo_acumulado(self, nombre, meses=None):
+        """
+        Intereses más seguros pagados hasta cada mes; después del último pago se mantiene
+        """
+        tabla = self.tabla(nombre)
+        costo = np.cumsum(tabla.columna('Interés') + tabla.columna('Seguro'))
+        if meses is not None and meses > len(costo):
+            costo = np.concatenate((costo, np.full(meses - len(costo), costo[-1])))
+        return costo
+
+    def mes_cruce(self, nombre, referencia):
+        """
+        Primer mes en que el costo acumulado del escenario pasa de estar por
+        debajo a estar por encima del de la referencia (o al revés); None si nunca se cruzan
+        """
+        meses = max(len(self.tabla(nombre)), len(self.tabla(referencia)))
+        signos = np.sign(np.round(self.costo_acumulado(nombre, meses) - self.costo_acumulado(referencia, meses), 2))
+        distintos = np.flatnonzero(signos)
+        if len(distintos) == 0:
+            return None
+        inicial = signos[distintos[0]]
+        cruces = np.flatnonzero(signos[distintos[0]:] == -inicial)
+        return int(distintos[0] + cruces[0] + 1) if len(cruces) else None
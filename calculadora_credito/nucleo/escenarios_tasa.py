@@ -0,0 +1,175 @@
+"""
+Pruebas de estrés con escenarios de tasa (Monte Carlo)
+
+Se simulan muchas trayectorias de la tasa de un crédito variable que se
+revisa cada cierto número de meses, con un modelo de Vasicek (reversión a
+la media) o una caminata aleatoria, y se calcula el crédito en cada una.
+Las trayectorias se evalúan por bloques como matrices trayectorias × meses
+con NumPy; los bloques pueden repartirse entre varios procesos. Cada bloque
+usa su propia semilla derivada de la semilla principal, así el resultado no
+depende del número de procesos.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+VASICEK = 'vasicek'
+CAMINATA = 'caminata'
+MODELOS = (VASICEK, CAMINATA)
+
+# Trayectorias por bloque: con plazos de 30 años un bloque ocupa unos 15 MB
+TRAYECTORIAS_POR_BLOQUE = 1000
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def simular_tasas(generador, num_trayectorias, num_periodos, tasa_inicial, modelo=VASICEK,
+                  volatilidad=1.0, reversion=0.5, tasa_largo_plazo=None, cada_meses=12):
+    """
+    Genera trayectorias de la tasa anual (%) en cada período de revisión
+
+    La volatilidad está en puntos porcentuales por raíz de año; con Vasicek
+    la tasa vuelve hacia tasa_largo_plazo con velocidad reversion. La tasa
+    nunca baja de 0.
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo desconocido {modelo!r}; use uno de {MODELOS}")
+    if tasa_largo_plazo is None:
+        tasa_largo_plazo = tasa_inicial
+
+    dt = cada_meses / 12
+    choques = generador.standard_normal((num_trayectorias, num_periodos - 1)) * volatilidad * np.sqrt(dt)
+
+    tasas = np.empty((num_trayectorias, num_periodos))
+    tasas[:, 0] = tasa_inicial
+    for periodo in range(1, num_periodos):
+        anterior = tasas[:, periodo - 1]
+        deriva = reversion * (tasa_largo_plazo - anterior) * dt if modelo == VASICEK else 0.0
+        tasas[:, periodo] = np.maximum(anterior + deriva + choques[:, periodo - 1], 0.0)
+
+    return tasas
+
+
+def evaluar_trayectorias(monto, plazo_anos, tasas, cada_meses=12):
+    """
+    Calcula el crédito para cada trayectoria de tasas (filas de tasas)
+
+    En cada revisión la cuota se recalcula sobre el saldo y los meses
+    restantes; dentro de un período el saldo sigue la forma cerrada de la
+    anualidad para todas las trayectorias a la vez. Devuelve por trayectoria
+    los intereses pagados y la cuota de cada período.
+    """
+    num_pagos = plazo_anos * 12
+    num_trayectorias, num_periodos = tasas.shape
+    tasas_mensuales = tasas / 100 / 12
+
+    saldo = np.empty((num_trayectorias, num_pagos))
+    cuotas = np.empty((num_trayectorias, num_periodos))
+    saldo_inicial = np.full(num_trayectorias, float(monto))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for periodo in range(num_periodos):
+            inicio = periodo * cada_meses
+            fin = min(inicio + cada_meses, num_pagos)
+            tasa = tasas_mensuales[:, periodo]
+            sin_interes = tasa == 0
+            restantes = num_pagos - inicio
+
+            cuota = np.where(
+                sin_interes,
+                saldo_inicial / restantes,
+                saldo_inicial * tasa / -np.expm1(-restantes * np.log1p(tasa))
+            )
+            meses = np.arange(1, fin - inicio + 1)
+            crecimiento = np.expm1(meses * np.log1p(tasa)[:, None])
+            saldos = np.where(
+                sin_interes[:, None],
+                saldo_inicial[:, None] - cuota[:, None] * meses,
+                saldo_inicial[:, None] - ((cuota - saldo_inicial * tasa) / tasa)[:, None] * crecimiento
+            )
+
+            cuotas[:, periodo] = cuota
+            saldo[:, inicio:fin] = saldos
+            saldo_inicial = saldos[:, -1]
+
+    saldo_anterior = np.empty_like(saldo)
+    saldo_anterior[:, 0] = monto
+    saldo_anterior[:, 1:] = saldo[:, :-1]
+    tasa_por_mes = np.repeat(tasas_mensuales, cada_meses, axis=1)[:, :num_pagos]
+
+    return {
+        'intereses_pagados': (saldo_anterior * tasa_por_mes).sum(axis=1),
+        'cuotas': cuotas,
+    }
+
+
+def _bloque_escenarios(semilla, num_trayectorias, monto, tasa_anual, plazo_anos, modelo,
+                       volatilidad, reversion, tasa_largo_plazo, cada_meses):
+    """
+    Simula y evalúa un bloque de trayectorias con su propia semilla
+    """
+    num_periodos = -(-plazo_anos * 12 // cada_meses)
+    tasas = simular_tasas(
+        np.random.default_rng(semilla), num_trayectorias, num_periodos, tasa_anual,
+        modelo, volatilidad, reversion, tasa_largo_plazo, cada_meses
+    )
+    resultado = evaluar_trayectorias(monto, plazo_anos, tasas, cada_meses)
+    resultado['tasas'] = tasas
+    return resultado
+
+
+def simular_escenarios_tasa(monto, tasa_anual, plazo_anos, num_trayectorias=1000, modelo=VASICEK,
+                            volatilidad=1.0, reversion=0.5, tasa_largo_plazo=None, cada_meses=12,
+                            semilla=0, procesos=None, trayectorias_por_bloque=TRAYECTORIAS_POR_BLOQUE):
+    """
+    Simula num_trayectorias escenarios de tasa y devuelve los resultados por trayectoria
+
+    El diccionario trae 'intereses_pagados' (una entrada por trayectoria),
+    'cuotas' y 'tasas' (trayectorias × períodos de revisión). Con
+    procesos > 1 los bloques se reparten entre un grupo de procesos.
+    """
+    tamanos = [
+        min(trayectorias_por_bloque, num_trayectorias - inicio)
+        for inicio in range(0, num_trayectorias, trayectorias_por_bloque)
+    ]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    bloques = [
+        (semilla_bloque, tamano, monto, tasa_anual, plazo_anos, modelo,
+         volatilidad, reversion, tasa_largo_plazo, cada_meses)
+        for semilla_bloque, tamano in zip(semillas, tamanos)
+    ]
+
+    if procesos and procesos > 1 and len(bloques) > 1:
+        # 'spawn' igual que en tareas_pdf: se puede llamar desde Streamlit, que usa hilos
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context('spawn')) as grupo:
+            resultados = list(grupo.map(_bloque_escenarios, *zip(*bloques)))
+    else:
+        resultados = [_bloque_escenarios(*bloque) for bloque in bloques]
+
+    return {
+        columna: np.concatenate([resultado[columna] for resultado in resultados])
+        for columna in ('intereses_pagados', 'cuotas', 'tasas')
+    }
+
+
+def resumir_escenarios(escenarios, plazo_anos, cada_meses=12, percentiles=PERCENTILES):
+    """
+    Percentiles de los intereses, la cuota máxima y la cuota y tasa de cada mes
+
+    'cuotas_por_mes' y 'tasas_por_mes' tienen una fila por percentil y una
+    columna por mes, listas para un gráfico de abanico.
+    """
+    num_pagos = plazo_anos * 12
+    cuotas_por_periodo = np.percentile(escenarios['cuotas'], percentiles, axis=0)
+    tasas_por_periodo = np.percentile(escenarios['tasas'], percentiles, axis=0)
+
+    return {
+        'percentiles': tuple(percentiles),
+        'trayectorias': len(escenarios['intereses_pagados']),
+        'intereses_pagados': np.percentile(escenarios['intereses_pagados'], percentiles),
+        'intereses_promedio': float(escenarios['intereses_pagados'].mean()),
+        'cuota_maxima': np.percentile(escenarios['cuotas'].max(axis=1), percentiles),
+        'cuotas_por_mes': np.repeat(cuotas_por_periodo, cada_meses, axis=1)[:, :num_pagos],
+        'tasas_por_mes': np.repeat(tasas_por_periodo, cada_meses, axis=1)[:, :num_pagos],
+    }
@@ -0,0 +1,106 @@
+"""
+Índice de la tabla de amortización para consultas por rango de meses
+"""
+import numpy as np
+
+# Columnas cuyas sumas por rango se consultan en los resúmenes
+COLUMNAS_ACUMULADAS = ('Cuota Crédito', 'Pago Total', 'Interés', 'Abono Capital', 'Seguro')
+
+
+class IndiceAmortizacion:
+    """
+    Posición de cada mes en la tabla y sumas acumuladas de sus montos
+
+    Se construye una vez por tabla; después cualquier rango de meses (un
+    año, un período de la tabla, lo pagado hasta un mes) se resuelve en
+    tiempo constante, sin recorrer la columna 'Mes' ni sumar filas.
+
+    Con una TablaCompacta las sumas se acumulan en centavos enteros y se
+    pasan a pesos solo al devolverlas, así que son exactas al centavo.
+    """
+
+    def __init__(self, tabla_amortizacion):
+        # Acepta un DataFrame o una TablaCompacta: ambos entregan columnas por nombre
+        meses = np.asarray(tabla_amortizacion['Mes'])
+        self.ultimo_mes = int(meses[-1]) if len(meses) else 0
+
+        # _posicion[m] = cantidad de filas con Mes < m
+        self._posicion = np.searchsorted(meses, np.arange(self.ultimo_mes + 2))
+
+        # _acumulados[c][k] = suma de la columna c en las primeras k filas,
+        # en centavos enteros si la tabla los tiene (se divide por _divisor al salir)
+        columna_centavos = getattr(tabla_amortizacion, 'columna_centavos', None)
+        self._divisor = 1 if columna_centavos is None else 100
+        self._acumulados = {}
+        for columna in COLUMNAS_ACUMULADAS:
+            if columna_centavos is None:
+                valores = np.asarray(tabla_amortizacion[columna], dtype=np.float64)
+            else:
+                valores = columna_centavos(columna)
+            acumulado = np.zeros(len(meses) + 1, dtype=valores.dtype)
+            np.cumsum(valores, out=acumulado[1:])
+            self._acumulados[columna] = acumulado
+
+    def rango_filas(self, inicio, fin):
+        """
+        Filas [desde, hasta) de la tabla que corresponden a los meses inicio..fin
+        """
+        inicio = min(max(inicio, 0), self.ultimo_mes + 1)
+        fin = min(max(fin, inicio - 1), self.ultimo_mes)
+        return int(self._posicion[inicio]), int(self._posicion[fin + 1])
+
+    def filas(self, tabla_amortizacion, inicio, fin):
+        """
+        Vista de la tabla con los meses inicio..fin, sin filtrar fila por fila
+        """
+        desde, hasta = self.rango_filas(inicio, fin)
+        return tabla_amortizacion.iloc[desde:hasta]
+
+    def totales(self, inicio, fin):
+        """
+        Sumas de los meses inicio..fin para cada columna acumulada, y su cantidad de meses
+        """
+        desde, hasta = self.rango_filas(inicio, fin)
+        totales = {
+            columna: (acumulado[hasta] - acumulado[desde]) / self._divisor
+            for columna, acumulado in self._acumulados.items()
+        }
+        totales['Meses'] = hasta - desde
+        return totales
+
+    def pagado_hasta(self, mes):
+        """
+        Sumas acumuladas desde el primer mes hasta el mes indicado, inclusive
+        """
+        return self.totales(1, mes)
+
+    def totales_por_bloques(self, meses_por_bloque=12):
+        """
+        Sumas de cada bloque consecutivo de meses (años, períodos de varios años...)
+
+        Devuelve el número de bloque (desde 1) y un arreglo de sumas por columna.
+        """
+        inicios = np.arange(1, self.ultimo_mes + 1, meses_por_bloque)
+        desde = self._posicion[inicios]
+        hasta = self._posicion[np.minimum(inicios + meses_por_bloque, self.ultimo_mes + 1)]
+
+        totales = {
+            columna: (acumulado[hasta] - acumulado[desde]) / self._divisor
+            for columna, acumulado in self._acumulados.items()
+        }
+        totales['Meses'] = hasta - desde
+        return np.arange(1, len(inicios) + 1), totales
+
+    def datos_anuales(self):
+        """
+        Capital, intereses y seguros pagados en cada año del crédito
+        """
+        import pandas as pd
+
+        anos, totales = self.totales_por_bloques(12)
+        return pd.DataFrame({
+            'Año': anos,
+            'Capital': totales['Abono Capital'],
+            'Intereses': totales['Interés'],
+            'Seguros': totales['Seguro']
+        })
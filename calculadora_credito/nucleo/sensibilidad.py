@@ -0,0 +1,49 @@
+"""
+Malla de sensibilidad de la cuota y los intereses a la tasa y el plazo
+
+Evalúa la fórmula de la cuota para todas las combinaciones de tasa y plazo
+a la vez con broadcasting de NumPy, sin generar tablas de amortización. Los
+totales son los del resumen sin cálculo exacto: cuota × número de pagos.
+"""
+import numpy as np
+
+from .calculo_inverso import _factor_cuota
+
+# Malla por defecto: tasas de 0.1% a 50% cada 0.1 puntos y plazos de 1 a 30 años
+TASAS_MALLA = np.round(np.arange(1, 501) * 0.1, 1)
+PLAZOS_MALLA = np.arange(1, 31)
+
+
+def calcular_malla_sensibilidad(monto, cuota_seguro=0, tasas=TASAS_MALLA, plazos_anos=PLAZOS_MALLA):
+    """
+    Cuota, pago total e intereses para cada plazo (filas) y tasa anual (columnas)
+    """
+    tasas = np.asarray(tasas, dtype=np.float64)
+    plazos_anos = np.asarray(plazos_anos)
+    num_pagos = plazos_anos[:, None] * 12
+
+    cuota = monto * _factor_cuota(tasas[None, :] / 100 / 12, num_pagos)
+    total_pagado = cuota * num_pagos
+    return {
+        'tasas': tasas,
+        'plazos': plazos_anos,
+        'Cuota Crédito': cuota,
+        'Pago Total': cuota + cuota_seguro,
+        'Intereses': total_pagado - monto,
+        'Total General': total_pagado + cuota_seguro * num_pagos,
+    }
+
+
+def buscar_en_malla(malla, tasa_anual, plazo_anos):
+    """
+    Valores de la malla en la tasa y el plazo más cercanos a los pedidos
+    """
+    columna = int(np.abs(malla['tasas'] - tasa_anual).argmin())
+    fila = int(np.abs(malla['plazos'] - plazo_anos).argmin())
+    valores = {
+        nombre: float(malla[nombre][fila, columna])
+        for nombre in ('Cuota Crédito', 'Pago Total', 'Intereses', 'Total General')
+    }
+    valores['tasa_anual'] = float(malla['tasas'][columna])
+    valores['plazo_anos'] = int(malla['plazos'][fila])
+    return valores
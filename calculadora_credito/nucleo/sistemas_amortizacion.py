@@ -0,0 +1,435 @@
+"""
+Sistemas de amortización intercambiables
+
+Cada sistema es una estrategia que calcula las columnas de la tabla (cuota,
+interés, abono a capital y saldo) como arreglos de NumPy para todos los
+meses a la vez. Todos entregan una TablaCompacta con el mismo esquema, así
+que el índice por meses, la agregación anual, la caché y las exportaciones
+(CSV, PDF...) no dependen del sistema.
+
+Un sistema nuevo es una subclase de SistemaAmortizacion que define
+calcular_saldos (la forma cerrada del saldo) y abono_del_mes (la regla mes a
+mes que sirve de referencia), y declara sus opciones; al registrarlo con
+registrar_sistema la interfaz lo ofrece sin más cambios.
+"""
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from .amortizacion import (
+    calcular_columnas_amortizacion,
+    calcular_cuota_mensual,
+    calcular_cuota_saldo,
+    generar_tabla_amortizacion_iterativa,
+    generar_tabla_compacta,
+    redondear_centavos,
+)
+from .amortizacion_centavos import a_centavos, generar_tabla_centavos
+from .indice_amortizacion import IndiceAmortizacion
+from .tabla_compacta import COLUMNAS_TABLA, TablaCompacta, comprobar_centavos
+
+FRANCES = 'frances'
+ALEMAN = 'aleman'
+GRACIA = 'gracia'
+GLOBO = 'globo'
+
+# Sistemas registrados por clave, en el orden en que se ofrecen
+SISTEMAS = {}
+
+
+def saldos_anualidad(saldo_inicial, cuota, tasa_mensual, meses):
+    """
+    Saldo después de cada uno de los meses dados pagando una cuota fija (forma cerrada)
+    """
+    if tasa_mensual == 0:
+        return saldo_inicial - cuota * meses
+    crecimiento = np.expm1(meses * np.log1p(tasa_mensual))
+    return saldo_inicial - (cuota - saldo_inicial * tasa_mensual) * crecimiento / tasa_mensual
+
+
+def columnas_desde_saldos(monto, saldo, tasa_mensual):
+    """
+    Interés, abono y cuota de cada mes a partir de los saldos al cierre (sin redondear)
+
+    Igual que en la tabla francesa, desde el primer mes con saldo menor a un
+    centavo el crédito queda cerrado y el último pago cancela el saldo.
+    """
+    num_pagos = len(saldo)
+    cerrados = saldo < 0.01
+    if cerrados.any():
+        saldo[int(np.argmax(cerrados)):] = 0.0
+    saldo[-1] = 0.0
+
+    saldo_anterior = np.empty(num_pagos)
+    saldo_anterior[0] = monto
+    saldo_anterior[1:] = saldo[:-1]
+
+    interes = saldo_anterior * tasa_mensual
+    abono_capital = saldo_anterior - saldo
+    return {
+        'Mes': np.arange(1, num_pagos + 1),
+        'Cuota Crédito': interes + abono_capital,
+        'Interés': interes,
+        'Abono Capital': abono_capital,
+        'Saldo Pendiente': saldo,
+    }
+
+
+def _tabla_redondeada(columnas, cuota_seguro, sin_interes):
+    """
+    TablaCompacta con las columnas redondeadas a centavos
+    """
+    cuotas = redondear_centavos(columnas['Cuota Crédito'])
+    pagos_totales = redondear_centavos(columnas['Cuota Crédito'] + cuota_seguro)
+    interes = redondear_centavos(columnas['Interés'])
+    abono_capital = redondear_centavos(columnas['Abono Capital'])
+    saldo = redondear_centavos(columnas['Saldo Pendiente'])
+
+    if (cuotas[:-1] == cuotas[0]).all():
+        return TablaCompacta(
+            interes, abono_capital, saldo,
+            cuotas[0], cuotas[-1], pagos_totales[0], pagos_totales[-1],
+            round(cuota_seguro, 2), sin_interes=sin_interes
+        )
+    return TablaCompacta.con_cuota_variable(
+        interes, abono_capital, saldo, cuotas, pagos_totales,
+        round(cuota_seguro, 2), sin_interes=sin_interes
+    )
+
+
+def _tabla_centavos(monto, columnas, tasa_mensual, cuota_seguro, sin_interes):
+    """
+    TablaCompacta exacta en centavos enteros a partir de los saldos del sistema
+
+    Cada saldo se redondea al centavo, el abono es la diferencia entre saldos
+    consecutivos (suman exactamente el monto) y el interés se redondea por
+    período, así que cada fila cumple Cuota Crédito == Interés + Abono Capital.
+    """
+    saldo = np.maximum(comprobar_centavos(np.rint(columnas['Saldo Pendiente'] * 100)), 0).astype(np.int64)
+    saldo[-1] = 0
+    saldo_anterior = np.empty(len(saldo), dtype=np.int64)
+    saldo_anterior[0] = a_centavos(monto)
+    saldo_anterior[1:] = saldo[:-1]
+
+    abono_capital = saldo_anterior - saldo
+    interes = comprobar_centavos(np.rint(saldo_anterior * tasa_mensual)).astype(np.int64)
+    cuotas = interes + abono_capital
+    pagos_totales = cuotas + a_centavos(cuota_seguro)
+
+    if (cuotas[:-1] == cuotas[0]).all():
+        return TablaCompacta.desde_centavos(
+            interes, abono_capital, saldo,
+            cuotas[0], cuotas[-1], pagos_totales[0], pagos_totales[-1],
+            round(cuota_seguro, 2), sin_interes=sin_interes
+        )
+    return TablaCompacta.con_cuota_variable(
+        interes, abono_capital, saldo, cuotas, pagos_totales,
+        round(cuota_seguro, 2), sin_interes=sin_interes, en_centavos=True
+    )
+
+
+class SistemaAmortizacion(ABC):
+    """
+    Estrategia de amortización: el saldo de cada mes define las demás columnas
+
+    Las subclases definen clave, nombre, descripcion, calcular_saldos y
+    abono_del_mes; sin estos dos métodos la subclase no se puede instanciar
+    (ni, por lo tanto, registrar). opciones describe los parámetros propios del sistema,
+    {nombre: {'etiqueta', 'minimo', 'maximo', 'valor', 'paso', 'ayuda'}};
+    el tipo de 'valor' (int o float) es el tipo de la opción.
+    """
+
+    clave = None
+    nombre = None
+    descripcion = ""
+    opciones = {}
+
+    def normalizar_opciones(self, opciones=None):
+        """
+        Opciones validadas y completadas con sus valores por defecto, como tupla ordenada de (nombre, valor)
+        """
+        opciones = dict(opciones or {})
+        desconocidas = set(opciones) - set(self.opciones)
+        if desconocidas:
+            raise ValueError(f"Opciones desconocidas para el sistema {self.nombre}: {', '.join(sorted(desconocidas))}")
+
+        normalizadas = []
+        for nombre, definicion in sorted(self.opciones.items()):
+            valor = opciones.get(nombre, definicion['valor'])
+            if isinstance(definicion['valor'], int):
+                if int(valor) != valor:
+                    raise ValueError(f"{definicion['etiqueta']} debe ser un número entero")
+                valor = int(valor)
+            else:
+                valor = round(float(valor), 6)
+            if not definicion['minimo'] <= valor <= definicion['maximo']:
+                raise ValueError(
+                    f"{definicion['etiqueta']} debe estar entre {definicion['minimo']} y {definicion['maximo']}"
+                )
+            normalizadas.append((nombre, valor))
+        return tuple(normalizadas)
+
+    @abstractmethod
+    def calcular_saldos(self, monto, tasa_mensual, num_pagos, **opciones):
+        """
+        Saldo al cierre de cada mes (sin redondear), todos los meses a la vez
+        """
+
+    @abstractmethod
+    def abono_del_mes(self, mes, saldo, monto, tasa_mensual, num_pagos, **opciones):
+        """
+        Abono a capital de un mes dado el saldo anterior; referencia mes a mes de calcular_saldos
+        """
+
+    def calcular_columnas(self, monto, tasa_anual, plazo_anos, **opciones):
+        """
+        Calcula cuota, interés, abono y saldo de todos los meses a la vez (sin redondear)
+        """
+        tasa_mensual = tasa_anual / 100 / 12
+        num_pagos = plazo_anos * 12
+        saldo = np.array(self.calcular_saldos(monto, tasa_mensual, num_pagos, **opciones), dtype=np.float64)
+        return columnas_desde_saldos(monto, saldo, tasa_mensual)
+
+    def generar_tabla(self, monto, tasa_anual, plazo_anos, cuota_seguro=0, exacto=False, **opciones):
+        """
+        Genera la tabla del crédito como TablaCompacta; con exacto=True en centavos enteros
+        """
+        columnas = self.calcular_columnas(monto, tasa_anual, plazo_anos, **opciones)
+        if exacto:
+            return _tabla_centavos(monto, columnas, tasa_anual / 100 / 12, cuota_seguro, tasa_anual == 0)
+        return _tabla_redondeada(columnas, cuota_seguro, tasa_anual == 0)
+
+    def generar_tabla_iterativa(self, monto, tasa_anual, plazo_anos, cuota_seguro=0, **opciones):
+        """
+        Versión de referencia mes a mes de generar_tabla
+
+        Se conserva para comprobar la equivalencia del cálculo vectorizado.
+        """
+        tasa_mensual = tasa_anual / 100 / 12
+        num_pagos = plazo_anos * 12
+
+        tabla = []
+        saldo_pendiente = monto
+
+        for mes in range(1, num_pagos + 1):
+            interes = saldo_pendiente * tasa_mensual
+            if mes == num_pagos:
+                abono_capital = saldo_pendiente
+            else:
+                abono_capital = self.abono_del_mes(mes, saldo_pendiente, monto, tasa_mensual, num_pagos, **opciones)
+            cuota = interes + abono_capital
+
+            saldo_pendiente -= abono_capital
+            if saldo_pendiente < 0.01:
+                saldo_pendiente = 0
+
+            tabla.append({
+                'Mes': mes,
+                'Cuota Crédito': round(cuota, 2),
+                'Interés': round(interes, 2),
+                'Abono Capital': round(abono_capital, 2),
+                'Seguro': round(cuota_seguro, 2),
+                'Pago Total': round(cuota + cuota_seguro, 2),
+                'Saldo Pendiente': round(saldo_pendiente, 2)
+            })
+
+        import pandas as pd
+
+        return pd.DataFrame(tabla, columns=COLUMNAS_TABLA)
+
+
+class SistemaFrances(SistemaAmortizacion):
+    """
+    Cuota fija: al principio se pagan sobre todo intereses
+
+    Usa los motores de amortizacion y amortizacion_centavos tal cual, de
+    modo que sus tablas no cambian al pasar por la estrategia.
+    """
+
+    clave = FRANCES
+    nombre = "Francés (cuota fija)"
+    descripcion = "La cuota es la misma todos los meses; al principio cubre sobre todo intereses"
+
+    def calcular_saldos(self, monto, tasa_mensual, num_pagos):
+        cuota = calcular_cuota_saldo(monto, tasa_mensual, num_pagos)
+        return saldos_anualidad(monto, cuota, tasa_mensual, np.arange(1, num_pagos + 1))
+
+    def abono_del_mes(self, mes, saldo, monto, tasa_mensual, num_pagos):
+        return calcular_cuota_saldo(monto, tasa_mensual, num_pagos) - saldo * tasa_mensual
+
+    def calcular_columnas(self, monto, tasa_anual, plazo_anos):
+        return calcular_columnas_amortizacion(monto, tasa_anual, plazo_anos)
+
+    def generar_tabla(self, monto, tasa_anual, plazo_anos, cuota_seguro=0, exacto=False):
+        generar = generar_tabla_centavos if exacto else generar_tabla_compacta
+        return generar(monto, tasa_anual, plazo_anos, cuota_seguro)
+
+    def generar_tabla_iterativa(self, monto, tasa_anual, plazo_anos, cuota_seguro=0):
+        return generar_tabla_amortizacion_iterativa(monto, tasa_anual, plazo_anos, cuota_seguro)
+
+
+class SistemaAleman(SistemaAmortizacion):
+    """
+    Abono a capital constante: la cuota baja mes a mes junto con los intereses
+    """
+
+    clave = ALEMAN
+    nombre = "Alemán (abono fijo a capital)"
+    descripcion = "Cada mes se abona la misma parte del capital; la cuota empieza alta y va bajando"
+
+    def calcular_saldos(self, monto, tasa_mensual, num_pagos):
+        return monto * (num_pagos - np.arange(1, num_pagos + 1)) / num_pagos
+
+    def abono_del_mes(self, mes, saldo, monto, tasa_mensual, num_pagos):
+        return monto / num_pagos
+
+
+class SistemaGracia(SistemaAmortizacion):
+    """
+    Período de gracia: solo intereses durante los primeros meses y después cuota fija
+    """
+
+    clave = GRACIA
+    nombre = "Francés con período de gracia"
+    descripcion = "Durante la gracia solo se pagan intereses; después el capital se amortiza con cuota fija"
+    opciones = {
+        'meses_gracia': {
+            'etiqueta': "Meses de gracia",
+            'minimo': 1,
+            'maximo': 60,
+            'valor': 6,
+            'paso': 1,
+            'ayuda': "Meses iniciales en los que solo se pagan intereses (deben ser menos que el plazo)",
+        },
+    }
+
+    @staticmethod
+    def _validar(meses_gracia, num_pagos):
+        if meses_gracia >= num_pagos:
+            raise ValueError("Los meses de gracia deben ser menos que los meses del plazo")
+
+    def calcular_saldos(self, monto, tasa_mensual, num_pagos, meses_gracia=6):
+        self._validar(meses_gracia, num_pagos)
+        meses_amortizacion = num_pagos - meses_gracia
+        cuota = calcular_cuota_saldo(monto, tasa_mensual, meses_amortizacion)
+
+        saldo = np.empty(num_pagos)
+        saldo[:meses_gracia] = monto
+        saldo[meses_gracia:] = saldos_anualidad(monto, cuota, tasa_mensual, np.arange(1, meses_amortizacion + 1))
+        return saldo
+
+    def abono_del_mes(self, mes, saldo, monto, tasa_mensual, num_pagos, meses_gracia=6):
+        self._validar(meses_gracia, num_pagos)
+        if mes <= meses_gracia:
+            return 0.0
+        return calcular_cuota_saldo(monto, tasa_mensual, num_pagos - meses_gracia) - saldo * tasa_mensual
+
+
+class SistemaGlobo(SistemaAmortizacion):
+    """
+    Cuota globo: cuota fija menor y un pago final grande (con 100% es un crédito bullet)
+    """
+
+    clave = GLOBO
+    nombre = "Cuota globo (balloon / bullet)"
+    descripcion = "Una parte del capital se paga al final en un solo pago; con 100% solo se pagan intereses hasta el vencimiento"
+    opciones = {
+        'porcentaje_globo': {
+            'etiqueta': "Pago final (% del monto)",
+            'minimo': 0.0,
+            'maximo': 100.0,
+            'valor': 30.0,
+            'paso': 5.0,
+            'ayuda': "Parte del monto que se paga en la última cuota; 100% es un crédito bullet",
+        },
+    }
+
+    @staticmethod
+    def _cuota(monto, tasa_mensual, num_pagos, porcentaje_globo):
+        """
+        Cuota fija que deja el pago globo como saldo antes del último mes
+        """
+        globo = monto * porcentaje_globo / 100
+        # El globo se descuenta a valor presente: (1 + r)^-n
+        valor_presente_globo = globo * np.exp(-num_pagos * np.log1p(tasa_mensual))
+        return calcular_cuota_saldo(monto - valor_presente_globo, tasa_mensual, num_pagos)
+
+    def calcular_saldos(self, monto, tasa_mensual, num_pagos, porcentaje_globo=30.0):
+        cuota = self._cuota(monto, tasa_mensual, num_pagos, porcentaje_globo)
+        return saldos_anualidad(monto, cuota, tasa_mensual, np.arange(1, num_pagos + 1))
+
+    def abono_del_mes(self, mes, saldo, monto, tasa_mensual, num_pagos, porcentaje_globo=30.0):
+        return self._cuota(monto, tasa_mensual, num_pagos, porcentaje_globo) - saldo * tasa_mensual
+
+
+def registrar_sistema(sistema):
+    """
+    Agrega un sistema al registro (por su clave) y lo devuelve
+    """
+    if not isinstance(sistema, SistemaAmortizacion) or not sistema.clave:
+        raise TypeError("Se espera una instancia de una subclase de SistemaAmortizacion con clave")
+    SISTEMAS[sistema.clave] = sistema
+    return sistema
+
+
+def obtener_sistema(clave):
+    """
+    Sistema registrado con la clave dada
+    """
+    try:
+        return SISTEMAS[clave]
+    except KeyError:
+        raise ValueError(f"Sistema de amortización desconocido: {clave}") from None
+
+
+def normalizar_sistema(sistema=FRANCES, opciones=None):
+    """
+    Clave del sistema y sus opciones normalizadas, para llaves de caché y claves de contenido
+    """
+    return (sistema,) + obtener_sistema(sistema).normalizar_opciones(opciones)
+
+
+def generar_tabla_sistema(monto, tasa_anual, plazo_anos, cuota_seguro=0, sistema=FRANCES, opciones=None,
+                          exacto=False):
+    """
+    Genera la tabla compacta de un crédito con el sistema de amortización indicado
+    """
+    llave = normalizar_sistema(sistema, opciones)
+    return obtener_sistema(sistema).generar_tabla(
+        monto, tasa_anual, plazo_anos, cuota_seguro, exacto=exacto, **dict(llave[1:])
+    )
+
+
+
+def calcular_totales_credito(tabla, monto, tasa_anual, plazo_anos, cuota_seguro=0, exacto=False,
+                             sistema=FRANCES, indice=None):
+    """
+    Cuota, total pagado, intereses, seguros y total general del crédito, tal como los muestra la aplicación
+
+    En el sistema francés sin modo exacto salen de la cuota de la fórmula por
+    el número de pagos; en los demás casos, de las sumas de la tabla, que
+    incluyen el ajuste de la última cuota (y las cuotas que cambian mes a
+    mes). indice es el IndiceAmortizacion de la tabla si ya se tiene.
+    """
+    if exacto or sistema != FRANCES:
+        if indice is None:
+            indice = IndiceAmortizacion(tabla)
+        cuota_mensual = tabla.columna('Cuota Crédito', 0, 1)[0]
+        total_pagado = indice.totales(1, indice.ultimo_mes)['Cuota Crédito']
+    else:
+        cuota_mensual = calcular_cuota_mensual(monto, tasa_anual, plazo_anos)
+        total_pagado = cuota_mensual * plazo_anos * 12
+    total_seguros = cuota_seguro * plazo_anos * 12
+    return {
+        'cuota_mensual': cuota_mensual,
+        'total_pagado': total_pagado,
+        'intereses_pagados': total_pagado - monto,
+        'total_seguros': total_seguros,
+        'total_general': total_pagado + total_seguros,
+    }
+
+
+registrar_sistema(SistemaFrances())
+registrar_sistema(SistemaAleman())
+registrar_sistema(SistemaGracia())
+registrar_sistema(SistemaGlobo())
@@ -0,0 +1,261 @@
+"""
+Representación compacta de la tabla de amortización
+"""
+import numpy as np
+
+COLUMNAS_TABLA = ['Mes', 'Cuota Crédito', 'Interés', 'Abono Capital', 'Seguro', 'Pago Total', 'Saldo Pendiente']
+
+
+# Centavos representables en int64; por encima la conversión desborda en silencio
+LIMITE_CENTAVOS = 2.0 ** 63
+
+
+def comprobar_centavos(centavos):
+    """
+    Falla con ValueError si algún monto en centavos no es finito o no cabe en int64
+    """
+    centavos = np.asarray(centavos)
+    if centavos.dtype.kind == 'f' and len(centavos.ravel()) and not (
+        np.isfinite(centavos).all() and np.abs(centavos).max() < LIMITE_CENTAVOS
+    ):
+        raise ValueError("Montos fuera de rango: no son finitos o exceden los centavos que caben en int64")
+    return centavos
+
+
+def _a_centavos(valores):
+    """
+    Convierte montos ya redondeados a 2 decimales en centavos enteros
+    """
+    return _compactar(np.rint(np.asarray(valores, dtype=np.float64) * 100))
+
+
+def _compactar(centavos):
+    """
+    Guarda centavos enteros en int32 si todos caben (hasta ~21 millones) e int64 si no
+    """
+    centavos = comprobar_centavos(centavos)
+    limite = np.iinfo(np.int32).max
+    tipo = np.int32 if len(centavos) == 0 or np.abs(centavos).max() <= limite else np.int64
+    return centavos.astype(tipo)
+
+
+class TablaCompacta:
+    """
+    Tabla de amortización guardada en arreglos de centavos enteros
+
+    Solo se guardan las columnas independientes (interés, abono a capital y
+    saldo). 'Mes', 'Seguro', 'Cuota Crédito' y 'Pago Total' son constantes
+    salvo el ajuste del último pago, así que se derivan al pedirlas. En los
+    sistemas de cuota variable (alemán, con gracia...) 'Cuota Crédito' y
+    'Pago Total' se guardan completas y cuota_variable es True. La
+    conversión a DataFrame se hace únicamente al mostrar o exportar.
+
+    tabla['Columna'] devuelve la columna como arreglo de NumPy con los mismos
+    valores y tipos que la columna de generar_tabla_amortizacion; 'Seguro' es
+    siempre float64, aunque el seguro se haya dado como entero.
+    """
+
+    __slots__ = (
+        '_interes', '_abono_capital', '_saldo_pendiente',
+        '_cuota', '_pago_total', 'cuota_seguro', 'sin_interes', 'cuota_variable'
+    )
+
+    def __init__(self, interes, abono_capital, saldo_pendiente, cuota, cuota_final,
+                 pago_total, pago_total_final, cuota_seguro=0, sin_interes=False):
+        self._interes = _a_centavos(interes)
+        self._abono_capital = _a_centavos(abono_capital)
+        self._saldo_pendiente = _a_centavos(saldo_pendiente)
+        # Cuota y pago total: valor de los meses regulares y del último mes
+        self._cuota = _a_centavos([cuota, cuota_final]).astype(np.int64)
+        self._pago_total = _a_centavos([pago_total, pago_total_final]).astype(np.int64)
+        self.cuota_seguro = cuota_seguro
+        self.sin_interes = sin_interes
+        self.cuota_variable = False
+
+    @classmethod
+    def desde_centavos(cls, interes, abono_capital, saldo_pendiente, cuota, cuota_final,
+                       pago_total, pago_total_final, cuota_seguro=0, sin_interes=False):
+        """
+        Construye la tabla compacta a partir de columnas ya expresadas en centavos enteros
+        """
+        tabla = cls.__new__(cls)
+        tabla._interes = _compactar(interes)
+        tabla._abono_capital = _compactar(abono_capital)
+        tabla._saldo_pendiente = _compactar(saldo_pendiente)
+        tabla._cuota = np.array([cuota, cuota_final], dtype=np.int64)
+        tabla._pago_total = np.array([pago_total, pago_total_final], dtype=np.int64)
+        tabla.cuota_seguro = cuota_seguro
+        tabla.sin_interes = sin_interes
+        tabla.cuota_variable = False
+        return tabla
+
+    @classmethod
+    def con_cuota_variable(cls, interes, abono_capital, saldo_pendiente, cuotas, pagos_totales,
+                           cuota_seguro=0, sin_interes=False, en_centavos=False):
+        """
+        Construye la tabla de un sistema cuya cuota cambia de un mes a otro
+
+        Con en_centavos=True las columnas ya vienen en centavos enteros.
+        """
+        convertir = _compactar if en_centavos else _a_centavos
+        tabla = cls.__new__(cls)
+        tabla._interes = convertir(interes)
+        tabla._abono_capital = convertir(abono_capital)
+        tabla._saldo_pendiente = convertir(saldo_pendiente)
+        tabla._cuota = convertir(cuotas)
+        tabla._pago_total = convertir(pagos_totales)
+        tabla.cuota_seguro = cuota_seguro
+        tabla.sin_interes = sin_interes
+        tabla.cuota_variable = True
+        return tabla
+
+    @classmethod
+    def desde_arreglos(cls, interes, abono_capital, saldo_pendiente, cuota, pago_total,
+                       cuota_seguro=0, sin_interes=False, cuota_variable=False):
+        """
+        Construye la tabla con los arreglos de centavos de arreglos_centavos() sin copiarlos
+
+        Sirve para armarla sobre vistas de solo lectura de un archivo mapeado en memoria.
+        """
+        tabla = cls.__new__(cls)
+        tabla._interes = interes
+        tabla._abono_capital = abono_capital
+        tabla._saldo_pendiente = saldo_pendiente
+        tabla._cuota = cuota
+        tabla._pago_total = pago_total
+        tabla.cuota_seguro = cuota_seguro
+        tabla.sin_interes = sin_interes
+        tabla.cuota_variable = cuota_variable
+        return tabla
+
+    @classmethod
+    def desde_dataframe(cls, tabla_amortizacion):
+        """
+        Construye la tabla compacta a partir de una tabla de amortización completa
+        """
+        cuota = tabla_amortizacion['Cuota Crédito'].to_numpy()
+        pago_total = tabla_amortizacion['Pago Total'].to_numpy()
+        seguro = tabla_amortizacion['Seguro']
+        if len(cuota) > 1 and (cuota[:-1] != cuota[0]).any():
+            return cls.con_cuota_variable(
+                tabla_amortizacion['Interés'],
+                tabla_amortizacion['Abono Capital'],
+                tabla_amortizacion['Saldo Pendiente'],
+                cuota, pago_total,
+                seguro.iloc[0].item(),
+                sin_interes=tabla_amortizacion['Interés'].dtype.kind == 'i'
+            )
+        return cls(
+            tabla_amortizacion['Interés'],
+            tabla_amortizacion['Abono Capital'],
+            tabla_amortizacion['Saldo Pendiente'],
+            cuota[0], cuota[-1],
+            pago_total[0], pago_total[-1],
+            seguro.iloc[0].item() if len(seguro) else 0,
+            sin_interes=tabla_amortizacion['Interés'].dtype.kind == 'i'
+        )
+
+    def __len__(self):
+        return len(self._saldo_pendiente)
+
+    def _constante_con_ultimo(self, centavos, desde, hasta):
+        """
+        Columna constante salvo el último mes, en pesos
+        """
+        if self.cuota_variable:
+            return centavos[desde:hasta] / 100
+        columna = np.full(hasta - desde, centavos[0] / 100)
+        if hasta == len(self) and hasta > desde:
+            columna[-1] = centavos[1] / 100
+        return columna
+
+    def columna(self, nombre, desde=0, hasta=None):
+        """
+        Devuelve una columna (o un tramo de filas de ella) como arreglo de NumPy
+        """
+        hasta = len(self) if hasta is None else min(hasta, len(self))
+        desde = min(desde, hasta)
+
+        if nombre == 'Mes':
+            return np.arange(desde + 1, hasta + 1, dtype=np.int64)
+        if nombre == 'Cuota Crédito':
+            return self._constante_con_ultimo(self._cuota, desde, hasta)
+        if nombre == 'Interés':
+            if self.sin_interes:
+                return np.zeros(hasta - desde, dtype=np.int64)
+            return self._interes[desde:hasta] / 100
+        if nombre == 'Abono Capital':
+            return self._abono_capital[desde:hasta] / 100
+        if nombre == 'Seguro':
+            return np.full(hasta - desde, self.cuota_seguro, dtype=np.float64)
+        if nombre == 'Pago Total':
+            return self._constante_con_ultimo(self._pago_total, desde, hasta)
+        if nombre == 'Saldo Pendiente':
+            return self._saldo_pendiente[desde:hasta] / 100
+        raise KeyError(nombre)
+
+    def columna_centavos(self, nombre):
+        """
+        Columna de montos completa en centavos enteros (int64), sin pasar por float
+        """
+        if nombre == 'Interés':
+            if self.sin_interes:
+                return np.zeros(len(self), dtype=np.int64)
+            return self._interes.astype(np.int64)
+        if nombre == 'Abono Capital':
+            return self._abono_capital.astype(np.int64)
+        if nombre == 'Saldo Pendiente':
+            return self._saldo_pendiente.astype(np.int64)
+        if nombre == 'Seguro':
+            return np.full(len(self), round(self.cuota_seguro * 100), dtype=np.int64)
+        if nombre in ('Cuota Crédito', 'Pago Total'):
+            centavos = self._cuota if nombre == 'Cuota Crédito' else self._pago_total
+            if self.cuota_variable:
+                return centavos.astype(np.int64)
+            columna = np.full(len(self), centavos[0], dtype=np.int64)
+            if len(columna):
+                columna[-1] = centavos[1]
+            return columna
+        raise KeyError(nombre)
+
+    def __getitem__(self, nombre):
+        return self.columna(nombre)
+
+    def a_dataframe(self, desde=0, hasta=None):
+        """
+        Convierte la tabla (o las filas desde..hasta) en un DataFrame para mostrar o exportar
+        """
+        hasta = len(self) if hasta is None else min(hasta, len(self))
+        desde = min(desde, hasta)
+        import pandas as pd
+
+        tabla = pd.DataFrame(
+            {nombre: self.columna(nombre, desde, hasta) for nombre in COLUMNAS_TABLA},
+            columns=COLUMNAS_TABLA
+        )
+        tabla.index = pd.RangeIndex(desde, hasta)
+        return tabla
+
+    def arreglos_centavos(self):
+        """
+        Arreglos de centavos que guardan la tabla, por nombre (sin copiarlos)
+
+        'cuota' y 'pago_total' tienen dos valores (meses regulares y último
+        mes) salvo con cuota_variable, en que tienen uno por mes.
+        """
+        return {
+            'interes': self._interes,
+            'abono_capital': self._abono_capital,
+            'saldo_pendiente': self._saldo_pendiente,
+            'cuota': self._cuota,
+            'pago_total': self._pago_total,
+        }
+
+    @property
+    def nbytes(self):
+        """
+        Bytes ocupados por los arreglos de la tabla
+        """
+        return sum(arreglo.nbytes for arreglo in (
+            self._interes, self._abono_capital, self._saldo_pendiente, self._cuota, self._pago_total
+        ))
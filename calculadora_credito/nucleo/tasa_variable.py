@@ -0,0 +1,148 @@
+"""
+Tablas de amortización con tasa variable
+
+La trayectoria de tasas es una lista de (mes_inicio, tasa_anual) que empieza
+en el mes 1; en cada cambio de tasa la cuota se recalcula para amortizar el
+saldo en los meses restantes. Entre dos cambios la tasa es constante y el
+saldo sigue la forma cerrada de la anualidad, así que cada tramo se calcula
+de una vez con NumPy en lugar de mes a mes.
+"""
+import numpy as np
+
+from .amortizacion import (
+    calcular_columnas_amortizacion,
+    calcular_cuota_mensual,
+    calcular_cuota_saldo,
+    generar_tabla_compacta,
+    redondear_centavos,
+)
+from .tabla_compacta import COLUMNAS_TABLA
+
+
+def tasas_desde_indice(valores_indice, margen, cada_meses=12, piso=0.0):
+    """
+    Trayectoria de tasas de un crédito indexado: índice + margen en cada revisión
+
+    valores_indice trae un valor del índice por período de revisión (el
+    primero rige desde el mes 1); la tasa nunca baja del piso.
+    """
+    return [
+        (1 + i * cada_meses, max(piso, valor + margen))
+        for i, valor in enumerate(valores_indice)
+    ]
+
+
+def _normalizar_trayectoria(tasas, num_pagos):
+    """
+    Valida la trayectoria y devuelve (meses de inicio, tasas anuales) dentro del plazo
+    """
+    meses, tasas_anuales = (np.asarray(valores) for valores in zip(*tasas))
+    meses = meses.astype(np.int64)
+    tasas_anuales = tasas_anuales.astype(np.float64)
+
+    if meses[0] != 1:
+        raise ValueError("La trayectoria de tasas debe empezar en el mes 1")
+    if (np.diff(meses) <= 0).any():
+        raise ValueError("Los meses de cambio de tasa deben ser crecientes")
+    if (tasas_anuales < 0).any():
+        raise ValueError("Las tasas no pueden ser negativas")
+
+    dentro = meses <= num_pagos
+    return meses[dentro], tasas_anuales[dentro]
+
+
+def calcular_columnas_tasa_variable(monto, tasas, plazo_anos):
+    """
+    Calcula cuota, interés, abono y saldo de todos los meses con tasa variable (sin redondear)
+
+    Además de las columnas de calcular_columnas_amortizacion devuelve
+    'Tasa Anual', la tasa vigente en cada mes. Con una sola tasa el
+    resultado es el de la tabla de tasa fija.
+    """
+    num_pagos = plazo_anos * 12
+    inicios, tasas_anuales = _normalizar_trayectoria(tasas, num_pagos)
+
+    if len(inicios) == 1:
+        columnas = calcular_columnas_amortizacion(monto, tasas_anuales[0], plazo_anos)
+        columnas['Tasa Anual'] = np.full(num_pagos, tasas_anuales[0])
+        return columnas
+
+    fines = np.append(inicios[1:] - 1, num_pagos)
+    tasas_mensuales = tasas_anuales / 100 / 12
+
+    cuota = np.empty(num_pagos)
+    saldo = np.empty(num_pagos)
+    saldo_anterior = np.empty(num_pagos)
+    saldo_inicial = float(monto)
+
+    for i, (inicio, fin, tasa_mensual) in enumerate(zip(inicios, fines, tasas_mensuales)):
+        tramo = slice(inicio - 1, fin)
+        if i == 0:
+            # Primer tramo con la misma cuota y aritmética que la tabla de tasa fija
+            cuota_tramo = calcular_cuota_mensual(monto, tasas_anuales[0], plazo_anos)
+        else:
+            cuota_tramo = calcular_cuota_saldo(saldo_inicial, tasa_mensual, num_pagos - inicio + 1)
+
+        meses = np.arange(1, fin - inicio + 2)
+        if tasa_mensual == 0:
+            saldos = saldo_inicial - cuota_tramo * meses
+        else:
+            crecimiento = np.expm1(meses * np.log1p(tasa_mensual))
+            saldos = saldo_inicial - (cuota_tramo - saldo_inicial * tasa_mensual) * crecimiento / tasa_mensual
+
+        cuota[tramo] = cuota_tramo
+        saldo[tramo] = saldos
+        saldo_anterior[inicio - 1] = saldo_inicial
+        saldo_anterior[inicio:fin] = saldos[:-1]
+        saldo_inicial = saldos[-1]
+
+    # Igual que en la tabla fija: desde el primer mes con saldo menor a un
+    # centavo el crédito queda cerrado
+    cerrados = saldo < 0.01
+    if cerrados.any():
+        primero = int(np.argmax(cerrados))
+        saldo[primero:] = 0.0
+        saldo_anterior[primero + 1:] = 0.0
+
+    duraciones = fines - inicios + 1
+    tasa_mes = np.repeat(tasas_mensuales, duraciones)
+    interes = saldo_anterior * tasa_mes
+    abono_capital = cuota - interes
+
+    # Último pago ajustado para que el saldo quede exactamente en 0
+    abono_capital[-1] = saldo_anterior[-1]
+    cuota[-1] = interes[-1] + saldo_anterior[-1]
+    saldo[-1] = 0.0
+
+    return {
+        'Mes': np.arange(1, num_pagos + 1),
+        'Cuota Crédito': cuota,
+        'Interés': interes,
+        'Abono Capital': abono_capital,
+        'Saldo Pendiente': saldo,
+        'Tasa Anual': np.repeat(tasas_anuales, duraciones),
+    }
+
+
+def generar_tabla_tasa_variable(monto, tasas, plazo_anos, cuota_seguro=0):
+    """
+    Genera la tabla de amortización con tasa variable, con las columnas del CSV de descarga
+    """
+    num_pagos = plazo_anos * 12
+    inicios, tasas_anuales = _normalizar_trayectoria(tasas, num_pagos)
+    if len(inicios) == 1:
+        return generar_tabla_compacta(monto, tasas_anuales[0], plazo_anos, cuota_seguro).a_dataframe()
+
+    columnas = calcular_columnas_tasa_variable(monto, tasas, plazo_anos)
+
+    import pandas as pd
+
+    return pd.DataFrame({
+        'Mes': np.arange(1, num_pagos + 1),
+        'Cuota Crédito': redondear_centavos(columnas['Cuota Crédito']),
+        'Interés': redondear_centavos(columnas['Interés']),
+        'Abono Capital': redondear_centavos(columnas['Abono Capital']),
+        'Seguro': np.full(num_pagos, round(cuota_seguro, 2)),
+        'Pago Total': redondear_centavos(columnas['Cuota Crédito'] + cuota_seguro),
+        'Saldo Pendiente': redondear_centavos(columnas['Saldo Pendiente']),
+    }, columns=COLUMNAS_TABLA)
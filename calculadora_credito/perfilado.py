@@ -0,0 +1,180 @@
+"""
+Medición opcional de tiempos por etapa de cada rerun de la aplicación
+
+Se activa con la variable de entorno CALCULADORA_PERFILADO=1 o abriendo la
+aplicación con ?perfilado=1. Cuando está apagada, etapa() devuelve un
+contexto vacío y el costo es una consulta a una variable local del hilo.
+
+Con la medición activa:
+- cada rerun guarda la duración de sus etapas (para el panel del sidebar);
+- las duraciones se acumulan en histogramas del proceso que se escriben en
+  formato de texto de Prometheus (CALCULADORA_METRICAS, por defecto
+  calculadora_metricas.prom en el directorio temporal), listos para el
+  textfile collector de node_exporter;
+- un rerun puede ejecutarse bajo cProfile y guardar el volcado .prof en
+  CALCULADORA_PERFILES (por defecto el directorio temporal).
+"""
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+VARIABLE_ACTIVACION = 'CALCULADORA_PERFILADO'
+RUTA_METRICAS = Path(os.environ.get(
+    'CALCULADORA_METRICAS', Path(tempfile.gettempdir()) / 'calculadora_metricas.prom'
+))
+DIRECTORIO_PERFILES = Path(os.environ.get('CALCULADORA_PERFILES', tempfile.gettempdir()))
+
+# Límites (segundos) de los buckets de los histogramas
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+FUNCIONES_PERFIL = 20
+
+_local = threading.local()
+_SIN_MEDICION = contextlib.nullcontext()
+
+
+def activado_por_entorno():
+    return os.environ.get(VARIABLE_ACTIVACION, '') not in ('', '0')
+
+
+class MetricasEtapas:
+    """
+    Histogramas de duración por página y etapa, y reruns medidos por página
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._candado = threading.Lock()
+        self._histogramas = {}
+        self._reruns = {}
+
+    def registrar(self, pagina, etapas):
+        with self._candado:
+            self._reruns[pagina] = self._reruns.get(pagina, 0) + 1
+            for nombre, segundos in etapas:
+                histograma = self._histogramas.setdefault(
+                    (pagina, nombre), {'cuentas': [0] * len(self.buckets), 'suma': 0.0, 'total': 0}
+                )
+                for i, limite in enumerate(self.buckets):
+                    if segundos <= limite:
+                        histograma['cuentas'][i] += 1
+                histograma['suma'] += segundos
+                histograma['total'] += 1
+
+    def exportar_prometheus(self):
+        """
+        Métricas en el formato de texto de Prometheus
+        """
+        lineas = [
+            '# HELP calculadora_reruns_total Reruns medidos por página',
+            '# TYPE calculadora_reruns_total counter',
+        ]
+        with self._candado:
+            for pagina, reruns in sorted(self._reruns.items()):
+                lineas.append(f'calculadora_reruns_total{{pagina="{pagina}"}} {reruns}')
+            lineas += [
+                '# HELP calculadora_etapa_segundos Duración de cada etapa de la página',
+                '# TYPE calculadora_etapa_segundos histogram',
+            ]
+            for (pagina, etapa), histograma in sorted(self._histogramas.items()):
+                etiquetas = f'pagina="{pagina}",etapa="{etapa}"'
+                for limite, cuenta in zip(self.buckets, histograma['cuentas']):
+                    lineas.append(f'calculadora_etapa_segundos_bucket{{{etiquetas},le="{limite}"}} {cuenta}')
+                lineas.append(f'calculadora_etapa_segundos_bucket{{{etiquetas},le="+Inf"}} {histograma["total"]}')
+                lineas.append(f'calculadora_etapa_segundos_sum{{{etiquetas}}} {histograma["suma"]:.6f}')
+                lineas.append(f'calculadora_etapa_segundos_count{{{etiquetas}}} {histograma["total"]}')
+        return '\n'.join(lineas) + '\n'
+
+    def escribir(self, ruta=RUTA_METRICAS):
+        """
+        Escribe las métricas de forma atómica para que el lector nunca vea un archivo a medias
+        """
+        ruta = Path(ruta)
+        temporal = ruta.with_name(ruta.name + f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        temporal.write_text(self.exportar_prometheus(), encoding='utf-8')
+        os.replace(temporal, ruta)
+
+
+# Métricas compartidas por todas las sesiones del proceso
+metricas = MetricasEtapas()
+
+
+class Perfilador:
+    """
+    Duraciones de las etapas de un rerun, en el orden en que terminaron
+    """
+
+    def __init__(self, pagina):
+        self.pagina = pagina
+        self.etapas = []
+        self.archivo_perfil = None
+        self.resumen_perfil = None
+        self._inicio = time.perf_counter()
+        self.total = None
+
+    @contextlib.contextmanager
+    def etapa(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas.append((nombre, time.perf_counter() - inicio))
+
+    def terminar(self):
+        self.total = time.perf_counter() - self._inicio
+        self.etapas.append(('total', self.total))
+
+
+def iniciar_rerun(pagina):
+    """
+    Empieza a medir el rerun del hilo actual y devuelve su perfilador
+    """
+    _local.perfilador = Perfilador(pagina)
+    return _local.perfilador
+
+
+def etapa(nombre):
+    """
+    Contexto que mide una etapa del rerun actual; sin medición activa no hace nada
+    """
+    perfilador = getattr(_local, 'perfilador', None)
+    if perfilador is None:
+        return _SIN_MEDICION
+    return perfilador.etapa(nombre)
+
+
+def terminar_rerun(ruta_metricas=RUTA_METRICAS):
+    """
+    Cierra la medición del rerun, la suma a las métricas y las escribe en disco
+    """
+    perfilador = getattr(_local, 'perfilador', None)
+    _local.perfilador = None
+    if perfilador is None:
+        return None
+    perfilador.terminar()
+    metricas.registrar(perfilador.pagina, perfilador.etapas)
+    metricas.escribir(ruta_metricas)
+    return perfilador
+
+
+def ejecutar_con_cprofile(funcion, perfilador, directorio=DIRECTORIO_PERFILES):
+    """
+    Ejecuta funcion() bajo cProfile, guarda el volcado .prof y un resumen en el perfilador
+    """
+    perfil = cProfile.Profile()
+    try:
+        perfil.runcall(funcion)
+    finally:
+        nombre = f"perfil_{perfilador.pagina}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.prof"
+        perfilador.archivo_perfil = Path(directorio) / nombre
+        perfil.dump_stats(perfilador.archivo_perfil)
+        salida = io.StringIO()
+        pstats.Stats(perfil, stream=salida).sort_stats('cumulative').print_stats(FUNCIONES_PERFIL)
+        perfilador.resumen_perfil = salida.getvalue()
@@ -0,0 +1,135 @@
+"""
+Generación de PDFs en segundo plano con reutilización de resultados
+
+Los PDFs se generan en un grupo acotado de procesos, de modo que un documento
+lento no detiene la ejecución del script ni a otras sesiones. Cada PDF
+terminado se guarda en una caché direccionada por contenido (el hash de los
+parámetros normalizados del crédito), así las descargas repetidas no cuestan
+nada y dos sesiones que piden el mismo PDF comparten un solo trabajo.
+"""
+import hashlib
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from cachetools import LRUCache
+
+from nucleo.cache_calculos import normalizar_parametros
+from nucleo.sistemas_amortizacion import FRANCES, normalizar_sistema
+
+MAX_TRABAJADORES = 2
+
+# Límite de la caché de PDFs terminados, medido en bytes
+BYTES_MAXIMOS_CACHE = 64 * 2**20
+
+_candado = threading.Lock()
+_grupo = None
+_pdfs_listos = LRUCache(maxsize=BYTES_MAXIMOS_CACHE, getsizeof=len)
+_trabajos_en_curso = {}
+
+
+def clave_pdf(monto, tasa_anual, plazo_anos, cuota_seguro, exacto=False, sistema=FRANCES, opciones=None):
+    """
+    Clave de contenido del PDF de un crédito
+    """
+    parametros = normalizar_parametros(monto, tasa_anual, plazo_anos, cuota_seguro)
+    llave = ('pdf', exacto) + parametros + normalizar_sistema(sistema, opciones)
+    return hashlib.sha256(repr(llave).encode()).hexdigest()
+
+
+def _obtener_grupo():
+    """
+    Crea el grupo de procesos la primera vez que se necesita
+
+    Se usa 'spawn' porque el servidor de Streamlit tiene varios hilos y
+    hacer fork de un proceso con hilos no es seguro.
+    """
+    global _grupo
+    if _grupo is None:
+        _grupo = ProcessPoolExecutor(
+            max_workers=MAX_TRABAJADORES,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _grupo
+
+
+def _enviar(*argumentos):
+    """
+    Envía un trabajo al grupo; si un trabajador murió y el grupo quedó roto, lo reemplaza por uno nuevo
+    """
+    global _grupo
+    try:
+        return _obtener_grupo().submit(*argumentos)
+    except BrokenProcessPool:
+        _grupo.shutdown(wait=False)
+        _grupo = None
+        return _obtener_grupo().submit(*argumentos)
+
+
+def _renderizar_pdf(tabla_compacta, monto, tasa_anual, plazo_anos, cuota_seguro):
+    """
+    Genera el PDF en un proceso trabajador y devuelve sus bytes
+
+    La tabla viaja al trabajador en forma compacta y se convierte allí;
+    reportlab solo se importa en los trabajadores, nunca en la aplicación.
+    """
+    from exportacion_pdf import generar_pdf_tabla_amortizacion
+
+    return generar_pdf_tabla_amortizacion(
+        tabla_compacta.a_dataframe(), monto, tasa_anual, plazo_anos, cuota_seguro
+    ).getvalue()
+
+
+def _al_terminar(clave, futuro):
+    """
+    Guarda el PDF terminado en la caché y libera el trabajo en curso
+    """
+    with _candado:
+        _trabajos_en_curso.pop(clave, None)
+        if not futuro.cancelled() and futuro.exception() is None:
+            _pdfs_listos[clave] = futuro.result()
+
+
+def obtener_pdf(clave):
+    """
+    Devuelve los bytes del PDF si ya está generado, o None
+    """
+    with _candado:
+        return _pdfs_listos.get(clave)
+
+
+def obtener_trabajo(clave):
+    """
+    Devuelve el futuro del PDF si se está generando, o None
+    """
+    with _candado:
+        return _trabajos_en_curso.get(clave)
+
+
+def solicitar_pdf(tabla_compacta, monto, tasa_anual, plazo_anos, cuota_seguro, exacto=False,
+                  sistema=FRANCES, opciones=None):
+    """
+    Pide la generación del PDF y devuelve un futuro con sus bytes
+
+    Si el PDF ya está en caché el futuro se devuelve resuelto; si otra
+    sesión ya lo está generando se devuelve el mismo futuro.
+    """
+    clave = clave_pdf(monto, tasa_anual, plazo_anos, cuota_seguro, exacto, sistema, opciones)
+
+    with _candado:
+        pdf = _pdfs_listos.get(clave)
+        if pdf is not None:
+            futuro = Future()
+            futuro.set_result(pdf)
+            return futuro
+
+        futuro = _trabajos_en_curso.get(clave)
+        if futuro is not None:
+            return futuro
+
+        futuro = _enviar(_renderizar_pdf, tabla_compacta, monto, tasa_anual, plazo_anos, cuota_seguro)
+        _trabajos_en_curso[clave] = futuro
+
+    futuro.add_done_callback(lambda terminado: _al_terminar(clave, terminado))
+    return futuro
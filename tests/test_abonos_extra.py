@@ -0,0 +1,101 @@
+"""
+Simulador de abonos extraordinarios: equivalencia con la tabla normal, con
+un cálculo desde cero y con un cálculo mes a mes
+"""
+import numpy as np
+import pytest
+
+from nucleo.abonos_extra import (
+    REDUCIR_CUOTA,
+    REDUCIR_PLAZO,
+    SimuladorAbonos,
+    expandir_abonos,
+    generar_tabla_abonos,
+)
+from nucleo.amortizacion import calcular_cuota_mensual, generar_tabla_amortizacion
+from nucleo.tabla_compacta import COLUMNAS_TABLA
+
+COLUMNAS_COMPARADAS = ['Cuota Crédito', 'Interés', 'Abono Capital', 'Abono Extra', 'Saldo Pendiente']
+# Las cuotas se recalculan en punto flotante: cerca de medio centavo el redondeo puede diferir en uno
+UN_CENTAVO = 0.01 + 1e-9
+
+
+def tabla_mes_a_mes(monto, tasa_anual, plazo_anos, extras, politica):
+    """
+    Referencia mes a mes: pago regular, luego el abono extra; con 'cuota' se recalcula la cuota tras cada abono
+    """
+    tasa_mensual = tasa_anual / 100 / 12
+    num_pagos = plazo_anos * 12
+    cuota = calcular_cuota_mensual(monto, tasa_anual, plazo_anos)
+    saldo = monto
+    filas = []
+    for posicion in range(num_pagos):
+        interes = saldo * tasa_mensual
+        abono = cuota - interes
+        if posicion == num_pagos - 1 or saldo - abono < 0.01:
+            abono = saldo
+        saldo -= abono
+        extra = min(extras[posicion], saldo)
+        saldo -= extra
+        if saldo < 0.01:
+            extra += saldo
+            saldo = 0
+        filas.append((interes + abono, interes, abono, extra, saldo))
+        if saldo == 0:
+            break
+        if politica == REDUCIR_CUOTA and extra > 0:
+            restantes = num_pagos - posicion - 1
+            cuota = saldo * tasa_mensual / (1 - (1 + tasa_mensual) ** -restantes) if tasa_mensual else saldo / restantes
+    return np.round(np.array(filas), 2)
+
+
+def planes(generador, plazo_anos, monto):
+    """
+    Planes aleatorios de abonos únicos y recurrentes
+    """
+    for _ in range(4):
+        plan = []
+        for _ in range(generador.integers(0, 3)):
+            mes = int(generador.integers(1, plazo_anos * 12 + 1))
+            abono = float(generador.integers(0, monto // 5 + 1))
+            plan.append((mes, abono) if generador.random() < 0.5
+                        else (mes, abono / 10, int(generador.choice([1, 3, 6, 12]))))
+        yield plan
+
+
+@pytest.mark.parametrize('politica', [REDUCIR_PLAZO, REDUCIR_CUOTA])
+@pytest.mark.parametrize('caso', [(100000, 12.0, 5, 30), (250000, 0.0, 10, 0), (300000, 24.0, 30, 45.5)])
+def test_sin_abonos_igual_a_la_tabla_normal(caso, politica):
+    tabla = generar_tabla_abonos(*caso, abonos=(), politica=politica)
+    referencia = generar_tabla_amortizacion(*caso)
+    for columna in COLUMNAS_TABLA:
+        np.testing.assert_array_equal(tabla[columna].to_numpy(), referencia[columna].to_numpy(), err_msg=columna)
+    assert (tabla['Abono Extra'] == 0).all()
+
+
+@pytest.mark.parametrize('semilla', range(4))
+def test_incremental_igual_a_desde_cero_y_a_mes_a_mes(semilla):
+    generador = np.random.default_rng(semilla)
+    for _ in range(25):
+        monto = float(generador.integers(1000, 10000000))
+        tasa_anual = float(generador.choice([0.0, round(generador.uniform(0, 50), 1)]))
+        plazo_anos = int(generador.integers(1, 31))
+        politica = str(generador.choice([REDUCIR_PLAZO, REDUCIR_CUOTA]))
+        simulador = SimuladorAbonos(monto, tasa_anual, plazo_anos, 30, politica)
+        for plan in planes(generador, plazo_anos, monto):
+            incremental = simulador.simular(plan).a_dataframe()
+            desde_cero = SimuladorAbonos(monto, tasa_anual, plazo_anos, 30, politica).simular(plan).a_dataframe()
+            assert incremental.equals(desde_cero), (monto, tasa_anual, plazo_anos, politica, plan)
+
+            extras = expandir_abonos(plan, plazo_anos * 12)
+            referencia = tabla_mes_a_mes(monto, tasa_anual, plazo_anos, extras, politica)
+            assert len(incremental) == len(referencia), (monto, tasa_anual, plazo_anos, politica, plan)
+            diferencia = np.abs(incremental[COLUMNAS_COMPARADAS].to_numpy() - referencia).max()
+            assert diferencia <= UN_CENTAVO, (monto, tasa_anual, plazo_anos, politica, plan)
+
+
+def test_abono_invalido():
+    with pytest.raises(ValueError):
+        expandir_abonos([(0, 100)], 60)
+    with pytest.raises(ValueError):
+        expandir_abonos([(12, -100)], 60)
@@ -0,0 +1,45 @@
+"""
+Almacén de escenarios: totales iguales a los de la aplicación y archivos dañados
+"""
+import pytest
+
+from almacen_escenarios import AlmacenEscenarios
+from nucleo.cache_calculos import obtener_tabla_compacta
+from nucleo.sistemas_amortizacion import ALEMAN, FRANCES, GLOBO, GRACIA, calcular_totales_credito
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    return AlmacenEscenarios(tmp_path)
+
+
+@pytest.mark.parametrize('sistema, opciones', [
+    (FRANCES, None), (ALEMAN, None), (GRACIA, {'meses_gracia': 12}), (GLOBO, {'porcentaje_globo': 40.0}),
+])
+@pytest.mark.parametrize('exacto', [False, True])
+def test_totales_iguales_a_la_pagina_de_resumen(almacen, sistema, opciones, exacto):
+    parametros = (100000, 12.0, 5, 30)
+    almacen.guardar(*parametros, exacto, sistema, opciones, cliente='ACME')
+    tabla = obtener_tabla_compacta(*parametros, exacto, sistema, opciones)
+    totales = calcular_totales_credito(tabla, *parametros, exacto, sistema)
+    escenario, = almacen.buscar(cliente='ACME')
+    assert escenario['primera_cuota'] == round(float(totales['cuota_mensual']), 2)
+    assert escenario['total_intereses'] == round(float(totales['intereses_pagados']), 2)
+    assert escenario['total_general'] == round(float(totales['total_general']), 2)
+
+
+def test_intereses_del_ejemplo_con_gracia(almacen):
+    almacen.guardar(100000, 12.0, 5, 0, sistema=GRACIA, opciones={'meses_gracia': 12}, cliente='ACME')
+    assert almacen.buscar(cliente='ACME')[0]['total_intereses'] == 38402.24
+
+
+def test_montos_enteros_y_flotantes_comparten_tabla(almacen):
+    assert almacen.guardar(100000, 12.0, 5, 30) == almacen.guardar(100000.0, 12, 5, 30.0)
+
+
+def test_archivo_danado_es_un_fallo(almacen):
+    clave = almacen.guardar(100000, 12.0, 5, 30)
+    almacen.ruta_tabla(clave).write_bytes(b'no es arrow')
+    assert almacen.cargar(clave) is None
+    almacen.guardar(100000, 12.0, 5, 30)
+    assert len(almacen.cargar(clave)) == 60
@@ -0,0 +1,64 @@
+"""
+Invariantes del motor exacto en centavos y sus saldos frente a la forma cerrada en Decimal
+"""
+from decimal import ROUND_HALF_EVEN, Decimal, localcontext
+
+import numpy as np
+import pytest
+
+from nucleo.amortizacion_centavos import calcular_cuota_centavos, generar_tabla_centavos
+
+CASOS = [
+    (100000, 12.0, 5, 30),
+    (250000, 7.5, 20, 0),
+    (100000, 7.5, 30, 45.5),
+    (300000, 24.0, 30, 30),
+    (50000, 0.0, 10, 30),
+    (1000, 3.0, 1, 0),
+    (9999999.99, 49.9, 30, 500),
+]
+
+
+def saldos_decimal(monto, tasa_anual, plazo_anos):
+    """
+    Saldo de cada mes con la cuota ya redondeada, por la forma cerrada en Decimal de 50 dígitos
+    """
+    cuota = calcular_cuota_centavos(monto, tasa_anual, plazo_anos)
+    with localcontext() as contexto:
+        contexto.prec = 50
+        monto = Decimal(round(monto * 100))
+        tasa_mensual = Decimal(str(tasa_anual)) / 100 / 12
+        saldos = []
+        for mes in range(1, plazo_anos * 12 + 1):
+            if tasa_mensual == 0:
+                saldo = monto - cuota * mes
+            else:
+                saldo = monto - (cuota - monto * tasa_mensual) * ((1 + tasa_mensual) ** mes - 1) / tasa_mensual
+            saldos.append(max(int(saldo.quantize(Decimal(1), rounding=ROUND_HALF_EVEN)), 0))
+    saldos[-1] = 0
+    return np.array(saldos)
+
+
+def _centavos(tabla, columna):
+    return np.rint(tabla[columna] * 100).astype(np.int64)
+
+
+@pytest.mark.parametrize('caso', CASOS)
+def test_invariantes(caso):
+    tabla = generar_tabla_centavos(*caso)
+    cuota, interes, abono = (_centavos(tabla, columna) for columna in ('Cuota Crédito', 'Interés', 'Abono Capital'))
+    saldo = _centavos(tabla, 'Saldo Pendiente')
+    np.testing.assert_array_equal(cuota, interes + abono)
+    assert abono.sum() == round(caso[0] * 100)
+    assert saldo[-1] == 0
+    np.testing.assert_array_equal(np.diff(np.concatenate(([round(caso[0] * 100)], saldo))), -abono)
+    np.testing.assert_array_equal(_centavos(tabla, 'Pago Total'), cuota + round(caso[3] * 100))
+    assert (cuota[:-1] == cuota[0]).all()
+
+
+@pytest.mark.parametrize('caso', CASOS)
+def test_saldos_de_la_forma_cerrada(caso):
+    # La forma cerrada en float64 puede quedar a un centavo de la exacta
+    # cuando el saldo cae cerca de medio centavo
+    diferencia = np.abs(_centavos(generar_tabla_centavos(*caso), 'Saldo Pendiente') - saldos_decimal(*caso[:3]))
+    assert diferencia.max() <= 1
@@ -0,0 +1,81 @@
+"""
+API HTTP: validación de las solicitudes y errores siempre en JSON
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from tornado.testing import AsyncHTTPTestCase
+
+import api
+
+PRESTAMO = {'monto': 100000, 'tasa_anual': 12.0, 'plazo_anos': 5, 'cuota_seguro': 30}
+
+
+@pytest.mark.parametrize('cambio', [
+    {'monto': 1e300},
+    {'monto': 0},
+    {'monto': True},
+    {'tasa_anual': -1},
+    {'tasa_anual': float('nan')},
+    {'cuota_seguro': 1e9},
+    {'plazo_anos': True},
+    {'plazo_anos': 5.0},
+    {'plazo_anos': 0},
+])
+def test_prestamos_invalidos(cambio):
+    with pytest.raises(ValueError):
+        api.leer_solicitud(json.dumps({'prestamos': [{**PRESTAMO, **cambio}]}))
+
+
+@pytest.mark.parametrize('exacto', ['false', 'true', 1, None])
+def test_exacto_debe_ser_booleano(exacto):
+    with pytest.raises(ValueError):
+        api.leer_solicitud(json.dumps({'prestamos': [PRESTAMO], 'exacto': exacto}))
+
+
+def test_solicitud_valida():
+    prestamos, exacto = api.leer_solicitud(json.dumps({'prestamos': [PRESTAMO], 'exacto': True}))
+    assert prestamos == [(100000.0, 12.0, 5, 30.0)] and exacto is True
+
+
+class TestServidor(AsyncHTTPTestCase):
+
+    def get_app(self):
+        # Un grupo de hilos basta para probar los manejadores
+        self.grupo = ThreadPoolExecutor(max_workers=1)
+        return api.crear_aplicacion(self.grupo)
+
+    def tearDown(self):
+        super().tearDown()
+        self.grupo.shutdown()
+
+    def _post(self, ruta, cuerpo):
+        respuesta = self.fetch(ruta, method='POST', body=json.dumps(cuerpo))
+        return respuesta.code, respuesta.headers['Content-Type'], json.loads(respuesta.body)
+
+    def test_tabla(self):
+        codigo, _, cuerpo = self._post('/tabla', {'prestamos': [PRESTAMO], 'exacto': True})
+        assert codigo == 200
+        assert cuerpo['tablas'][0]['Saldo Pendiente'][-1] == 0
+
+    def test_monto_enorme_es_error_400(self):
+        for exacto in (False, True):
+            solicitud = {'prestamos': [{**PRESTAMO, 'monto': 1e300}], 'exacto': exacto}
+            codigo, tipo, cuerpo = self._post('/tabla', solicitud)
+            assert codigo == 400 and tipo.startswith('application/json') and 'monto' in cuerpo['error']
+
+    def test_error_del_trabajador_en_json(self):
+        original = api.calcular_respuesta
+        try:
+            api.calcular_respuesta = lambda *argumentos: 1 / 0
+            codigo, tipo, cuerpo = self._post('/cuota', {'prestamos': [PRESTAMO]})
+            assert codigo == 500 and tipo.startswith('application/json') and 'error' in cuerpo
+
+            def fuera_de_rango(*argumentos):
+                raise ValueError("Montos fuera de rango")
+            api.calcular_respuesta = fuera_de_rango
+            codigo, tipo, cuerpo = self._post('/tabla', {'prestamos': [PRESTAMO]})
+            assert codigo == 422 and cuerpo == {'error': "Montos fuera de rango"}
+        finally:
+            api.calcular_respuesta = original
@@ -0,0 +1,21 @@
+"""
+Llaves de la caché de cálculos: los mismos parámetros dan la misma llave y la misma tabla
+"""
+from nucleo.cache_calculos import CacheCalculos, llave_tabla, normalizar_parametros
+from nucleo.tabla_compacta import COLUMNAS_TABLA
+
+
+def test_enteros_y_flotantes_dan_la_misma_llave():
+    assert normalizar_parametros(100000, 12.0, 5, 30) == normalizar_parametros(100000.0, 12, 5, 30.0)
+    assert repr(llave_tabla(100000, 12.0, 5, 30)) == repr(llave_tabla(100000.0, 12, 5, 30.0))
+
+
+def test_tipos_de_columna_independientes_del_orden_de_llamada():
+    cache = CacheCalculos()
+    primera = cache.tabla_amortizacion(100000, 12.0, 5, 30)
+    segunda = cache.tabla_amortizacion(100000.0, 12, 5, 30.0)
+    sin_cache = CacheCalculos().tabla_amortizacion(100000.0, 12, 5, 30.0)
+    assert cache.aciertos == 1
+    for columna in COLUMNAS_TABLA:
+        assert primera[columna].dtype == segunda[columna].dtype == sin_cache[columna].dtype, columna
+    assert primera['Seguro'].dtype == 'float64'
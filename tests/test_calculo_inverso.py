@@ -0,0 +1,52 @@
+"""
+Despejes de nucleo.calculo_inverso: ida y vuelta con calcular_cuota_mensual
+"""
+import numpy as np
+import pytest
+
+from nucleo.amortizacion import calcular_cuota_mensual
+from nucleo.calculo_inverso import calcular_monto_maximo, calcular_plazo_minimo, calcular_tasa_implicita
+
+CONSULTAS = 5000
+
+
+@pytest.fixture(scope='module')
+def creditos():
+    generador = np.random.default_rng(0)
+    montos = generador.uniform(10000, 1000000, CONSULTAS)
+    tasas = generador.uniform(0, 30, CONSULTAS)
+    tasas[::50] = 0.0
+    plazos = generador.integers(1, 31, CONSULTAS)
+    cuotas = np.array([calcular_cuota_mensual(m, t, p) for m, t, p in zip(montos, tasas, plazos)])
+    seguros = generador.choice([0, 30, 45.5], CONSULTAS)
+    return montos, tasas, plazos, cuotas, seguros
+
+
+@pytest.mark.parametrize('cuota_seguro', [0, 30])
+def test_presupuesto_igual_a_la_cuota_alcanza_para_ese_plazo(cuota_seguro):
+    cuota = calcular_cuota_mensual(100000, 12.0, 5)
+    assert calcular_plazo_minimo(100000, cuota + cuota_seguro, 12.0, cuota_seguro) == 5
+    assert calcular_plazo_minimo(100000, cuota + cuota_seguro - 0.01, 12.0, cuota_seguro) == 6
+
+
+def test_ida_y_vuelta_del_plazo(creditos):
+    montos, tasas, plazos, cuotas, seguros = creditos
+    np.testing.assert_array_equal(calcular_plazo_minimo(montos, cuotas + seguros, tasas, seguros), plazos)
+
+
+def test_ida_y_vuelta_del_monto(creditos):
+    montos, tasas, plazos, cuotas, seguros = creditos
+    calculados = calcular_monto_maximo(cuotas + seguros, tasas, plazos, seguros)
+    np.testing.assert_allclose(calculados, montos, rtol=1e-9)
+
+
+def test_ida_y_vuelta_de_la_tasa(creditos):
+    montos, tasas, plazos, cuotas, seguros = creditos
+    calculadas = calcular_tasa_implicita(montos, cuotas + seguros, plazos, seguros)
+    np.testing.assert_allclose(calculadas, tasas, atol=1e-6)
+
+
+def test_presupuesto_insuficiente():
+    assert calcular_plazo_minimo(100000, 500, 12.0) == np.inf
+    assert np.isnan(calcular_tasa_implicita(100000, 100, 5))
+    assert calcular_monto_maximo(20, 12.0, 5, 30) == 0
@@ -0,0 +1,30 @@
+"""
+Sumas por rango del índice de la tabla de amortización
+"""
+import numpy as np
+import pytest
+
+from nucleo.amortizacion import generar_datos_anuales, generar_tabla_compacta
+from nucleo.amortizacion_centavos import generar_tabla_centavos
+from nucleo.indice_amortizacion import COLUMNAS_ACUMULADAS, IndiceAmortizacion
+from nucleo.sistemas_amortizacion import GRACIA, generar_tabla_sistema
+
+
+@pytest.mark.parametrize('tabla', [
+    generar_tabla_centavos(100000, 12, 5, 30),
+    generar_tabla_compacta(250000, 7.5, 20, 45.5),
+    generar_tabla_sistema(100000, 12.0, 5, 30, sistema=GRACIA, opciones={'meses_gracia': 12}),
+], ids=['exacta', 'francesa', 'gracia'])
+def test_totales_exactos_al_centavo(tabla):
+    indice = IndiceAmortizacion(tabla)
+    for inicio, fin in ((1, len(tabla)), (13, 24), (7, 7), (30, len(tabla) - 1)):
+        totales = indice.totales(inicio, fin)
+        for columna in COLUMNAS_ACUMULADAS:
+            centavos = np.rint(tabla.columna(columna, inicio - 1, fin) * 100).astype(np.int64).sum()
+            assert totales[columna] == centavos / 100, (columna, inicio, fin)
+
+
+def test_datos_anuales_sin_ruido_de_punto_flotante():
+    anuales = generar_datos_anuales(generar_tabla_centavos(100000, 12, 5, 30), 30)
+    assert anuales['Capital'].tolist() == [15528.96, 17498.43, 19717.66, 22218.36, 25036.59]
+    assert anuales['Capital'].sum().round(2) == 100000
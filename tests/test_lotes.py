@@ -0,0 +1,55 @@
+"""
+Calculadora por lotes: validación de la entrada y salidas completas o ninguna
+"""
+import pytest
+
+from lotes import main, procesar_archivo
+
+FILAS_VALIDAS = [f"{100000 + i},12.0,5,30" for i in range(30)]
+
+
+def _entrada(tmp_path, filas):
+    ruta = tmp_path / 'prestamos.csv'
+    ruta.write_text('\n'.join(['monto,tasa_anual,plazo_anos,cuota_seguro'] + filas) + '\n')
+    return ruta
+
+
+@pytest.mark.parametrize('fila, columna', [
+    ('-5000,12.0,5,30', 'monto'),
+    ('5000,-5,5,30', 'tasa_anual'),
+    ('5000,12.0,0,30', 'plazo_anos'),
+    ('5000,12.0,5,-1', 'cuota_seguro'),
+    ('5000,12.0,,30', 'plazo_anos'),
+])
+def test_fila_invalida_no_deja_salidas(tmp_path, fila, columna):
+    entrada = _entrada(tmp_path, FILAS_VALIDAS + [fila])
+    with pytest.raises(ValueError, match=columna):
+        procesar_archivo(entrada, tmp_path / 'tablas.csv', tmp_path / 'resumen.csv', filas_por_bloque=10)
+    assert sorted(ruta.name for ruta in tmp_path.iterdir()) == ['prestamos.csv']
+
+
+def test_salida_previa_intacta_si_falla(tmp_path):
+    entrada = _entrada(tmp_path, FILAS_VALIDAS + ['-5000,12.0,5,30'])
+    resumen = tmp_path / 'resumen.csv'
+    resumen.write_text('contenido previo\n')
+    with pytest.raises(ValueError):
+        procesar_archivo(entrada, ruta_resumen=resumen, procesos=2, filas_por_bloque=10)
+    assert resumen.read_text() == 'contenido previo\n'
+
+
+def test_salidas_completas(tmp_path):
+    entrada = _entrada(tmp_path, FILAS_VALIDAS)
+    prestamos, filas = procesar_archivo(entrada, tmp_path / 'tablas.parquet', tmp_path / 'resumen.csv',
+                                        filas_por_bloque=10)
+    assert (prestamos, filas) == (30, 30 * 60)
+    assert len((tmp_path / 'resumen.csv').read_text().splitlines()) == 31
+
+
+def test_tablas_y_resumen_en_el_mismo_archivo(tmp_path):
+    entrada = _entrada(tmp_path, FILAS_VALIDAS)
+    with pytest.raises(SystemExit) as salida:
+        main([str(entrada), '--tablas', str(tmp_path / 'x.csv'), '--resumen', str(tmp_path / 'x.csv')])
+    assert salida.value.code == 2
+    with pytest.raises(ValueError):
+        procesar_archivo(entrada, tmp_path / 'x.csv', tmp_path / 'x.csv')
+    assert not (tmp_path / 'x.csv').exists()
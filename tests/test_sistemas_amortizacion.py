@@ -0,0 +1,156 @@
+"""
+Equivalencia de cada sistema de amortización con un cálculo mes a mes
+
+Las referencias se escriben aquí a partir de la definición de cada sistema,
+sin usar el código de nucleo.sistemas_amortizacion.
+"""
+import numpy as np
+import pytest
+
+from nucleo.amortizacion import generar_tabla_amortizacion_iterativa
+from nucleo.sistemas_amortizacion import (
+    ALEMAN,
+    FRANCES,
+    GLOBO,
+    GRACIA,
+    SISTEMAS,
+    SistemaAmortizacion,
+    generar_tabla_sistema,
+    registrar_sistema,
+)
+from nucleo.tabla_compacta import COLUMNAS_TABLA
+
+CASOS = [
+    (100000, 12.0, 5, 30),
+    (250000, 7.5, 20, 0),
+    (100000, 7.5, 30, 30),
+    (300000, 24.0, 30, 45.5),
+    (50000, 0.0, 10, 30),
+    (1000, 3.0, 1, 0),
+]
+
+# El cálculo vectorizado y el mes a mes acumulan distinto el error de punto
+# flotante; cerca de medio centavo el redondeo puede diferir en uno
+UN_CENTAVO = 0.01 + 1e-9
+
+
+def _cuota_fija(saldo, tasa_mensual, meses):
+    if tasa_mensual == 0:
+        return saldo / meses
+    return saldo * tasa_mensual / (1 - (1 + tasa_mensual) ** -meses)
+
+
+def tabla_mes_a_mes(monto, tasa_anual, plazo_anos, cuota_seguro, abono_del_mes):
+    """
+    Tabla de referencia: interés sobre el saldo, abono de la regla del sistema y todo el saldo el último mes
+    """
+    tasa_mensual = tasa_anual / 100 / 12
+    num_pagos = plazo_anos * 12
+    saldo = monto
+    filas = []
+    for mes in range(1, num_pagos + 1):
+        interes = saldo * tasa_mensual
+        abono = saldo if mes == num_pagos else abono_del_mes(mes, saldo, tasa_mensual, num_pagos)
+        saldo -= abono
+        if saldo < 0.01:
+            saldo = 0
+        filas.append((mes, round(interes + abono, 2), round(interes, 2), round(abono, 2), round(cuota_seguro, 2),
+                      round(interes + abono + cuota_seguro, 2), round(saldo, 2)))
+    return np.array(filas, dtype=np.float64)
+
+
+def reglas(monto):
+    """
+    Abono a capital de cada mes según la definición de cada sistema (y sus opciones)
+    """
+    def gracia(meses_gracia):
+        def abono(mes, saldo, tasa_mensual, num_pagos):
+            if mes <= meses_gracia:
+                return 0.0
+            return _cuota_fija(monto, tasa_mensual, num_pagos - meses_gracia) - saldo * tasa_mensual
+        return abono
+
+    def globo(porcentaje):
+        def abono(mes, saldo, tasa_mensual, num_pagos):
+            valor_presente = monto * porcentaje / 100 * (1 + tasa_mensual) ** -num_pagos
+            return _cuota_fija(monto - valor_presente, tasa_mensual, num_pagos) - saldo * tasa_mensual
+        return abono
+
+    return [
+        (ALEMAN, None, lambda mes, saldo, tasa_mensual, num_pagos: monto / num_pagos),
+        (GRACIA, None, gracia(6)),
+        (GRACIA, {'meses_gracia': 3}, gracia(3)),
+        (GLOBO, None, globo(30.0)),
+        (GLOBO, {'porcentaje_globo': 100.0}, globo(100.0)),
+        (GLOBO, {'porcentaje_globo': 0.0}, globo(0.0)),
+    ]
+
+
+def _matriz(tabla):
+    return np.column_stack([np.asarray(tabla[columna], dtype=np.float64) for columna in COLUMNAS_TABLA])
+
+
+@pytest.mark.parametrize('caso', CASOS)
+def test_frances_igual_a_la_version_iterativa(caso):
+    tabla = generar_tabla_sistema(*caso, sistema=FRANCES)
+    referencia = generar_tabla_amortizacion_iterativa(*caso)
+    for columna in COLUMNAS_TABLA:
+        np.testing.assert_array_equal(tabla[columna], referencia[columna].to_numpy(), err_msg=columna)
+
+
+@pytest.mark.parametrize('caso', CASOS)
+def test_sistemas_iguales_al_calculo_mes_a_mes(caso):
+    for sistema, opciones, abono in reglas(caso[0]):
+        if sistema == GRACIA and caso[2] * 12 <= (opciones or {}).get('meses_gracia', 6):
+            continue
+        tabla = _matriz(generar_tabla_sistema(*caso, sistema=sistema, opciones=opciones))
+        referencia = tabla_mes_a_mes(*caso, abono)
+        diferencia = np.abs(tabla - referencia)
+        assert diferencia.max() <= UN_CENTAVO, (sistema, opciones)
+
+
+@pytest.mark.parametrize('caso', CASOS)
+@pytest.mark.parametrize('sistema', [FRANCES, ALEMAN, GRACIA, GLOBO])
+def test_tabla_exacta_cuadra_al_centavo(caso, sistema):
+    tabla = generar_tabla_sistema(*caso, sistema=sistema, exacto=True)
+    cuota = np.rint(tabla['Cuota Crédito'] * 100)
+    interes = np.rint(tabla['Interés'] * 100)
+    abono = np.rint(tabla['Abono Capital'] * 100)
+    assert abono.sum() == round(caso[0] * 100)
+    assert tabla['Saldo Pendiente'][-1] == 0
+    np.testing.assert_array_equal(cuota, interes + abono)
+
+
+def test_forma_de_cada_sistema():
+    aleman = generar_tabla_sistema(120000, 12.0, 10, sistema=ALEMAN)
+    assert np.all(aleman['Abono Capital'] == 1000.0)
+    assert np.all(np.diff(aleman['Cuota Crédito']) < 0)
+
+    gracia = generar_tabla_sistema(100000, 12.0, 5, sistema=GRACIA, opciones={'meses_gracia': 12})
+    assert np.all(gracia['Abono Capital'][:12] == 0)
+    assert np.all(gracia['Saldo Pendiente'][:12] == 100000)
+    assert np.all(gracia['Interés'][:12] == 1000.0)
+
+    bullet = generar_tabla_sistema(100000, 12.0, 5, sistema=GLOBO, opciones={'porcentaje_globo': 100.0})
+    assert np.all(bullet['Abono Capital'][:-1] == 0)
+    assert bullet['Abono Capital'][-1] == 100000
+
+
+def test_gracia_mas_larga_que_el_plazo():
+    with pytest.raises(ValueError):
+        generar_tabla_sistema(100000, 12.0, 1, sistema=GRACIA, opciones={'meses_gracia': 12})
+
+
+def test_sistema_incompleto_no_se_puede_registrar():
+    class SinReferencia(SistemaAmortizacion):
+        clave = 'sin_referencia'
+        nombre = 'Sin referencia'
+
+        def calcular_saldos(self, monto, tasa_mensual, num_pagos):
+            return np.zeros(num_pagos)
+
+    with pytest.raises(TypeError):
+        registrar_sistema(SinReferencia())
+    with pytest.raises(TypeError):
+        registrar_sistema(SinReferencia)
+    assert 'sin_referencia' not in SISTEMAS
@@ -0,0 +1,39 @@
+"""
+Conversión a centavos de la tabla compacta: montos fuera de rango fallan en vez de desbordar
+"""
+import pytest
+
+from nucleo.amortizacion import generar_tabla_compacta
+from nucleo.amortizacion_centavos import generar_tabla_centavos
+from nucleo.sistemas_amortizacion import ALEMAN, FRANCES, GLOBO, GRACIA, generar_tabla_sistema
+
+FUERA_DE_RANGO = [
+    (1e17, 12.0, 5, 30),
+    (1e300, 12.0, 5, 30),
+    (float('nan'), 12.0, 5, 30),
+    (float('inf'), 12.0, 5, 30),
+    (100000, 12.0, 5, float('nan')),
+]
+
+
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+@pytest.mark.parametrize('parametros', FUERA_DE_RANGO)
+@pytest.mark.parametrize('exacto', [False, True])
+@pytest.mark.parametrize('sistema', [FRANCES, ALEMAN, GRACIA, GLOBO])
+def test_montos_fuera_de_rango(parametros, exacto, sistema):
+    with pytest.raises(ValueError):
+        generar_tabla_sistema(*parametros, sistema=sistema, exacto=exacto)
+
+
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+@pytest.mark.parametrize('generar', [generar_tabla_compacta, generar_tabla_centavos])
+def test_motores_rechazan_montos_fuera_de_rango(generar):
+    for parametros in FUERA_DE_RANGO:
+        with pytest.raises(ValueError):
+            generar(*parametros)
+
+
+def test_montos_grandes_que_caben():
+    tabla = generar_tabla_compacta(1e14, 12.0, 5, 30)
+    assert tabla['Saldo Pendiente'][0] > 0
+    assert tabla['Saldo Pendiente'][-1] == 0